@@ -1,8 +1,44 @@
 # app.py — 최소 라우터 + 지연 임포트 + 에러 표시
+import os
+
 import streamlit as st
 
 st.set_page_config(page_title="만성질환 위험도 예측기", layout="centered")
 
+# 모델 미리 로딩 (opt-in: PRELOAD_MODELS=1) — 프로세스당 1회, 백그라운드 스레드
+@st.cache_resource
+def _start_model_preload():
+    from utils.model_utils import start_preload
+    return start_preload()
+
+if os.getenv("PRELOAD_MODELS", "").lower() in ("1", "true", "yes"):
+    _start_model_preload()
+
+# HTTP/JSON 예측 서버 (opt-in: SCORING_PORT=8000) — 같은 프로세스에서 모델 레지스트리 공유
+@st.cache_resource
+def _start_scoring_server(port: int):
+    from utils.scoring_server import start_server_thread
+    return start_server_thread(os.getenv("SCORING_HOST", "127.0.0.1"), port)
+
+if os.getenv("SCORING_PORT"):
+    _start_scoring_server(int(os.environ["SCORING_PORT"]))
+
+# 페이지 모듈 미리 import (기본 켜짐, PREFETCH_PAGES=0 으로 끔) — 홈 화면을 그린 뒤 백그라운드 스레드에서
+# pandas/numpy/pyarrow 등 페이지 의존성을 로딩 → 첫 페이지 진입 시 import 대기 감소 (ML 라이브러리는 모델 로딩 시점)
+@st.cache_resource
+def _prefetch_pages():
+    import threading
+
+    def _load():
+        try:
+            import base_health, follow_health  # noqa: F401
+        except Exception:
+            pass  # 실제 진입 시 다시 import 하면서 오류를 화면에 표시
+
+    thread = threading.Thread(target=_load, name="page-prefetch", daemon=True)
+    thread.start()
+    return thread
+
 # 세션 라우팅
 if "page" not in st.session_state:
     st.session_state.page = "home"
@@ -29,6 +65,9 @@ if st.session_state.page == "home":
         if st.button("지금까지의 내 생활습관을 기반으로 10년 후 만성질환 위험도 예측하기"):
             go_future()
 
+    if os.getenv("PREFETCH_PAGES", "1").lower() not in ("0", "false", "no"):
+        _prefetch_pages()
+
 # ------------------ CURRENT ------------------
 elif st.session_state.page == "current":
     try:
@@ -52,3 +91,8 @@ elif st.session_state.page == "future":
             st.exception(e)
         except UnicodeEncodeError:
             st.error("인코딩 오류가 발생했습니다.")
+
+# 단계별 소요 시간 디버그 패널 (opt-in: DEBUG_METRICS=1)
+if os.getenv("DEBUG_METRICS", "").lower() in ("1", "true", "yes"):
+    from utils.metrics import render_debug_panel
+    render_debug_panel(st)
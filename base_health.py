@@ -3,23 +3,55 @@
 현재 생활습관 입력 & 단기 예측 페이지 (루트 배치용)
 
 역할
-- 사용자가 오늘 생활습관/지표를 입력
-- 입력값을 data/follow_sample.csv 에 누적 저장 (T_ID=1 고정, 공란은 io_utils.append_row에서 -1 처리)
-- 방금 저장한 1행(또는 마지막 1행)으로 단기 예측 수행 (base_model_* 또는 current_model_* 있을 때)
+- 사용자가 오늘 생활습관/지표를 입력 (utils.schema.validate_row 로 검증/정규화)
+- 입력값을 data/follow_sample.csv 에 누적 저장 (T_ID=1 고정, 공란은 -1 처리)
+- CSV/Excel 업로드로 여러 시점을 한 번에 검증(validate_frame) + 일괄 저장(append_frame)
+  - 저장한 파일 내용의 해시를 세션에 기록 → 같은 파일로 저장 버튼을 다시 눌러도 중복 저장하지 않음
+- 방금 저장한 1행(또는 마지막 1행)으로 선택한 질병(기본 3종) 단기 예측 수행 (base_model_* 있을 때)
 
 필요 모듈
-- utils.io_utils: append_row, load_df
-- utils.preprocess: preprocess_base
-- utils.model_utils: load_models(kind="base" | "current")
+- utils.io_utils: append_row, append_frame, load_user, last_row
+- utils.schema: read_table, validate_frame, validate_row
+- utils.model_utils: predict_base (입력 피처가 같은 고혈압/고지혈증은 전처리 1회 공유)
+- (DEBUG_METRICS=1 이면 app.py 가 화면 하단에 단계별 소요 시간 패널 표시)
 """
 
+import hashlib
+
 import streamlit as st
-import pandas as pd
 from datetime import date
 
-from utils.io_utils import append_row, load_df
-from utils.preprocess import preprocess_base
-from utils.model_utils import load_models
+from utils.io_utils import append_frame, append_row, load_user, last_row
+from utils.model_utils import predict_base
+from utils.schema import read_table, validate_frame, validate_row
+
+SAVED_UPLOAD_KEY = "saved_upload_digest"  # 마지막으로 저장한 업로드 파일의 sha256
+
+
+def _render_upload(upload):
+    """업로드 파일 검증 결과 표시 + 유효한 행 일괄 저장 (잠금 1회 + 인덱스 트랜잭션 1회)"""
+    try:
+        raw = read_table(upload, upload.name)
+        clean, errors = validate_frame(raw, default_t_id=1, first_row=2)  # 1행 = 헤더
+    except (ValueError, ImportError, UnicodeDecodeError) as e:
+        st.error(f"파일을 읽을 수 없습니다: {e}")
+        return
+
+    st.write(f"전체 {len(raw)}행 중 저장 가능 {len(clean)}행, 오류 {errors['행'].nunique()}행")
+    if len(errors):
+        st.dataframe(errors.astype({"값": str}), use_container_width=True)
+    if not len(clean):
+        return
+
+    # 업로더는 rerun 후에도 파일을 유지하므로, 이미 저장한 내용이면 버튼 비활성화 (CSV 는 추가 전용)
+    digest = hashlib.sha256(upload.getvalue()).hexdigest()
+    already = st.session_state.get(SAVED_UPLOAD_KEY) == digest
+    if already:
+        st.info("이 파일은 이미 저장했습니다. 다른 파일을 올리면 다시 저장할 수 있습니다.")
+    if st.button(f"💾 유효한 {len(clean)}행 저장", disabled=already):
+        saved = append_frame(clean)
+        st.session_state[SAVED_UPLOAD_KEY] = digest
+        st.success(f"{saved}행을 data/follow_sample.csv 에 저장했습니다.")
 
 
 def render(go_home):
@@ -31,6 +63,16 @@ def render(go_home):
 
     st.divider()
 
+    # -------------------------------
+    # 파일 업로드 (여러 시점 일괄 저장)
+    # -------------------------------
+    with st.expander("📂 여러 건 한 번에 저장 (CSV / Excel 업로드)"):
+        st.caption("follow_sample.csv 와 같은 컬럼(T_ID, EDATE, SEX, ...)의 파일을 올려주세요. "
+                   "T_ID 가 없거나 빈 행은 1로 저장합니다.")
+        upload = st.file_uploader("파일 선택", type=["csv", "xlsx", "xls"])
+        if upload is not None:
+            _render_upload(upload)
+
     # -------------------------------
     # 입력 폼
     # -------------------------------
@@ -116,12 +158,13 @@ def render(go_home):
             ALT = st.number_input("🩸 ALT (간기능) - U/L", min_value=-1.0, step=5.0, value=-1.0, format="%.1f")
             CREATININE = st.number_input("🩸 크레아티닌 (신장기능) - mg/dL", min_value=-1.0, step=0.1, value=-1.0, format="%.2f")
 
-            # 질병 선택
+            # 질병 선택 (기본: 3종 모두)
             st.markdown("**🎯 예측할 질병 선택**")
-            disease_choice = st.selectbox(
+            disease_choices = st.multiselect(
                 "예측하고 싶은 질병을 선택하세요:",
                 ["당뇨병", "고혈압", "고지혈증"],
-                help="각 질병별로 다른 모델을 사용합니다."
+                default=["당뇨병", "고혈압", "고지혈증"],
+                help="각 질병별로 다른 모델을 사용합니다. (고혈압/고지혈증은 같은 입력 피처를 공유)"
             )
 
             submitted = st.form_submit_button("💾 저장하고 단기 예측 실행")
@@ -130,80 +173,18 @@ def render(go_home):
     # 저장 + 검증 + 단기 예측
     # -------------------------------
     if submitted:
-        # 1) 필수값 검증 및 숫자 변환
-        errors = []
-        
-        # 선택지에서 숫자로 변환하는 함수
-        def parse_selection(selection, choices):
-            if selection == "선택":
-                return None
-            for choice in choices:
-                if selection == choice:
-                    return choices[choice]
-            return None
-        
-        # 기본 정보 파싱
-        CHILD = None if CHILD_sel == "선택" else (1 if "낳지 않았다" in CHILD_sel else 2)
-        SEX = None if SEX_sel == "선택" else (1 if "남자" in SEX_sel else 2)
-        EDU = None if EDU_sel == "선택" else int(EDU_sel.split("(")[1].split(")")[0])
-        
-        # 음주/흡연 파싱
-        T_DRINK = None if T_DRINK_sel == "선택" else int(T_DRINK_sel.split("(")[1].split(")")[0])
-        T_SMOKE = None if T_SMOKE_sel == "선택" else int(T_SMOKE_sel.split("(")[1].split(")")[0])
-        
-        # 질병 진단 파싱
-        HTN = None if HTN_sel == "선택" else int(HTN_sel.split("(")[1].split(")")[0])
-        DM = None if DM_sel == "선택" else int(DM_sel.split("(")[1].split(")")[0])
-        LIP = None if LIP_sel == "선택" else int(LIP_sel.split("(")[1].split(")")[0])
-        
-        # 가족력 파싱
-        FMMHT = -1 if FMMHT_sel == "모름" else int(FMMHT_sel.split("(")[1].split(")")[0])
-        FMFHT = -1 if FMFHT_sel == "모름" else int(FMFHT_sel.split("(")[1].split(")")[0])
-        FMMDM = -1 if FMMDM_sel == "모름" else int(FMMDM_sel.split("(")[1].split(")")[0])
-        FMFDM = -1 if FMFDM_sel == "모름" else int(FMFDM_sel.split("(")[1].split(")")[0])
-
-        # 필수 항목 검증
-        if EDATE is None:
-            errors.append("조사일을 선택하세요.")
-        if CHILD is None:
-            errors.append("출산 여부를 선택하세요.")
-        if SEX is None:
-            errors.append("성별을 선택하세요.")
-        if EDU is None:
-            errors.append("교육수준을 선택하세요.")
-        if T_DRINK is None:
-            errors.append("음주 여부를 선택하세요.")
-        if T_SMOKE is None:
-            errors.append("흡연 여부를 선택하세요.")
-        if T_AGE is None or T_AGE < 0:
-            errors.append("나이를 올바르게 입력하세요.")
-        if HTN is None:
-            errors.append("고혈압 진단 여부를 선택하세요.")
-        if DM is None:
-            errors.append("당뇨병 진단 여부를 선택하세요.")
-        if LIP is None:
-            errors.append("고지혈증 진단 여부를 선택하세요.")
-        if WEIGHT is None or WEIGHT <= 0:
-            errors.append("체중을 0보다 크게 입력하세요.")
-        if HEIGHT is None or HEIGHT <= 0:
-            errors.append("신장을 0보다 크게 입력하세요.")
-
-        if errors:
-            for e in errors:
-                st.error(e)
-            st.stop()
-
-        # 2) 저장할 행 구성 (선택 항목은 이미 -1 기본값)
+        # 1~2) 저장할 행 구성 → 스키마 검증/정규화 (utils.schema)
+        #      선택지 문자열("남자 (1)")은 괄호 안 코드로, "모름"/-1 은 결측으로, "선택"은 필수 항목 미입력으로 처리
         row = {
             "T_ID": 1,
-            "EDATE": EDATE.isoformat() if isinstance(EDATE, (date, pd.Timestamp)) else EDATE,
+            "EDATE": EDATE,
 
-            "CHILD": CHILD, "SEX": SEX, "MNSAG": MNSAG, "EDU": EDU, "SMAG": SMAG,
-            "T_DRINK": T_DRINK, "T_DRINKAM": T_DRINKAM, "T_SMOKE": T_SMOKE, "T_SMOKEAM": T_SMOKEAM,
+            "CHILD": CHILD_sel, "SEX": SEX_sel, "MNSAG": MNSAG, "EDU": EDU_sel, "SMAG": SMAG,
+            "T_DRINK": T_DRINK_sel, "T_DRINKAM": T_DRINKAM, "T_SMOKE": T_SMOKE_sel, "T_SMOKEAM": T_SMOKEAM,
             "T_AGE": T_AGE,
 
-            "HTN": HTN, "DM": DM, "LIP": LIP,
-            "FMMHT": FMMHT, "FMFHT": FMFHT, "FMMDM": FMMDM, "FMFDM": FMFDM,
+            "HTN": HTN_sel, "DM": DM_sel, "LIP": LIP_sel,
+            "FMMHT": FMMHT_sel, "FMFHT": FMFHT_sel, "FMMDM": FMMDM_sel, "FMFDM": FMFDM_sel,
 
             "WEIGHT": WEIGHT, "HEIGHT": HEIGHT, "WAIST": WAIST, "HIP": HIP,
             "SBP": SBP, "DBP": DBP, "PULSE": PULSE, "EXER": EXER,
@@ -211,60 +192,61 @@ def render(go_home):
             "HBA1C": HBA1C, "GLU": GLU, "HOMAIR": HOMAIR,
             "TCHL": TCHL, "HDL": HDL, "TG": TG, "AST": AST, "ALT": ALT, "CREATININE": CREATININE,
         }
+        row, errors = validate_row(row)
+
+        if errors:
+            for e in errors:
+                st.error(e)
+            st.stop()
 
         try:
             # 3) CSV 저장
             append_row(row)
             st.success("저장 완료! data/follow_sample.csv 에 누적되었습니다.")
 
-            # 4) 방금 저장한 1행 전처리
-            df = load_df()
-            if "T_ID" in df.columns:
-                df["T_ID"] = pd.to_numeric(df["T_ID"], errors="coerce")
-            df_user = df[df["T_ID"] == 1]
-            last_row_df = df_user.tail(1)
-            
-            # 질병별 전처리 및 모델 로드
+            # 4~5) 방금 저장한 1행 → 선택한 질병 일괄 예측
+            #      입력 피처가 같은 고혈압/고지혈증은 전처리 1회 공유 (질병 3종 = 전처리 2회), predict_proba 는 질병별 1회
+            last_row_df = last_row(1)
             disease_map = {"당뇨병": "dm", "고혈압": "htn", "고지혈증": "lip"}
-            disease_code = disease_map[disease_choice]
-            X = preprocess_base(last_row_df, disease_code)
+            disease_codes = [disease_map[d] for d in disease_choices]
 
-            # 해당 질병 모델만 로드
-            model_path = f"models/base_model_{disease_code}.joblib"
-            try:
-                import joblib
-                model = joblib.load(model_path)
-                
-                with st.spinner(f"{disease_choice} 예측 실행 중..."):
-                    st.subheader(f"⚡ {disease_choice} 예측 결과")
-                    prob = float(model.predict_proba(X)[0][1])
-                    pred = int(model.predict(X)[0])
-                    
-                    st.metric(
-                        label=f"{disease_choice} 발생 위험도",
-                        value=f"{prob:.1%}",
-                        delta="높음" if pred == 1 else "낮음"
-                    )
-                    
-                    if prob > 0.7:
-                        st.warning("⚠️ 위험도가 높습니다. 정기적인 건강 검진을 권장합니다.")
-                    elif prob > 0.4:
-                        st.info("ℹ️ 주의가 필요합니다. 생활습관 개선을 권장합니다.")
-                    else:
-                        st.success("✅ 위험도가 낮습니다. 현재 생활습관을 유지하세요.")
-                        
-            except FileNotFoundError:
-                st.error(f"❌ {disease_choice} 모델 파일을 찾을 수 없습니다: {model_path}")
-            except Exception as e:
+            if not disease_codes:
+                st.info("예측할 질병을 선택하지 않아 저장만 했습니다.")
+            else:
                 try:
-                    error_msg = str(e)
-                except UnicodeEncodeError:
-                    error_msg = "인코딩 오류가 발생했습니다"
-                st.error(f"❌ {disease_choice} 예측 중 오류 발생: {error_msg}")
+                    with st.spinner("단기 예측 실행 중..."):
+                        scores = predict_base(last_row_df, diseases=disease_codes)
+
+                    st.subheader("⚡ 단기 예측 결과")
+                    for col, (code, res) in zip(st.columns(len(scores)), scores.items()):
+                        prob = float(res["prob"][0])
+                        pred = int(res["pred"][0])
+                        with col:
+                            st.metric(
+                                label=f"{res['name']} 발생 위험도",
+                                value=f"{prob:.1%}",
+                                delta="높음" if pred == 1 else "낮음"
+                            )
+
+                            if prob > 0.7:
+                                st.warning("⚠️ 위험도가 높습니다. 정기적인 건강 검진을 권장합니다.")
+                            elif prob > 0.4:
+                                st.info("ℹ️ 주의가 필요합니다. 생활습관 개선을 권장합니다.")
+                            else:
+                                st.success("✅ 위험도가 낮습니다. 현재 생활습관을 유지하세요.")
+
+                except FileNotFoundError as e:
+                    st.error(f"❌ 모델 파일을 찾을 수 없습니다: {e.filename or e}")
+                except Exception as e:
+                    try:
+                        error_msg = str(e)
+                    except UnicodeEncodeError:
+                        error_msg = "인코딩 오류가 발생했습니다"
+                    st.error(f"❌ 예측 중 오류 발생: {error_msg}")
 
             # 6) 최근 입력 미리보기
             with st.expander("📄 최근 입력(상위 5행) 보기"):
-                st.dataframe(df_user.tail(5), use_container_width=True)
+                st.dataframe(load_user(1).tail(5), use_container_width=True)
 
         except FileNotFoundError:
             st.error("데이터 파일을 찾을 수 없습니다. data/follow_sample.csv 경로를 확인하세요.")
@@ -2,19 +2,30 @@
 """
 10년 후 만성질환 시나리오 예측 페이지 (루트 배치용)
 
-- data/follow_sample.csv 로드 → T_ID=1 사용자 누적 데이터 필터
-- utils.preprocess.preprocess_followup() 으로 시계열 요약 전처리
-- utils.model_utils.load_models(kind="follow") 로 모델 3종 로드
-- 예측/확률/중요도 출력 + GPT 자연어 설명
+- utils.io_utils.load_user_state(1) 로 T_ID=1 사용자의 누적 상태(저장 시 증분 갱신) 조회
+- utils.preprocess.preprocess_followup_state() 로 상태 → 시계열 요약 1행
+- utils.model_utils.predict_follow 로 질병 3종 확률/라벨/개인별 기여도 상위 피처를 동시에 계산
+- utils.scenario.run_scenarios 로 생활습관 변화 시나리오 확률 변화 (일괄 예측 1회)
+  - 전체 이력 조회 + 시나리오 수만큼 전처리가 필요하므로 예측 버튼과 분리, 별도 버튼을 누를 때만 계산
+- 예측/확률/기여도 출력 + GPT 자연어 설명 (utils.gpt_utils.submit_explanation, 백그라운드 생성 + 캐시)
 """
 
 import streamlit as st
 import pandas as pd
-import numpy as np
 
-from utils.preprocess import preprocess_followup, column_meaning
-from utils.model_utils import load_models
-from utils.gpt_utils import generate_gpt_explanation
+from utils.io_utils import load_user, load_user_state
+from utils.preprocess import preprocess_followup_state, column_meaning
+from utils.model_utils import predict_follow
+from utils.gpt_utils import submit_explanation
+from utils.scenario import QUIT_DRINKING, QUIT_SMOKING, rename_diseases, run_scenarios
+
+# 생활습관 변화 시나리오 (원시 이력 변경 → 일괄 예측 1회)
+SCENARIOS = [
+    {"name": "체중 -5kg", "history": {"WEIGHT": ("add", -5)}},
+    {"name": "수축기 혈압 -10", "history": {"SBP": ("add", -10)}},
+    {"name": "금연", "history": QUIT_SMOKING, "rows": "last"},
+    {"name": "금주", "history": QUIT_DRINKING, "rows": "last"},
+]
 
 
 def render(go_home):
@@ -29,53 +40,30 @@ def render(go_home):
     if st.button("예측하기"):
         try:
             with st.spinner("예측을 준비하는 중..."):
-                # 1) 데이터 로드
-                df = pd.read_csv("data/follow_sample.csv", encoding="utf-8-sig")
-
-                # 날짜/ID 안전 캐스팅
-                if "EDATE" in df.columns:
-                    df["EDATE"] = pd.to_datetime(df["EDATE"], errors="coerce")
-                if "T_ID" in df.columns:
-                    df["T_ID"] = pd.to_numeric(df["T_ID"], errors="coerce")
-
-                # 2) 특정 사용자(T_ID=1) 필터
-                df_user = df[df["T_ID"] == 1]
-                if df_user.empty:
+                # 1) 특정 사용자(T_ID=1)의 누적 상태 조회 (저장 시 증분 갱신된 평균/변화/비율/최빈값)
+                state = load_user_state(1)
+                if state is None:
                     st.error("T_ID=1 사용자 데이터를 찾을 수 없습니다. (먼저 ‘현재 입력’ 페이지에서 데이터를 저장하세요)")
                     return
 
-                # 3) 전처리 (시계열 요약)
-                input_df = preprocess_followup(df_user)
+                # 2~3) 누적 상태 → 모델 입력 1행 (이력 길이와 무관한 비용)
+                input_df = preprocess_followup_state(state)
 
-                # 4) 모델 로딩(10년 후 예측용)
+                # 4) 예측 (질병 3종 동시 실행, 질병별 predict_proba 1회)
                 try:
-                    models = load_models(kind="follow")
+                    scores, results_prob, feature_importances = predict_follow(input_df)
                 except FileNotFoundError:
                     st.info("10년 후 예측용 모델(`follow_model_*.joblib`)이 없습니다.\n"
                             "모델 파일을 `models/` 폴더에 넣고 다시 시도하세요.")
                     return
 
                 # 5) 예측/확률/중요도 출력
-                results_prob: dict[str, float] = {}
-                feature_importances: dict[str, list[tuple[str, float]]] = {}
-
                 st.subheader("📊 예측 결과")
-                for disease_name, model in models.items():
-                    pred = model.predict(input_df)[0]
-                    prob = float(model.predict_proba(input_df)[0][1])
-                    results_prob[disease_name] = prob
-
-                    if hasattr(model, "feature_importances_"):
-                        importances = model.feature_importances_
-                        feat_names = input_df.columns
-                        top_idx = np.argsort(importances)[::-1][:3]
-                        top_feats = [(feat_names[i], float(importances[i])) for i in top_idx]
-                        feature_importances[disease_name] = top_feats
-                    else:
-                        feature_importances[disease_name] = []
-
+                for res in scores.values():
+                    pred = int(res["pred"][0])
+                    prob = float(res["prob"][0])
                     st.write(
-                        f"**{disease_name}**: {'발생 가능성 높음' if pred==1 else '발생 가능성 낮음'} "
+                        f"**{res['name']}**: {'발생 가능성 높음' if pred==1 else '발생 가능성 낮음'} "
                         f"(확률: {prob:.2%})"
                     )
 
@@ -88,15 +76,17 @@ def render(go_home):
                     use_container_width=True
                 )
 
-                # 중요도 표(있을 때만)
+                # 개인별 기여도 표(있을 때만) — 로그오즈 단위, + 는 위험을 높인 요인
                 for disease, feats in feature_importances.items():
                     if feats:
-                        st.markdown(f"**{disease} 영향 상위 피처**")
-                        st.table(pd.DataFrame(feats, columns=["피처", "중요도"]))
+                        st.markdown(f"**{disease} 영향 상위 피처 (개인별 기여도)**")
+                        st.table(pd.DataFrame(
+                            [(column_meaning.get(f, f), v) for f, v in feats], columns=["피처", "기여도"]
+                        ))
 
-                # 6) GPT 설명
+                # 6) GPT 설명 — 백그라운드 제출 (예측 결과는 이미 화면에 출력됨)
                 user_data = input_df.to_dict(orient="records")[0]
-                explanation = generate_gpt_explanation(
+                future = submit_explanation(
                     user_data=user_data,
                     column_meaning=column_meaning,
                     results_prob=results_prob,
@@ -104,6 +94,8 @@ def render(go_home):
                 )
 
             st.subheader("📝 AI가 설명해주는 예측 결과")
+            with st.spinner("설명을 생성하는 중..."):
+                explanation = future.result()
             st.write(explanation)
 
         except FileNotFoundError:
@@ -114,3 +106,31 @@ def render(go_home):
             except UnicodeEncodeError:
                 error_msg = "인코딩 오류가 발생했습니다"
             st.error(f"에러 발생: {error_msg}")
+
+    _render_scenarios()
+
+
+# -------------------------------
+# 생활습관 변화 시나리오 (요청 시에만 계산 — 예측 경로와 분리)
+# -------------------------------
+def _render_scenarios():
+    with st.expander("💡 생활습관을 바꾼다면? (확률 변화)"):
+        if not st.button("시나리오 계산하기"):
+            return
+        history = load_user(1)
+        if history.empty:
+            st.error("T_ID=1 사용자 데이터를 찾을 수 없습니다. (먼저 ‘현재 입력’ 페이지에서 데이터를 저장하세요)")
+            return
+        try:
+            with st.spinner("시나리오를 계산하는 중..."):
+                what_if = run_scenarios(history, SCENARIOS)
+        except FileNotFoundError:
+            st.info("10년 후 예측용 모델(`follow_model_*.joblib`)이 없습니다.")
+            return
+        except ValueError as e:
+            st.error(f"시나리오 오류: {e}")
+            return
+        st.dataframe(
+            rename_diseases(what_if.iloc[1:].filter(like="_delta")).map(lambda d: f"{d:+.1%}"),
+            use_container_width=True,
+        )
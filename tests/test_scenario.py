@@ -0,0 +1,65 @@
+"""
+utils/scenario.py 테스트
+- 생활습관 프리셋이 schema.ENUMS / RANGES 밖의 값을 만들지 않는지
+- 변경 없는 시나리오(기준 행)가 원래 이력의 predict_follow 결과와 정확히 같은지
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.model_utils import predict_follow
+from utils.preprocess import preprocess_followup
+from utils.scenario import (BASELINE, QUIT_DRINKING, QUIT_SMOKING, run_scenarios, scenario_features,
+                            scenario_grid)
+from utils.schema import ENUMS, RANGES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRESETS = {"QUIT_SMOKING": QUIT_SMOKING, "QUIT_DRINKING": QUIT_DRINKING}
+
+
+@pytest.fixture(scope="module")
+def history():
+    df = pd.read_csv(os.path.join(ROOT, "data", "follow_sample.csv"), encoding="utf-8-sig")
+    return df[df["T_ID"] == 1].reset_index(drop=True)
+
+
+@pytest.mark.parametrize("name", PRESETS)
+def test_preset_values_in_schema(name):
+    for col, (op, val) in PRESETS[name].items():
+        assert op == "set", f"{name}.{col}: 프리셋은 결과 값이 고정된 set 만 사용"
+        if col in ENUMS:
+            assert val in ENUMS[col], f"{name}.{col}={val} 는 ENUMS {ENUMS[col]} 밖"
+        else:
+            lo, hi = RANGES[col]
+            assert lo <= val <= hi, f"{name}.{col}={val} 는 RANGES {RANGES[col]} 밖"
+
+
+@pytest.mark.parametrize("rows", ["all", "last"])
+@pytest.mark.parametrize("name", PRESETS)
+def test_preset_rows_pass_validation(history, name, rows):
+    X = scenario_features(history, [{"name": name, "history": PRESETS[name], "rows": rows}])
+    assert len(X) == 1
+
+
+def test_out_of_schema_change_rejected(history):
+    with pytest.raises(ValueError, match="T_SMOKE"):
+        scenario_features(history, [{"history": {"T_SMOKE": ("set", 0)}}])
+
+
+def test_noop_scenario_matches_predict_follow(history):
+    features = preprocess_followup(history)
+    scores, _, _ = predict_follow(features)
+
+    X = scenario_features(history, [{}])
+    pd.testing.assert_frame_equal(X.reset_index(drop=True), features, check_dtype=False)
+
+    table = run_scenarios(history, scenario_grid({"WEIGHT": [None], "흡연": [None]}))
+    assert list(table.index) == [BASELINE]
+    for code, res in scores.items():
+        assert table.loc[BASELINE, f"{code}_prob"] == res["prob"][0]
+        assert table.loc[BASELINE, f"{code}_pred"] == res["pred"][0]
+        assert table.loc[BASELINE, f"{code}_delta"] == 0
+    assert np.isfinite(table.to_numpy(dtype=float)).all()
@@ -0,0 +1,175 @@
+"""
+utils/batch_score.py
+──────────────────────────────────────────────
+역할:
+- Streamlit 화면 없이 follow_sample.csv 형식(io_utils.COLUMNS) 파일들을 T_ID 별로 일괄 예측
+  (입력은 CSV 또는 io_utils migrate 로 만든 Parquet/Feather, 전처리에 필요한 컬럼만 읽음)
+- follow: 사용자 전체 이력 → 10년 후 예측 (model_utils.score_population)
+- base  : 사용자 마지막 저장 행 → 단기 예측 (model_utils.score_base_population)
+
+처리 방식:
+1) 입력 CSV 를 chunk 단위로 읽으며 T_ID 해시로 파티션 파일에 분배
+   → 한 사용자의 행은 여러 파일/위치에 흩어져 있어도 항상 같은 파티션으로 모임
+   (base 는 사용자별 마지막 행만 있으면 되므로 chunk 마다 마지막 행만 남김)
+2) 파티션마다 별도 프로세스에서 전처리 + 예측 (메모리 사용량 ≈ 파티션 1개)
+3) 결과를 T_ID 순으로 합쳐 CSV 또는 Parquet(.parquet, pyarrow 필요) 으로 저장
+
+CLI:
+  python -m utils.batch_score follow data/follow_sample.csv -o scores.csv
+  python -m utils.batch_score base a.csv b.csv -o scores.parquet --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+import pandas as pd
+
+from utils.io_utils import COLUMNS, iter_chunks, load_df
+from utils.preprocess import FOLLOWUP_INPUT_COLUMNS, base_input_columns
+
+CHUNK_ROWS = 200_000
+
+
+def _progress(msg: str, t0: float):
+    print(f"[batch {time.perf_counter() - t0:7.1f}s] {msg}", file=sys.stderr, flush=True)
+
+
+def _read_chunks(paths, chunk_rows: int, columns=None):
+    """입력 파일들(CSV/Parquet/Feather)을 순서대로 chunk 단위로 읽음 (필요한 컬럼만, compact dtype)"""
+    for path in paths:
+        for chunk in iter_chunks(path, chunk_rows, columns):
+            yield path, chunk
+
+
+def _partition_of(t_id: pd.Series, n_parts: int):
+    # 수치로 맞춰 해시 (chunk 마다 int/float 으로 달리 읽혀도 같은 사용자는 같은 파티션)
+    t_id = pd.to_numeric(t_id, errors="coerce").astype("float64")
+    return pd.util.hash_pandas_object(t_id, index=False).to_numpy() % n_parts
+
+
+def _split(paths, workdir: str, n_parts: int, chunk_rows: int, t0: float) -> list[str]:
+    """follow: 모든 행을 T_ID 해시 파티션 CSV 로 분배 (입력 순서 유지)"""
+    parts = [os.path.join(workdir, f"part{i:04d}.csv") for i in range(n_parts)]
+    written = [False] * n_parts
+    n_rows = 0
+    for path, chunk in _read_chunks(paths, chunk_rows, FOLLOWUP_INPUT_COLUMNS):
+        chunk = chunk[pd.notna(chunk["T_ID"])]
+        for i, part in chunk.groupby(_partition_of(chunk["T_ID"], n_parts), sort=False):
+            part.to_csv(parts[i], mode="a", header=not written[i], index=False, date_format="%Y-%m-%d")
+            written[i] = True
+        n_rows += len(chunk)
+        _progress(f"{os.path.basename(path)}: {n_rows:,}행 분배", t0)
+    return [p for p, w in zip(parts, written) if w]
+
+
+def _last_rows(paths, chunk_rows: int, t0: float) -> pd.DataFrame:
+    """base: 사용자별 마지막 행만 유지 (메모리 ≈ 사용자 수)"""
+    columns = ["T_ID"] + sorted({c for code in ("htn", "dm", "lip") for c in base_input_columns(code)})
+    last = None
+    n_rows = 0
+    for path, chunk in _read_chunks(paths, chunk_rows, columns):
+        chunk = chunk[pd.notna(chunk["T_ID"])]
+        last = chunk if last is None else pd.concat([last, chunk], ignore_index=True)
+        last = last.drop_duplicates("T_ID", keep="last")
+        n_rows += len(chunk)
+        _progress(f"{os.path.basename(path)}: {n_rows:,}행 읽음, 사용자 {len(last):,}명", t0)
+    return last if last is not None else pd.DataFrame(columns=COLUMNS)
+
+
+def _init_worker(kind: str):
+    # 프로세스마다 모델을 한 번만 로딩 (질병 간 스레드 병렬은 프로세스 병렬과 겹치므로 끔)
+    from utils import model_utils
+    for code in model_utils.DISEASES:
+        model_utils.get_model(kind, code)
+
+
+def _score_follow_part(path: str) -> pd.DataFrame:
+    from utils.model_utils import score_population
+    return score_population(load_df(path), workers=1)
+
+
+def _score_base_part(df: pd.DataFrame) -> pd.DataFrame:
+    from utils.model_utils import score_base_population
+    return score_base_population(df, workers=1)
+
+
+def write_scores(out: pd.DataFrame, path: str):
+    """확장자가 .parquet 이면 Parquet(pyarrow 필요), 그 외는 CSV(utf-8-sig)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.lower().endswith(".parquet"):
+        try:
+            out.to_parquet(path, index=False)
+        except ImportError as e:
+            raise SystemExit(f"Parquet 저장에는 pyarrow 가 필요합니다: {e}")
+    else:
+        out.to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def batch_score(kind: str, paths, out_path: str, workers: int = None,
+                partitions: int = None, chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """
+    입력 파일들 → T_ID 별 예측 확률 (T_ID, prob_htn, prob_dm, prob_lip) 저장 후 반환
+    - workers: 프로세스 수 (기본 CPU 수)
+    - partitions: 파티션 수 (기본 workers × 4, follow 만 해당)
+    """
+    if kind not in ("base", "follow"):
+        raise ValueError(f"Unknown model kind: {kind}")
+    workers = workers or os.cpu_count() or 1
+    partitions = partitions or workers * 4
+    t0 = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix="batch_score_") as workdir:
+        if kind == "follow":
+            tasks = _split(paths, workdir, partitions, chunk_rows, t0)
+            func = _score_follow_part
+        else:
+            last = _last_rows(paths, chunk_rows, t0)
+            size = max(1, -(-len(last) // partitions))
+            tasks = [last.iloc[i:i + size] for i in range(0, len(last), size)]
+            func = _score_base_part
+
+        results = []
+        pool = None
+        if workers <= 1 or len(tasks) <= 1:
+            _init_worker(kind)
+            iterator = map(func, tasks)
+        else:
+            pool = Pool(min(workers, len(tasks)), initializer=_init_worker, initargs=(kind,))
+            iterator = pool.imap_unordered(func, tasks)
+        try:
+            for res in iterator:
+                results.append(res)
+                _progress(f"파티션 {len(results)}/{len(tasks)} 완료", t0)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    if results:
+        out = pd.concat(results, ignore_index=True).sort_values("T_ID", kind="stable")
+        out = out.reset_index(drop=True)
+    else:
+        out = pd.DataFrame(columns=["T_ID"] + [f"prob_{c}" for c in ("htn", "dm", "lip")])
+    write_scores(out, out_path)
+    _progress(f"{len(out):,}명 → {out_path}", t0)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="follow_sample.csv 형식 파일 일괄 예측")
+    parser.add_argument("kind", choices=["follow", "base"], help="follow: 10년 후 / base: 단기")
+    parser.add_argument("inputs", nargs="+", help="입력 CSV (io_utils.COLUMNS 스키마)")
+    parser.add_argument("-o", "--out", required=True, help="출력 파일 (.csv 또는 .parquet)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--partitions", type=int, default=None, help="파티션 수 (기본: workers×4)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="한 번에 읽을 행 수")
+    args = parser.parse_args()
+
+    batch_score(args.kind, args.inputs, args.out, workers=args.workers,
+                partitions=args.partitions, chunk_rows=args.chunk_rows)
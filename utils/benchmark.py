@@ -0,0 +1,322 @@
+"""
+utils/benchmark.py
+──────────────────────────────────────────────
+역할:
+- follow_sample.csv 스키마의 합성 이력(행 1 ~ 10^6, 사용자 1 ~ 10^5)을 만들어
+  저장/로드/전처리/모델 로딩/추론 지연 시간을 측정
+- 항목별 p50 / p99 / 평균(ms) + 처리량(단위/초)을 JSON 으로 저장 → 커밋 간 비교
+
+측정 항목:
+- append_row           : n행이 쌓인 저장소(임시 디렉터리)에 1행 추가
+- load_df              : n행 CSV 전체 로드
+- load_user_state      : 누적 상태 조회 (10년 후 화면 경로)
+- preprocess_base/dm, preprocess_base/htn_lip : 1행 전처리
+- preprocess_base_many/{dm,htn_lip}           : n행 일괄 전처리
+- preprocess_followup  : 사용자 1명 이력(n/사용자 수 행) 전처리
+- preprocess_followup_many : n행 × 사용자 전체 일괄 전처리
+- model_load/{kind}_{disease} : joblib 파일 역직렬화 (레지스트리 미사용)
+- predict_proba/{kind}_{disease}/{1|batch}    : 1행 / n행 예측
+
+CLI:
+  python -m utils.benchmark                           # 기본 크기 (1:1, 100:10, 10000:1000)
+  python -m utils.benchmark --sizes 1000000:100000 -o bench.json
+  python -m utils.benchmark --compare old.json new.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils import io_utils
+from utils.io_utils import COLUMNS, MODEL_DIR
+from utils.preprocess import (
+    preprocess_base, preprocess_base_many, preprocess_followup, preprocess_followup_many,
+)
+
+DEFAULT_SIZES = [(1, 1), (100, 10), (10_000, 1_000)]
+BATCH_ROWS = 10_000  # 일괄 예측 측정에 쓸 최대 행 수
+
+
+# -------------------------------
+# 합성 데이터
+# -------------------------------
+# (컬럼, 값 후보) — 코드형 항목은 입력 폼과 같은 값 범위, -1 은 미응답
+_CODES = {
+    "CHILD": [-1, 1, 2], "SEX": [1, 2], "MNSAG": [-1, 12, 13, 14, 15], "EDU": [-1, 1, 2, 3, 4],
+    "SMAG": [-1, 0, 18, 20, 25], "T_DRINK": [-1, 1, 2], "T_SMOKE": [-1, 1, 2, 3],
+    "HTN": [-1, 1, 2], "DM": [-1, 1, 2], "LIP": [-1, 1, 2],
+    "FMMHT": [-1, 1, 2], "FMFHT": [-1, 1, 2], "FMMDM": [-1, 1, 2], "FMFDM": [-1, 1, 2],
+    "EXER": [-1, 1, 2],
+}
+# (컬럼, 평균, 표준편차, 소수 자릿수)
+_MEASURES = [
+    ("T_DRINKAM", 2, 2, 1), ("T_SMOKEAM", 3, 5, 1),
+    ("WEIGHT", 68, 12, 1), ("HEIGHT", 166, 9, 1), ("WAIST", 84, 10, 1), ("HIP", 95, 7, 1),
+    ("SBP", 122, 15, 0), ("DBP", 78, 10, 0), ("PULSE", 72, 10, 0),
+    ("HBA1C", 5.7, 0.7, 1), ("GLU", 95, 18, 0), ("HOMAIR", 2, 1, 1),
+    ("TCHL", 195, 35, 0), ("HDL", 50, 12, 0), ("TG", 140, 70, 0),
+    ("AST", 25, 10, 0), ("ALT", 24, 14, 0), ("CREATININE", 0.9, 0.2, 2),
+]
+
+
+def synthetic_history(n_rows: int, n_users: int, seed: int = 0, missing: float = 0.05) -> pd.DataFrame:
+    """
+    follow_sample.csv 스키마의 합성 이력 n_rows 행 (사용자 n_users 명, 사용자 순으로 섞이지 않은 저장 순서)
+    - 사용자별 고정 속성(성별/가족력 등)은 사용자마다 한 값, 측정값은 시점마다 변동
+    - missing 비율만큼 측정값을 -1(미입력)로
+    """
+    rng = np.random.default_rng(seed)
+    n_users = max(1, min(n_users, n_rows))
+    t_id = np.sort(rng.integers(0, n_users, n_rows))
+    t_id[:n_users] = np.arange(n_users)  # 모든 사용자가 최소 1행
+    t_id = np.sort(t_id) + 1
+
+    data = {"T_ID": t_id}
+    days = rng.integers(0, 3650, n_rows)
+    data["EDATE"] = (np.datetime64("2015-01-01") + days.astype("timedelta64[D]")).astype(str)
+    for col, values in _CODES.items():
+        per_user = rng.choice(values, n_users + 1)
+        data[col] = per_user[t_id]
+    data["T_AGE"] = rng.integers(20, 80, n_users + 1)[t_id]
+    for col, mean, std, digits in _MEASURES:
+        v = np.round(np.abs(rng.normal(mean, std, n_rows)), digits)
+        v[rng.random(n_rows) < missing] = -1
+        data[col] = v
+    return pd.DataFrame(data)[COLUMNS]
+
+
+# -------------------------------
+# 측정 도구
+# -------------------------------
+def _measure(fn, repeat: int, warmup: int = 1) -> np.ndarray:
+    for _ in range(warmup):
+        fn()
+    times = np.empty(repeat)
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times[i] = time.perf_counter() - t0
+    return times
+
+
+def _result(name: str, times: np.ndarray, items: int = 1, unit: str = "call", **extra) -> dict:
+    mean = float(times.mean())
+    return {
+        "name": name,
+        "n": len(times),
+        "p50_ms": float(np.percentile(times, 50) * 1000),
+        "p99_ms": float(np.percentile(times, 99) * 1000),
+        "mean_ms": mean * 1000,
+        "throughput_per_s": items / mean if mean > 0 else None,
+        "unit": unit,
+        **extra,
+    }
+
+
+@contextlib.contextmanager
+def _isolated_store(workdir: str):
+    """io_utils 의 CSV/인덱스 경로를 임시 디렉터리로 잠시 교체 (실제 data/ 보호, 잠금 파일도 CSV 경로를 따라감)"""
+    saved = io_utils.DATA_DIR, io_utils.CSV_PATH, io_utils.INDEX_PATH
+    io_utils.DATA_DIR = workdir
+    io_utils.CSV_PATH = os.path.join(workdir, "follow_sample.csv")
+    io_utils.INDEX_PATH = os.path.join(workdir, "follow_index.sqlite")
+    try:
+        yield
+    finally:
+        io_utils.DATA_DIR, io_utils.CSV_PATH, io_utils.INDEX_PATH = saved
+
+
+def _repeat_for(n_rows: int, base: int) -> int:
+    """큰 입력일수록 반복 횟수를 줄여 전체 시간을 제한"""
+    return max(3, min(base, int(base * 1000 / max(n_rows, 1))))
+
+
+# -------------------------------
+# 항목별 측정
+# -------------------------------
+def bench_storage(df: pd.DataFrame, repeat: int) -> list:
+    n_rows, n_users = len(df), int(df["T_ID"].nunique())
+    tags = {"rows": n_rows, "users": n_users}
+    out = []
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir, _isolated_store(workdir):
+        df.to_csv(io_utils.CSV_PATH, index=False, encoding="utf-8-sig")
+        out.append(_result("load_df", _measure(io_utils.load_df, _repeat_for(n_rows, repeat)),
+                           items=n_rows, unit="row", **tags))
+
+        row = df.iloc[-1].to_dict()
+        t_id = row["T_ID"]
+        io_utils.append_row(row)   # 인덱스 구축 + 해당 사용자 상태 생성 (측정 제외)
+        out.append(_result("append_row", _measure(lambda: io_utils.append_row(row), repeat, warmup=0),
+                           unit="row", **tags))
+        out.append(_result("load_user_state", _measure(lambda: io_utils.load_user_state(t_id), repeat),
+                           **tags))
+    return out
+
+
+def bench_preprocess(df: pd.DataFrame, repeat: int) -> list:
+    n_rows, n_users = len(df), int(df["T_ID"].nunique())
+    tags = {"rows": n_rows, "users": n_users}
+    row_df = df.iloc[[-1]]
+    out = [
+        _result("preprocess_base/dm", _measure(lambda: preprocess_base(row_df, "dm"), repeat), **tags),
+        _result("preprocess_base/htn_lip", _measure(lambda: preprocess_base(row_df, "htn"), repeat), **tags),
+    ]
+    many_repeat = _repeat_for(n_rows, repeat)
+    for disease, label in (("dm", "dm"), ("htn", "htn_lip")):
+        out.append(_result(f"preprocess_base_many/{label}",
+                           _measure(lambda d=disease: preprocess_base_many(df, d), many_repeat),
+                           items=n_rows, unit="row", **tags))
+
+    user = df[df["T_ID"] == df["T_ID"].iloc[-1]].copy()
+    user["EDATE"] = pd.to_datetime(user["EDATE"], errors="coerce")
+    out.append(_result("preprocess_followup", _measure(lambda: preprocess_followup(user), repeat),
+                       history=len(user), **tags))
+    out.append(_result("preprocess_followup_many", _measure(lambda: preprocess_followup_many(df), many_repeat),
+                       items=n_users, unit="user", **tags))
+    return out
+
+
+def _model_files():
+    for kind in ("base", "follow"):
+        for disease in ("htn", "dm", "lip"):
+            path = os.path.join(MODEL_DIR, f"{kind}_model_{disease}.joblib")
+            if os.path.exists(path):
+                yield kind, disease, path
+
+
+def bench_models(df: pd.DataFrame, repeat: int) -> list:
+    """모델 로딩(파일별) + 1행 / 일괄 predict_proba"""
+    out = []
+    batch = df.iloc[:BATCH_ROWS]
+    X_follow_batch = preprocess_followup_many(batch)
+    X_follow_one = X_follow_batch.iloc[[0]]
+    for kind, disease, path in _model_files():
+        label = f"{kind}_{disease}"
+        out.append(_result(f"model_load/{label}", _measure(lambda p=path: joblib.load(p), max(3, repeat // 10)),
+                           bytes=os.path.getsize(path)))
+        model = joblib.load(path)
+        if kind == "base":
+            X_batch = preprocess_base_many(batch, disease)
+            X_one = X_batch.iloc[[0]]
+        else:
+            X_batch, X_one = X_follow_batch, X_follow_one
+        out.append(_result(f"predict_proba/{label}/1", _measure(lambda: model.predict_proba(X_one), repeat)))
+        out.append(_result(f"predict_proba/{label}/batch",
+                           _measure(lambda: model.predict_proba(X_batch), _repeat_for(len(X_batch), repeat)),
+                           items=len(X_batch), unit="row", rows=len(X_batch)))
+    return out
+
+
+def run(sizes=DEFAULT_SIZES, repeat: int = 50, seed: int = 0, log=print) -> dict:
+    results = []
+    for n_rows, n_users in sizes:
+        t0 = time.perf_counter()
+        df = synthetic_history(n_rows, n_users, seed)
+        for part in (bench_storage, bench_preprocess):
+            results.extend(part(df, repeat))
+        log(f"rows={n_rows:,} users={n_users:,}  {time.perf_counter() - t0:.1f}s")
+
+    # 모델 항목은 입력 크기와 무관 → 가장 큰 합성 데이터에서 한 번만
+    n_rows, n_users = max(sizes)
+    results.extend(bench_models(synthetic_history(min(n_rows, BATCH_ROWS), n_users, seed), repeat))
+    return {"meta": _meta(repeat, seed), "results": results}
+
+
+def _meta(repeat: int, seed: int) -> dict:
+    versions = {}
+    for name in ("numpy", "pandas", "sklearn", "xgboost", "lightgbm", "joblib"):
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=io_utils.ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "seed": seed,
+        "versions": versions,
+    }
+
+
+# -------------------------------
+# 출력 / 비교
+# -------------------------------
+def _key(r: dict):
+    return r["name"], r.get("rows"), r.get("users")
+
+
+def format_results(report: dict) -> str:
+    lines = [f"{'항목':<40} {'rows':>9} {'users':>7} {'p50 ms':>10} {'p99 ms':>10} {'처리량/s':>14}"]
+    for r in report["results"]:
+        tp = f"{r['throughput_per_s']:,.0f} {r['unit']}" if r["throughput_per_s"] else "-"
+        lines.append(f"{r['name']:<40} {r.get('rows', ''):>9} {r.get('users', ''):>7} "
+                     f"{r['p50_ms']:>10.3f} {r['p99_ms']:>10.3f} {tp:>14}")
+    return "\n".join(lines)
+
+
+def compare(old: dict, new: dict) -> str:
+    """두 결과 JSON 의 p50 비교 (new / old, 1 보다 크면 느려짐)"""
+    base = {_key(r): r for r in old["results"]}
+    lines = [f"{old['meta'].get('commit')} → {new['meta'].get('commit')}",
+             f"{'항목':<40} {'rows':>9} {'old p50':>10} {'new p50':>10} {'ratio':>7}"]
+    for r in new["results"]:
+        o = base.get(_key(r))
+        if o is None:
+            continue
+        ratio = r["p50_ms"] / o["p50_ms"] if o["p50_ms"] else float("nan")
+        flag = "  ▲" if ratio > 1.2 else ""
+        lines.append(f"{r['name']:<40} {r.get('rows', ''):>9} {o['p50_ms']:>10.3f} {r['p50_ms']:>10.3f} "
+                     f"{ratio:>7.2f}{flag}")
+    return "\n".join(lines)
+
+
+def _parse_sizes(text: str):
+    sizes = []
+    for item in text.split(","):
+        rows, _, users = item.partition(":")
+        rows = int(float(rows))
+        sizes.append((rows, int(float(users)) if users else max(1, rows // 10)))
+    return sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="전처리/모델 로딩/추론 벤치마크")
+    parser.add_argument("--sizes", default=",".join(f"{r}:{u}" for r, u in DEFAULT_SIZES),
+                        help="행:사용자 목록 (예: 1:1,100:10,1e6:1e5)")
+    parser.add_argument("--repeat", type=int, default=50, help="항목별 반복 횟수 (큰 입력은 자동 축소)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--out", default=None, help="결과 JSON 경로")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="두 결과 JSON 비교만 수행")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f_old, open(args.compare[1], encoding="utf-8") as f_new:
+            print(compare(json.load(f_old), json.load(f_new)))
+        sys.exit(0)
+
+    report = run(_parse_sizes(args.sizes), repeat=args.repeat, seed=args.seed,
+                 log=lambda msg: print(msg, file=sys.stderr, flush=True))
+    print(format_results(report))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,559 @@
+"""
+utils/compiled_model.py
+──────────────────────────────────────────────
+역할:
+- models/*.joblib (sklearn Pipeline / XGBoost / LightGBM / LogisticRegression) 를
+  배열 기반 경량 포맷(.npz)으로 변환 (노드 피처/임계값/자식/리프 배열)
+- NumPy 만으로 동작하는 벡터화 평가기 (원본 predict_proba 와 같은 확률)
+  → 1행 예측의 래퍼 오버헤드 제거, 로딩 시 xgboost/lightgbm/sklearn import 불필요
+
+지원 범위:
+- 전처리: StandardScaler, OneHotEncoder(handle_unknown="ignore", drop=None), ColumnTransformer(remainder="drop")
+- 분류기: XGBClassifier(gbtree, binary:logistic), LGBMClassifier(binary, 수치 분기), LogisticRegression(이진)
+- 행별 입력 피처 기여도 (Explainer / input_contributions: 부스터 내장 TreeSHAP / 선형 coef×(x−학습 평균))
+
+CLI:
+  python -m utils.compiled_model export   # models/compiled/*.npz 생성 + 원본과 확률 비교
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# LightGBM 의 0 판정 임계값 (kZeroThreshold)
+_LGBM_ZERO = 1e-35
+
+# 결측 처리 방식 (노드별)
+MISSING_NAN = 0    # NaN 이면 기본 방향 (XGBoost, LightGBM missing_type=NaN)
+MISSING_ZERO = 1   # NaN→0 으로 본 뒤 0 이면 기본 방향 (LightGBM missing_type=Zero)
+MISSING_NONE = 2   # NaN→0 으로 보고 그대로 비교 (LightGBM missing_type=None)
+
+
+# -------------------------------
+# 변환 (export)
+# -------------------------------
+def _export_scaler(scaler, n: int):
+    """→ (변환에 쓰는 평균, 스케일, 학습 평균) — with_mean=False 여도 학습 평균(mean_)은 기여도 기준점으로 보관"""
+    fitted = getattr(scaler, "mean_", None)
+    center = np.asarray(fitted if fitted is not None else np.zeros(n), dtype="float64")
+    mean = center if getattr(scaler, "with_mean", True) else np.zeros(n)
+    scale = scaler.scale_ if getattr(scaler, "with_std", True) and scaler.scale_ is not None else np.ones(n)
+    return np.asarray(mean, dtype="float64"), np.asarray(scale, dtype="float64"), center
+
+
+def _export_preprocess(steps, input_names):
+    """
+    Pipeline 의 전처리 단계들 → 수치 컬럼(입력 인덱스, 평균, 스케일, 학습 평균) + 원핫 컬럼(입력 인덱스, 카테고리)
+    출력 피처 순서 = [수치 컬럼..., 원핫 컬럼별 카테고리...]
+    """
+    if len(steps) > 1:
+        raise ValueError("전처리 단계는 1개(StandardScaler 또는 ColumnTransformer)만 지원합니다.")
+
+    step = steps[0]
+    name = type(step).__name__
+    if name == "StandardScaler":
+        mean, scale, center = _export_scaler(step, step.n_features_in_)
+        return {"num_idx": np.arange(step.n_features_in_), "num_mean": mean, "num_scale": scale,
+                "num_center": center, "cat": []}
+
+    if name != "ColumnTransformer":
+        raise ValueError(f"지원하지 않는 전처리 단계: {name}")
+    if step.remainder != "drop":
+        raise ValueError("ColumnTransformer(remainder='drop') 만 지원합니다.")
+
+    pos = {c: i for i, c in enumerate(input_names)}
+    num_idx, num_mean, num_scale, num_center, cat = [], [], [], [], []
+    for _, trans, cols in step.transformers_:
+        if trans == "drop" or len(cols) == 0:
+            continue
+        idx = [pos[c] for c in cols]
+        tname = type(trans).__name__
+        if tname == "StandardScaler":
+            mean, scale, center = _export_scaler(trans, len(idx))
+        elif trans == "passthrough":
+            mean, scale, center = np.zeros(len(idx)), np.ones(len(idx)), np.zeros(len(idx))
+        elif tname == "OneHotEncoder":
+            if trans.drop is not None or trans.handle_unknown != "ignore":
+                raise ValueError("OneHotEncoder(drop=None, handle_unknown='ignore') 만 지원합니다.")
+            for i, cats in zip(idx, trans.categories_):
+                cat.append((i, [str(c) for c in cats]))
+            continue
+        else:
+            raise ValueError(f"지원하지 않는 변환기: {tname}")
+        if cat:
+            raise ValueError("수치 변환기는 원핫 변환기보다 앞에 있어야 합니다.")
+        num_idx.extend(idx)
+        num_mean.append(mean)
+        num_scale.append(scale)
+        num_center.append(center)
+
+    return {
+        "num_idx": np.array(num_idx, dtype=int),
+        "num_mean": np.concatenate(num_mean) if num_mean else np.zeros(0),
+        "num_scale": np.concatenate(num_scale) if num_scale else np.ones(0),
+        "num_center": np.concatenate(num_center) if num_center else np.zeros(0),
+        "cat": cat,
+    }
+
+
+def _xgb_trees(clf):
+    """XGBClassifier → 노드 배열 + 초기 마진"""
+    booster = clf.get_booster()
+    config = json.loads(booster.save_config())
+    learner = config["learner"]
+    if learner["objective"]["name"] != "binary:logistic":
+        raise ValueError(f"지원하지 않는 XGBoost objective: {learner['objective']['name']}")
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise ValueError("XGBoost gbtree 부스터만 지원합니다.")
+    base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+
+    names = booster.feature_names
+    fpos = {n: i for i, n in enumerate(names)} if names else None
+
+    dumps = booster.get_dump(dump_format="json")
+    best = getattr(booster, "best_iteration", None)
+    if best is not None:
+        dumps = dumps[: (best + 1) * max(int(getattr(clf, "num_parallel_tree", None) or 1), 1)]
+
+    nodes = []  # (feature, threshold, left, right, missing_left, value) - 전역 인덱스
+    roots = []
+    for dump in dumps:
+        tree = json.loads(dump)
+        base = len(nodes)
+        flat = {}
+
+        def walk(node):
+            flat[node["nodeid"]] = node
+            for child in node.get("children", []):
+                walk(child)
+
+        walk(tree)
+        order = sorted(flat)
+        local = {nid: base + i for i, nid in enumerate(order)}
+        for nid in order:
+            node = flat[nid]
+            if "leaf" in node:
+                nodes.append((-1, 0.0, -1, -1, False, float(node["leaf"])))
+            else:
+                f = fpos[node["split"]] if fpos else int(node["split"][1:])
+                nodes.append((f, float(node["split_condition"]), local[node["yes"]], local[node["no"]],
+                              node["missing"] == node["yes"], 0.0))
+        roots.append(local[tree["nodeid"]])
+
+    arrays = _node_arrays(nodes, roots, missing_type=None)
+    arrays["base_margin"] = float(np.log(base_score / (1 - base_score)))
+    arrays["decision"] = "lt32"
+    arrays["sigmoid"] = 1.0
+    return arrays
+
+
+def _lgbm_trees(clf):
+    """LGBMClassifier → 노드 배열"""
+    booster = clf.booster_
+    dump = booster.dump_model()
+    objective = dump.get("objective", "")
+    if not objective.startswith("binary"):
+        raise ValueError(f"지원하지 않는 LightGBM objective: {objective}")
+    sigmoid = 1.0
+    for part in objective.split():
+        if part.startswith("sigmoid:"):
+            sigmoid = float(part.split(":")[1])
+
+    trees = dump["tree_info"]
+    best = booster.best_iteration
+    if best and best > 0:
+        trees = trees[:best]
+
+    nodes, roots, missing = [], [], []
+    for info in trees:
+        def walk(node):
+            me = len(nodes)
+            nodes.append(None)
+            missing.append(MISSING_NAN)
+            if "leaf_value" in node:
+                nodes[me] = (-1, 0.0, -1, -1, False, float(node["leaf_value"]))
+                return me
+            if node["decision_type"] != "<=":
+                raise ValueError("LightGBM 범주형 분기는 지원하지 않습니다.")
+            left = walk(node["left_child"])
+            right = walk(node["right_child"])
+            nodes[me] = (int(node["split_feature"]), float(node["threshold"]), left, right,
+                         bool(node["default_left"]), 0.0)
+            missing[me] = {"NaN": MISSING_NAN, "Zero": MISSING_ZERO}.get(node["missing_type"], MISSING_NONE)
+            return me
+
+        roots.append(walk(info["tree_structure"]))
+
+    arrays = _node_arrays(nodes, roots, missing_type=missing)
+    arrays["base_margin"] = 0.0
+    arrays["decision"] = "le"
+    arrays["sigmoid"] = sigmoid
+    return arrays
+
+
+def _node_arrays(nodes, roots, missing_type):
+    feature, threshold, left, right, missing_left, value = (np.array(c) for c in zip(*nodes))
+    n = len(nodes)
+
+    # 트리 최대 깊이 (평가 루프 횟수)
+    depth = np.zeros(n, dtype=int)
+    for i in range(n):  # 부모가 항상 자식보다 앞 인덱스
+        if feature[i] >= 0:
+            depth[left[i]] = depth[right[i]] = depth[i] + 1
+
+    return {
+        "feature": feature.astype("int32"),
+        "threshold": threshold.astype("float64"),
+        "left": left.astype("int32"),
+        "right": right.astype("int32"),
+        "missing_left": missing_left.astype(bool),
+        "missing_type": (np.zeros(n) if missing_type is None else np.array(missing_type)).astype("int8"),
+        "value": value.astype("float64"),
+        "roots": np.array(roots, dtype="int32"),
+        "max_depth": int(depth.max()) if n else 0,
+    }
+
+
+def _fold_inputs(values: np.ndarray, layout: dict, n_features: int) -> np.ndarray:
+    """분류기 입력 피처 축(마지막 축) → 원래 입력 피처 축 (원핫 컬럼들은 범주형 입력 컬럼 하나로 합산)"""
+    flat = values.reshape(-1, values.shape[-1])
+    out = np.zeros((flat.shape[0], n_features))
+    off = len(layout["num_idx"])
+    np.add.at(out, (slice(None), layout["num_idx"]), flat[:, :off])
+    for idx, cats in layout["cat"]:
+        out[:, idx] += flat[:, off:off + len(cats)].sum(axis=1)
+        off += len(cats)
+    if off != flat.shape[1]:
+        raise ValueError(f"전처리 출력({off})과 분류기 입력({flat.shape[1]}) 피처 수가 다릅니다.")
+    return out.reshape(values.shape[:-1] + (n_features,))
+
+
+def _split_model(model):
+    """모델 → (분류기, 전처리 단계 목록, 입력 레이아웃, 입력 피처 수)"""
+    steps = list(model.steps) if type(model).__name__ == "Pipeline" else [("clf", model)]
+    clf = steps[-1][1]
+    prep_steps = [s for _, s in steps[:-1] if s != "passthrough" and s is not None]
+
+    input_names = getattr(model, "feature_names_in_", None)
+    input_names = [str(c) for c in input_names] if input_names is not None else None
+    n_features = int(getattr(model, "n_features_in_", len(input_names or [])))
+    if prep_steps:
+        layout = _export_preprocess(prep_steps, input_names)
+    else:
+        layout = {"num_idx": np.arange(n_features), "cat": []}
+    return clf, prep_steps, layout, n_features
+
+
+def input_importances(model) -> np.ndarray:
+    """
+    입력 피처(feature_names_in_ 순서)별 중요도
+    - 트리 분류기: feature_importances_, 선형 분류기: |coef| (스케일링된 피처 기준)
+    - 원핫 컬럼들의 중요도는 원래 범주형 입력 컬럼 하나로 합산
+    """
+    clf, _, layout, n_features = _split_model(model)
+    if hasattr(clf, "feature_importances_"):
+        out = np.asarray(clf.feature_importances_, dtype="float64")
+    elif hasattr(clf, "coef_"):
+        out = np.abs(np.asarray(clf.coef_, dtype="float64")[0])
+    else:
+        raise ValueError(f"중요도를 구할 수 없는 분류기: {type(clf).__name__}")
+    return _fold_inputs(out, layout, n_features)
+
+
+class Explainer:
+    """
+    모델 1개의 행별 · 입력 피처별 예측 기여도 계산기 (로그오즈 단위)
+    - 행마다 기여도 합 + 기준값 = 분류기 마진 (predict_proba 확률의 로짓)
+    - XGBoost: pred_contribs, LightGBM: pred_contrib (부스터 내장 TreeSHAP, 배치 1회 호출)
+    - 선형: coef × (x − 학습 평균) / scale (스케일러 with_mean=False 여도 fitted mean_ 기준으로 중심화,
+      기준값 = intercept + Σ coef × 학습 평균 / scale), 원핫 컬럼은 0 기준
+    - 전처리(스케일링/원핫)는 생성 시 NumPy 배열 연산으로 변환해 두어 호출마다 sklearn 변환 오버헤드 없음
+    - 원핫 컬럼들의 기여도는 원래 범주형 입력 컬럼 하나로 합산
+    - CompiledModel 은 선형만 지원 (트리 기여도 / 학습 평균이 없는 예전 파일은 원본 모델 필요 → ValueError)
+    """
+
+    def __init__(self, model):
+        if isinstance(model, CompiledModel):
+            if model.c["type"] != "linear":
+                raise ValueError("compiled 트리 모델은 기여도 계산을 지원하지 않습니다.")
+            if "num_center" not in model.c:
+                raise ValueError("학습 평균(num_center)이 없는 compiled 파일입니다. (다시 export 필요)")
+            self.clf, self.layout, self.n_features = None, model.c, model.n_features_in_
+            self._prep = model
+            self._z_center = self._center(model.c, len(model.c["coef"]))
+            return
+
+        self.clf, prep_steps, self.layout, self.n_features = _split_model(model)
+        if type(self.clf).__name__ not in ("XGBClassifier", "LGBMClassifier", "LogisticRegression"):
+            raise ValueError(f"기여도를 구할 수 없는 분류기: {type(self.clf).__name__}")
+        self._prep = None
+        if prep_steps:
+            names = getattr(model, "feature_names_in_", None)
+            self._prep = CompiledModel({
+                "input_names": [str(c) for c in names] if names is not None else None,
+                "n_features": self.n_features, **self.layout,
+            })
+        n_z = len(self.clf.coef_[0]) if hasattr(self.clf, "coef_") else 0
+        self._z_center = self._center(self.layout, n_z)
+
+    @staticmethod
+    def _center(layout: dict, n_z: int) -> np.ndarray:
+        """선형 기여도 기준점 (분류기 입력 공간): 수치 = (학습 평균 − 변환 평균) / scale, 원핫 = 0"""
+        z = np.zeros(n_z)
+        if "num_center" in layout and n_z:
+            k = len(layout["num_idx"])
+            z[:k] = (layout["num_center"] - layout["num_mean"]) / layout["num_scale"]
+        return z
+
+    def contributions(self, X):
+        """→ (n × 입력 피처 수 배열, 기준값 길이 n 배열)"""
+        Z = self._prep._transform(X) if self._prep is not None else X
+        cname = type(self.clf).__name__
+        if self.clf is None:  # compiled 선형
+            coef, intercept = self.layout["coef"], float(self.layout["intercept"])
+            contrib = (Z - self._z_center) * coef
+            bias = np.full(len(Z), intercept + float(coef @ self._z_center))
+        elif cname == "XGBClassifier":
+            import xgboost
+
+            out = self.clf.get_booster().predict(
+                xgboost.DMatrix(Z, missing=self.clf.missing), pred_contribs=True
+            )
+            contrib, bias = out[:, :-1], out[:, -1]
+        elif cname == "LGBMClassifier":
+            out = self.clf.predict(Z, pred_contrib=True)
+            contrib, bias = out[:, :-1], out[:, -1]
+        else:
+            coef = self.clf.coef_[0]
+            contrib = (np.asarray(Z, dtype="float64") - self._z_center) * coef
+            bias = np.full(len(contrib), float(self.clf.intercept_[0]) + float(coef @ self._z_center))
+        return _fold_inputs(np.asarray(contrib, dtype="float64"), self.layout, self.n_features), \
+            np.asarray(bias, dtype="float64")
+
+
+def input_contributions(model, X):
+    """행별 · 입력 피처별 예측 기여도 (Explainer 1회용 래퍼) → (n × 입력 피처 수, 기준값 n)"""
+    return Explainer(model).contributions(X)
+
+
+def export_model(model) -> dict:
+    """
+    학습된 모델 → 배열 기반 dict (save_compiled 로 .npz 저장)
+    """
+    steps = list(model.steps) if type(model).__name__ == "Pipeline" else [("clf", model)]
+    clf = steps[-1][1]
+    prep_steps = [s for _, s in steps[:-1] if s != "passthrough" and s is not None]
+
+    input_names = getattr(model, "feature_names_in_", None)
+    input_names = [str(c) for c in input_names] if input_names is not None else None
+    n_features = int(getattr(model, "n_features_in_", len(input_names or [])))
+
+    if prep_steps:
+        prep = _export_preprocess(prep_steps, input_names)
+    else:
+        prep = {"num_idx": np.arange(n_features), "num_mean": np.zeros(n_features),
+                "num_scale": np.ones(n_features), "num_center": np.zeros(n_features), "cat": []}
+
+    cname = type(clf).__name__
+    if cname == "XGBClassifier":
+        body = _xgb_trees(clf)
+        body["type"] = "trees"
+    elif cname == "LGBMClassifier":
+        body = _lgbm_trees(clf)
+        body["type"] = "trees"
+    elif cname == "LogisticRegression":
+        if clf.coef_.shape[0] != 1:
+            raise ValueError("이진 LogisticRegression 만 지원합니다.")
+        body = {"type": "linear", "coef": clf.coef_[0].astype("float64"),
+                "intercept": float(clf.intercept_[0]), "sigmoid": 1.0}
+    else:
+        raise ValueError(f"지원하지 않는 분류기: {cname}")
+
+    return {"input_names": input_names, "n_features": n_features,
+            "classes": [int(c) for c in clf.classes_], "importances": input_importances(model),
+            **prep, **body}
+
+
+# -------------------------------
+# 저장 / 로드 (.npz, pickle 미사용)
+# -------------------------------
+_META_KEYS = ("type", "decision", "sigmoid", "base_margin", "intercept", "max_depth",
+              "input_names", "n_features", "classes", "source_sha256")
+
+
+def save_compiled(compiled: dict, path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    meta = {k: compiled[k] for k in _META_KEYS if k in compiled}
+    arrays = {k: v for k, v in compiled.items() if k not in _META_KEYS and k != "cat"}
+    for j, (idx, cats) in enumerate(compiled.get("cat", [])):
+        arrays[f"cat{j}_idx"] = np.array(idx)
+        arrays[f"cat{j}_values"] = np.array(cats, dtype=str)
+    meta["n_cat"] = len(compiled.get("cat", []))
+    with open(path, "wb") as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+
+
+def load_compiled(path_or_file) -> "CompiledModel":
+    with np.load(path_or_file, allow_pickle=False) as data:
+        compiled = {k: data[k] for k in data.files if k != "meta"}
+        meta = json.loads(str(data["meta"]))
+    cat = []
+    for j in range(meta.pop("n_cat", 0)):
+        cat.append((int(compiled.pop(f"cat{j}_idx")), [str(v) for v in compiled.pop(f"cat{j}_values")]))
+    compiled.update(meta)
+    compiled["cat"] = cat
+    return CompiledModel(compiled)
+
+
+# -------------------------------
+# 평가기
+# -------------------------------
+class CompiledModel:
+    """
+    export_model 결과를 감싼 예측기 (sklearn 분류기와 같은 predict / predict_proba 인터페이스)
+    """
+
+    def __init__(self, compiled: dict):
+        self.c = compiled
+        names = compiled.get("input_names")
+        self.feature_names_in_ = np.array(names, dtype=object) if names else None
+        self.n_features_in_ = int(compiled["n_features"])
+        self.classes_ = np.array(compiled.get("classes", [0, 1]))
+        # 입력 피처별 중요도 (export 시 원본 모델에서 계산해 둔 값, 없으면 None)
+        self.input_importances_ = compiled.get("importances")
+        self._cat_lookup = [(idx, {v: k for k, v in enumerate(cats)}) for idx, cats in compiled["cat"]]
+
+    def _transform(self, X) -> np.ndarray:
+        """입력 → 분류기가 보는 피처 행렬 (스케일링 + 원핫)"""
+        c = self.c
+        num_idx = c["num_idx"]
+        if isinstance(X, pd.DataFrame):
+            pos = np.arange(X.shape[1])
+            if self.feature_names_in_ is not None:
+                pos = X.columns.get_indexer(self.feature_names_in_)
+                if (pos < 0).any():
+                    missing = [n for n, p in zip(self.feature_names_in_, pos) if p < 0]
+                    raise KeyError(f"입력에 없는 컬럼: {missing}")
+            sub = X.iloc[:, pos[num_idx]]
+            if all(pd.api.types.is_numeric_dtype(t) for t in sub.dtypes):
+                num = sub.to_numpy(dtype="float64", na_value=np.nan)
+            else:
+                num = sub.apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            cat_values = [X.iloc[:, pos[idx]].to_numpy() for idx, _ in self._cat_lookup]
+        else:
+            X = np.asarray(X)
+            if X.ndim == 1:
+                X = X[None, :]
+            num = X[:, num_idx].astype("float64")
+            cat_values = [X[:, idx] for idx, _ in self._cat_lookup]
+
+        num = (num - c["num_mean"]) / c["num_scale"]
+        if not self._cat_lookup:
+            return num
+
+        n = num.shape[0]
+        blocks = [num]
+        for values, (_, lookup) in zip(cat_values, self._cat_lookup):
+            onehot = np.zeros((n, len(lookup)))
+            hit = np.array([lookup.get(str(v), -1) for v in values], dtype=int)
+            rows = np.flatnonzero(hit >= 0)
+            onehot[rows, hit[rows]] = 1.0
+            blocks.append(onehot)
+        return np.hstack(blocks)
+
+    def decision_function(self, X) -> np.ndarray:
+        c = self.c
+        Z = self._transform(X)
+        if c["type"] == "linear":
+            return Z @ c["coef"] + c["intercept"]
+        return _eval_trees(c, Z)
+
+    def predict_proba(self, X) -> np.ndarray:
+        margin = self.decision_function(X) * self.c.get("sigmoid", 1.0)
+        p1 = 1.0 / (1.0 + np.exp(-margin))
+        return np.column_stack([1.0 - p1, p1])
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
+
+
+def _eval_trees(c: dict, Z: np.ndarray) -> np.ndarray:
+    """모든 행 × 모든 트리를 깊이 단위로 동시에 내려가며 리프 값 합산"""
+    feature, left, right = c["feature"], c["left"], c["right"]
+    missing_left, missing_type = c["missing_left"], c["missing_type"]
+    if c["decision"] == "lt32":
+        # XGBoost: float32 로 변환한 값 < float32 임계값
+        Z = Z.astype("float32")
+        threshold = c["threshold"].astype("float32")
+    else:
+        threshold = c["threshold"]
+
+    n = Z.shape[0]
+    node = np.broadcast_to(c["roots"], (n, len(c["roots"]))).copy()
+    rows = np.arange(n)[:, None]
+    for _ in range(int(c["max_depth"])):
+        f = feature[node]
+        inner = f >= 0
+        if not inner.any():
+            break
+        x = Z[rows, np.maximum(f, 0)]
+        mt = missing_type[node]
+        nan = np.isnan(x)
+        x = np.where(nan & (mt != MISSING_NAN), 0, x)
+        is_missing = np.where(mt == MISSING_NAN, nan, (mt == MISSING_ZERO) & (np.abs(x) <= _LGBM_ZERO))
+        if c["decision"] == "lt32":
+            go_left = x < threshold[node]
+        else:
+            go_left = x <= threshold[node]
+        go_left = np.where(is_missing, missing_left[node], go_left)
+        node = np.where(inner, np.where(go_left, left[node], right[node]), node)
+
+    return c["value"][node].sum(axis=1) + c["base_margin"]
+
+
+# -------------------------------
+# CLI: models/*.joblib → models/compiled/*.npz
+# -------------------------------
+if __name__ == "__main__":
+    import argparse
+    import hashlib
+    import time
+
+    import joblib
+
+    from utils.io_utils import CSV_PATH, MODEL_DIR
+    from utils.preprocess import preprocess_base_many, preprocess_followup_many
+
+    parser = argparse.ArgumentParser(description="트리/선형 모델을 배열 기반 포맷으로 변환")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_export = sub.add_parser("export", help="models/*.joblib → models/compiled/*.npz")
+    p_export.add_argument("--out", default=os.path.join(MODEL_DIR, "compiled"))
+    args = parser.parse_args()
+
+    history = pd.read_csv(CSV_PATH, encoding="utf-8-sig")
+    for fname in sorted(os.listdir(MODEL_DIR)):
+        if not fname.endswith(".joblib"):
+            continue
+        src = os.path.join(MODEL_DIR, fname)
+        with open(src, "rb") as f:
+            sha = hashlib.sha256(f.read()).hexdigest()
+        model = joblib.load(src)
+        compiled = export_model(model)
+        compiled["source_sha256"] = sha
+        dst = os.path.join(args.out, fname.replace(".joblib", ".npz"))
+        save_compiled(compiled, dst)
+
+        # 샘플 데이터로 원본과 확률 비교
+        kind, _, disease = fname[:-len(".joblib")].split("_")
+        X = preprocess_base_many(history, disease) if kind == "base" else preprocess_followup_many(history)
+        t0 = time.perf_counter()
+        cm = load_compiled(dst)
+        load_ms = (time.perf_counter() - t0) * 1000
+        diff = np.abs(cm.predict_proba(X) - model.predict_proba(X)).max()
+        print(f"{fname:<26} → {os.path.relpath(dst, MODEL_DIR):<30} "
+              f"{os.path.getsize(src) / 1024:7.1f} KB → {os.path.getsize(dst) / 1024:7.1f} KB  "
+              f"load {load_ms:6.1f} ms  max|Δp| {diff:.2e}")
@@ -1,62 +1,268 @@
 # -------------------------------
 # GPT로 자연어 설명 생성 (최신 SDK)
 # -------------------------------
+# - 백엔드 선택: EXPLAIN_BACKEND = template(기본, 오프라인 규칙 기반) | openai | stub(테스트용 고정 문장)
+#   register_backend(name, func) 로 로컬 모델 등 추가 가능
+# - 비동기: submit_explanation() → Future (화면은 예측부터 먼저 그리고 설명은 백그라운드에서 생성)
+# - 캐시: (반올림한 질병별 확률, 질병별 상위 피처) 키, LRU + TTL / 같은 키의 진행 중 요청은 1건으로 합침
+# - openai SDK / API 키는 openai 백엔드를 처음 쓸 때 로딩 (기본 template 백엔드는 import 비용 없음)
 
-import streamlit as st
-import openai
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 
+from utils.metrics import count, timed
 
-# API 키 설정 (secrets.toml 또는 환경변수에서)
-try:
-    openai.api_key = st.secrets["OPENAI_API_KEY"]
-except:
-    # secrets.toml이 없거나 키가 없는 경우 환경변수에서 시도
-    import os
-    openai.api_key = os.getenv("OPENAI_API_KEY", "개인 키")  # 실제 키로 바꾸기
+EXPLAIN_BACKEND = os.getenv("EXPLAIN_BACKEND", "template")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))         # 초
+EXPLAIN_WORKERS = int(os.getenv("EXPLAIN_WORKERS", "2"))
+EXPLAIN_CACHE_SIZE = int(os.getenv("EXPLAIN_CACHE_SIZE", "256"))  # 0 이면 캐시 끔
+EXPLAIN_CACHE_TTL = float(os.getenv("EXPLAIN_CACHE_TTL", "3600"))  # 초
+PROB_DIGITS = 2  # 캐시 키용 확률 반올림 자릿수 (0.01 단위)
+TOP_FEATURES = 3
 
 
-def generate_gpt_explanation(user_data, column_meaning, results_prob, feature_importances):
-    # GPT API 호출을 임시로 비활성화하고 기본 설명 반환
-    # 인코딩 문제 해결을 위해
-    try:
-        # 기본 설명 생성 (인코딩 문제 없이)
-        explanation_parts = []
-        
-        # 위험도가 높은 질병 찾기
-        high_risk_diseases = []
-        for disease, prob in results_prob.items():
-            if prob > 0.3:  # 30% 이상이면 위험도 높음
-                high_risk_diseases.append(f"{disease}({prob:.1%})")
-        
-        explanation_parts.append("📊 예측 결과 요약:")
-        explanation_parts.append(f"- 고혈압: {results_prob.get('고혈압', 0):.1%}")
-        explanation_parts.append(f"- 당뇨병: {results_prob.get('당뇨병', 0):.1%}")
-        explanation_parts.append(f"- 고지혈증: {results_prob.get('고지혈증', 0):.1%}")
-        explanation_parts.append("")
-        
-        if high_risk_diseases:
-            explanation_parts.append(f"⚠️ 주의가 필요한 질병: {', '.join(high_risk_diseases)}")
-            explanation_parts.append("정기적인 건강 검진과 생활습관 개선을 권장합니다.")
-        else:
-            explanation_parts.append("✅ 현재 예측 결과로는 모든 질병의 위험도가 낮습니다.")
-            explanation_parts.append("현재 생활습관을 유지하시기 바랍니다.")
-        
+# -------------------------------
+# 백엔드
+# -------------------------------
+def _template_backend(user_data, column_meaning, results_prob, feature_importances):
+    """규칙 기반 요약 (API 호출 없음)"""
+    explanation_parts = []
+
+    # 위험도가 높은 질병 찾기
+    high_risk_diseases = []
+    for disease, prob in results_prob.items():
+        if prob > 0.3:  # 30% 이상이면 위험도 높음
+            high_risk_diseases.append(f"{disease}({prob:.1%})")
+
+    explanation_parts.append("📊 예측 결과 요약:")
+    explanation_parts.append(f"- 고혈압: {results_prob.get('고혈압', 0):.1%}")
+    explanation_parts.append(f"- 당뇨병: {results_prob.get('당뇨병', 0):.1%}")
+    explanation_parts.append(f"- 고지혈증: {results_prob.get('고지혈증', 0):.1%}")
+    explanation_parts.append("")
+
+    if high_risk_diseases:
+        explanation_parts.append(f"⚠️ 주의가 필요한 질병: {', '.join(high_risk_diseases)}")
+        explanation_parts.append("정기적인 건강 검진과 생활습관 개선을 권장합니다.")
+    else:
+        explanation_parts.append("✅ 현재 예측 결과로는 모든 질병의 위험도가 낮습니다.")
+        explanation_parts.append("현재 생활습관을 유지하시기 바랍니다.")
+
+    # 개인별 기여도 상위 요인 (양수 = 위험을 높인 요인)
+    factors = []
+    for disease, feats in (feature_importances or {}).items():
+        ups = [column_meaning.get(f, f) for f, v in (feats or [])[:TOP_FEATURES] if v > 0]
+        if ups:
+            factors.append(f"- {disease}: {', '.join(ups)}")
+    if factors:
         explanation_parts.append("")
-        explanation_parts.append("💡 건강 관리 팁:")
-        explanation_parts.append("- 규칙적인 운동과 균형 잡힌 식단 유지")
-        explanation_parts.append("- 금연, 금주 및 스트레스 관리")
-        explanation_parts.append("- 정기적인 건강 검진 받기")
-        
-        return "\n".join(explanation_parts)
-        
-    except Exception as e:
-        # 최종 안전장치 - 간단한 설명만 반환
+        explanation_parts.append("🔎 위험을 높인 주요 요인:")
+        explanation_parts += factors
+
+    explanation_parts.append("")
+    explanation_parts.append("💡 건강 관리 팁:")
+    explanation_parts.append("- 규칙적인 운동과 균형 잡힌 식단 유지")
+    explanation_parts.append("- 금연, 금주 및 스트레스 관리")
+    explanation_parts.append("- 정기적인 건강 검진 받기")
+
+    return "\n".join(explanation_parts)
+
+
+def _stub_backend(user_data, column_meaning, results_prob, feature_importances):
+    """오프라인 테스트용 고정 형식 문장"""
+    probs = ", ".join(f"{d}={p:.2f}" for d, p in results_prob.items())
+    return f"[stub] {probs}"
+
+
+def _build_prompt(user_data, column_meaning, results_prob, feature_importances) -> str:
+    lines = ["다음은 한 사용자의 건강검진 이력 요약과 10년 후 만성질환 예측 결과입니다."]
+    lines.append("\n[예측 확률]")
+    lines += [f"- {d}: {p:.1%}" for d, p in results_prob.items()]
+    lines.append("\n[질병별 개인 예측 기여도 상위 피처 (로그오즈, +는 위험 증가)]")
+    for d, feats in feature_importances.items():
+        names = [f"{column_meaning.get(f, f)}({f}, {v:+.2f})" for f, v in (feats or [])[:TOP_FEATURES]]
+        lines.append(f"- {d}: {', '.join(names) if names else '정보 없음'}")
+    lines.append("\n[사용자 요약 지표]")
+    lines += [f"- {column_meaning.get(k, k)}: {v}" for k, v in (user_data or {}).items()]
+    lines.append("\n위 정보를 바탕으로 위험 요인과 생활습관 개선 방향을 쉬운 한국어로 5문장 이내로 설명해 주세요.")
+    return "\n".join(lines)
+
+
+_OPENAI_CLIENT = None
+
+
+def _api_key() -> str:
+    """API 키 (secrets.toml 우선, 없으면 환경변수 OPENAI_API_KEY)"""
+    try:
+        import streamlit as st
+        return st.secrets["OPENAI_API_KEY"]
+    except Exception:
+        # secrets.toml이 없거나 키가 없는 경우 환경변수에서 시도
+        key = os.getenv("OPENAI_API_KEY")
+        if not key:
+            raise RuntimeError("OPENAI_API_KEY 가 설정되지 않았습니다. (secrets.toml 또는 환경변수)")
+        return key
+
+
+def _openai_client():
+    """openai SDK import + 클라이언트 생성 (첫 호출 1회)"""
+    global _OPENAI_CLIENT
+    if _OPENAI_CLIENT is None:
         try:
-            return f"""예측 결과 요약:
+            import openai
+        except ImportError as e:
+            raise ImportError("openai 백엔드를 쓰려면 openai 가 필요합니다. (pip install openai)") from e
+        _OPENAI_CLIENT = openai.OpenAI(api_key=_api_key(), timeout=OPENAI_TIMEOUT)
+    return _OPENAI_CLIENT
+
+
+def _openai_backend(user_data, column_meaning, results_prob, feature_importances):
+    """OpenAI Chat Completions (openai>=1.x SDK)"""
+    client = _openai_client()
+    resp = client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": "당신은 건강검진 결과를 설명하는 친절한 상담사입니다."},
+            {"role": "user", "content": _build_prompt(user_data, column_meaning, results_prob, feature_importances)},
+        ],
+    )
+    return resp.choices[0].message.content.strip()
+
+
+_BACKENDS = {"template": _template_backend, "stub": _stub_backend, "openai": _openai_backend}
+
+
+def register_backend(name: str, func):
+    """설명 백엔드 등록 (func(user_data, column_meaning, results_prob, feature_importances) -> str)"""
+    _BACKENDS[name] = func
+
+
+def _fallback_text(results_prob) -> str:
+    # 최종 안전장치 - 간단한 설명만 반환
+    try:
+        return f"""예측 결과 요약:
 - 고혈압: {results_prob.get('고혈압', 0):.1%}
-- 당뇨병: {results_prob.get('당뇨병', 0):.1%}  
+- 당뇨병: {results_prob.get('당뇨병', 0):.1%}
 - 고지혈증: {results_prob.get('고지혈증', 0):.1%}
 
 위험도가 높은 질병에 대해서는 정기적인 건강 검진과 생활습관 개선을 권장합니다."""
-        except:
-            return "예측 결과를 불러오는 중 문제가 발생했습니다. 다시 시도해주세요."
+    except:
+        return "예측 결과를 불러오는 중 문제가 발생했습니다. 다시 시도해주세요."
+
+
+# -------------------------------
+# 캐시
+# -------------------------------
+_CACHE: OrderedDict = OrderedDict()
+_INFLIGHT: dict = {}  # 키 → 진행 중 Future
+_CACHE_LOCK = threading.Lock()
+_EXECUTOR = None
+
+
+def explanation_key(results_prob, feature_importances, backend: str = None) -> tuple:
+    """(백엔드, 반올림 확률, 질병별 상위 피처 이름) — 확률이 0.01 단위로 같고 상위 피처가 같으면 같은 설명"""
+    probs = tuple(sorted((d, round(float(p), PROB_DIGITS)) for d, p in results_prob.items()))
+    feats = tuple(sorted(
+        (d, tuple(f for f, _ in (fs or [])[:TOP_FEATURES])) for d, fs in (feature_importances or {}).items()
+    ))
+    return backend or EXPLAIN_BACKEND, probs, feats
+
+
+def _cache_get(key):
+    found = _CACHE.get(key)
+    if found is None:
+        return None
+    expires, text = found
+    if expires <= time.monotonic():
+        del _CACHE[key]
+        return None
+    _CACHE.move_to_end(key)
+    return text
+
+
+def _cache_put(key, text: str):
+    if EXPLAIN_CACHE_SIZE <= 0:
+        return
+    _CACHE[key] = (time.monotonic() + EXPLAIN_CACHE_TTL, text)
+    _CACHE.move_to_end(key)
+    while len(_CACHE) > EXPLAIN_CACHE_SIZE:
+        _CACHE.popitem(last=False)
+
+
+def clear_explanation_cache():
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=EXPLAIN_WORKERS, thread_name_prefix="explain")
+    return _EXECUTOR
+
+
+def _run_backend(key, name, user_data, column_meaning, results_prob, feature_importances) -> str:
+    func = _BACKENDS.get(name)
+    try:
+        if func is None:
+            raise ValueError(f"Unknown explanation backend: {name}")
+        with timed(f"gpt.backend.{name}"):
+            text = func(user_data, column_meaning, results_prob, feature_importances)
+    except Exception:
+        # 백엔드 실패 → 규칙 기반 요약으로 대체 (캐시하지 않아 다음 요청에서 재시도)
+        count("gpt.backend_error")
+        try:
+            return _template_backend(user_data, column_meaning, results_prob, feature_importances)
+        except Exception:
+            return _fallback_text(results_prob)
+    with _CACHE_LOCK:
+        _cache_put(key, text)
+    return text
+
+
+def submit_explanation(user_data, column_meaning, results_prob, feature_importances,
+                       backend: str = None) -> Future:
+    """
+    설명 생성을 백그라운드로 제출 → Future (result() 가 설명 문자열)
+    - 캐시 적중이면 이미 완료된 Future
+    - 같은 키로 진행 중인 요청이 있으면 그 Future 를 공유
+    """
+    name = backend or EXPLAIN_BACKEND
+    key = explanation_key(results_prob, feature_importances, name)
+    with _CACHE_LOCK:
+        text = _cache_get(key)
+        if text is not None:
+            count("gpt.cache_hit")
+            done = Future()
+            done.set_result(text)
+            return done
+        future = _INFLIGHT.get(key)
+        if future is not None:
+            count("gpt.cache_inflight")
+            return future
+        count("gpt.cache_miss")
+        future = _executor().submit(
+            _run_backend, key, name, user_data, column_meaning, results_prob, feature_importances
+        )
+        _INFLIGHT[key] = future
+
+    def _done(_):
+        with _CACHE_LOCK:
+            _INFLIGHT.pop(key, None)
+
+    future.add_done_callback(_done)
+    return future
+
+
+@timed("gpt.explanation")
+def generate_gpt_explanation(user_data, column_meaning, results_prob, feature_importances,
+                             backend: str = None, timeout: float = None):
+    """동기 버전 (submit_explanation 결과를 기다림, timeout 초과 시 규칙 기반 요약)"""
+    future = submit_explanation(user_data, column_meaning, results_prob, feature_importances, backend)
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        return _fallback_text(results_prob)
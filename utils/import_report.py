@@ -0,0 +1,177 @@
+"""
+utils/import_report.py
+──────────────────────────────────────────────
+역할:
+- `python -X importtime -c "import <모듈>"` 을 새 프로세스에서 실행해 import 비용 요약 (콜드 스타트 회귀 추적)
+- 대상별 총 import 시간(ms, 인터프리터 기본 시작 비용 제외) / 패키지별 self 시간 상위 / 로딩된 모듈 수
+- 첫 화면에서 import 되면 안 되는 무거운·선택 의존성(LAZY_MODULES)이 끌려오면 표시
+
+대상:
+- app            : 홈 화면 (bare 모드 실행, 페이지 미리 import 끔, streamlit 경고 로그는 무시)
+- base_health    : 현재 위험도 페이지 첫 진입
+- follow_health  : 10년 후 예측 페이지 첫 진입
+
+CLI:
+  python -m utils.import_report                          # 기본 대상 요약
+  python -m utils.import_report base_health --top 20 -o imports.json
+  python -m utils.import_report --budget-ms 800 --strict # 예산 초과 / LAZY_MODULES 로딩 시 종료 코드 1
+  python -m utils.import_report --compare old.json new.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TARGETS = ("app", "base_health", "follow_health")
+
+# 모델 역직렬화 / openai 백엔드 사용 시점에만 import 되어야 하는 패키지
+LAZY_MODULES = ("openai", "joblib", "sklearn", "xgboost", "lightgbm", "scipy")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+# -------------------------------
+# 측정
+# -------------------------------
+def _run_importtime(code: str, python: str = None) -> list:
+    """-X importtime 출력 → [(이름, self_us, cumulative_us, 깊이), ...] (출력 순서)"""
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, encoding="utf-8", errors="replace",
+        env=dict(os.environ, PYTHONIOENCODING="utf-8", PREFETCH_PAGES="0"),  # 홈 화면 자체 비용만 측정
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import 실패 ({code}):\n{proc.stderr[-2000:]}")
+    entries = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            entries.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return entries
+
+
+def _startup_modules(python: str = None) -> set:
+    """인터프리터 시작 시 항상 로딩되는 모듈 (encodings, site 등) → 대상 비용에서 제외"""
+    return {name for name, *_ in _run_importtime("pass", python)}
+
+
+def profile_import(module: str, top: int = 10, python: str = None, startup: set = None) -> dict:
+    """모듈 1개 import 1회 측정 → {"target", "total_ms", "modules", "packages": [[패키지, self_ms]], "lazy_loaded"}"""
+    startup = _startup_modules(python) if startup is None else startup
+    entries = [e for e in _run_importtime(f"import {module}", python) if e[0] not in startup]
+
+    total_us = sum(cum for _, _, cum, depth in entries if depth == 0)
+    packages = {}
+    for name, self_us, _, _ in entries:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    ranked = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    loaded = {name.split(".")[0] for name, *_ in entries}
+    return {
+        "target": module,
+        "total_ms": total_us / 1000,
+        "modules": len(entries),
+        "packages": [[name, us / 1000] for name, us in ranked],
+        "lazy_loaded": [m for m in LAZY_MODULES if m in loaded],
+    }
+
+
+def run(targets=DEFAULT_TARGETS, repeat: int = 3, top: int = 10, python: str = None, log=print) -> dict:
+    """대상별 repeat 회 측정 후 총 시간 중앙값 회차를 결과로 사용 (디스크 캐시/잡음 완화)"""
+    startup = _startup_modules(python)
+    results = []
+    for target in targets:
+        runs = sorted((profile_import(target, top, python, startup) for _ in range(max(1, repeat))),
+                      key=lambda r: r["total_ms"])
+        best = dict(runs[len(runs) // 2], min_ms=runs[0]["total_ms"], max_ms=runs[-1]["total_ms"])
+        log(f"{target}: {best['total_ms']:.1f} ms")
+        results.append(best)
+    return {"meta": _meta(python), "results": results}
+
+
+def _meta(python: str = None) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"commit": commit, "python": python or sys.executable, "version": sys.version.split()[0]}
+
+
+# -------------------------------
+# 출력 / 비교
+# -------------------------------
+def format_results(report: dict) -> str:
+    lines = []
+    for r in report["results"]:
+        lazy = f"  ⚠ 지연 로딩 대상 import: {', '.join(r['lazy_loaded'])}" if r["lazy_loaded"] else ""
+        lines.append(f"{r['target']:<16} {r['total_ms']:>9.1f} ms  (min {r['min_ms']:.1f}, max {r['max_ms']:.1f}, "
+                     f"모듈 {r['modules']}){lazy}")
+        lines += [f"    {name:<28} {ms:>9.1f} ms" for name, ms in r["packages"]]
+    return "\n".join(lines)
+
+
+def compare(old: dict, new: dict) -> str:
+    """두 결과 JSON 의 대상별 총 import 시간 비교 (new / old, 1 보다 크면 느려짐)"""
+    base = {r["target"]: r for r in old["results"]}
+    lines = [f"{old['meta'].get('commit')} → {new['meta'].get('commit')}",
+             f"{'대상':<16} {'old ms':>10} {'new ms':>10} {'ratio':>7}"]
+    for r in new["results"]:
+        o = base.get(r["target"])
+        if o is None:
+            continue
+        ratio = r["total_ms"] / o["total_ms"] if o["total_ms"] else float("nan")
+        flag = "  ▲" if ratio > 1.2 else ""
+        added = sorted(set(r["lazy_loaded"]) - set(o["lazy_loaded"]))
+        if added:
+            flag += f"  + {', '.join(added)}"
+        lines.append(f"{r['target']:<16} {o['total_ms']:>10.1f} {r['total_ms']:>10.1f} {ratio:>7.2f}{flag}")
+    return "\n".join(lines)
+
+
+def violations(report: dict, budget_ms: float = None) -> list:
+    """예산 초과 / 지연 로딩 대상 import 목록 (CI 게이트용)"""
+    out = []
+    for r in report["results"]:
+        if budget_ms is not None and r["total_ms"] > budget_ms:
+            out.append(f"{r['target']}: {r['total_ms']:.1f} ms > {budget_ms:.1f} ms")
+        if r["lazy_loaded"]:
+            out.append(f"{r['target']}: {', '.join(r['lazy_loaded'])} import 됨")
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="import 시간 리포트 (콜드 스타트 회귀 추적)")
+    parser.add_argument("targets", nargs="*", default=list(DEFAULT_TARGETS), help="import 할 모듈 (기본: 앱 페이지)")
+    parser.add_argument("--repeat", type=int, default=3, help="대상별 측정 횟수 (중앙값 사용)")
+    parser.add_argument("--top", type=int, default=10, help="패키지별 self 시간 상위 개수")
+    parser.add_argument("--python", default=None, help="측정할 인터프리터 (기본: 현재)")
+    parser.add_argument("-o", "--out", default=None, help="결과 JSON 경로")
+    parser.add_argument("--budget-ms", type=float, default=None, help="대상별 총 import 시간 예산")
+    parser.add_argument("--strict", action="store_true", help="예산 초과 / LAZY_MODULES import 시 종료 코드 1")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="두 결과 JSON 비교만 수행")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f_old, open(args.compare[1], encoding="utf-8") as f_new:
+            print(compare(json.load(f_old), json.load(f_new)))
+        sys.exit(0)
+
+    report = run(args.targets, repeat=args.repeat, top=args.top, python=args.python,
+                 log=lambda msg: print(msg, file=sys.stderr, flush=True))
+    print(format_results(report))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    problems = violations(report, args.budget_ms)
+    for msg in problems:
+        print(f"✗ {msg}", file=sys.stderr)
+    if args.strict and problems:
+        sys.exit(1)
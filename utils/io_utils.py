@@ -3,13 +3,34 @@ utils/io_utils.py
 ──────────────────────────────────────────────
 역할:
 - 데이터/모델 경로 상수 정의
-- CSV 존재 보장, 로드, 행 추가(append) 유틸
+- CSV 존재 보장, 로드, 행 추가(append-only + 파일 잠금, 검증된 DataFrame 일괄 추가 append_frame) 유틸
 - follow_sample.csv 입출력 단일 진입점
+- (T_ID, EDATE) 인덱스를 가진 SQLite 사용자별 이력 저장소 (load_user / last_row)
+- 사용자별 10년 후 예측용 누적 상태 (행 추가 시 증분 갱신, load_user_state)
+- 대용량 CSV 스트리밍 읽기 (chunk 단위 + 컬럼별 compact dtype, 사용자별 그룹 순회)
+- 컬럼형 저장 포맷(Parquet / Feather) 읽기 + CSV → 컬럼형 1회 변환
+  CLI: python -m utils.io_utils migrate --out data/follow_sample.feather
 """
 
+import argparse
+import csv
+import io
+import json
 import os
+import sqlite3
+from contextlib import contextmanager
+
+import numpy as np
 import pandas as pd
-from datetime import datetime
+
+from utils.metrics import timed
+from utils.preprocess import FOLLOWUP_STATE_VERSION, new_followup_state, update_followup_state
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 # -------------------------------
 # 경로 상수
@@ -19,6 +40,8 @@ DATA_DIR = os.path.join(ROOT, "data")
 MODEL_DIR = os.path.join(ROOT, "models")
 
 CSV_PATH = os.path.join(DATA_DIR, "follow_sample.csv")
+# CSV에서 파생되는 사용자별 인덱스 (없거나 어긋나면 CSV로부터 자동 재구성)
+INDEX_PATH = os.path.join(DATA_DIR, "follow_index.sqlite")
 
 # follow_sample.csv 의 표준 스키마 (컬럼 순서 통일용)
 COLUMNS = [
@@ -32,43 +55,342 @@ COLUMNS = [
     "TCHL", "HDL", "TG", "AST", "ALT", "CREATININE"
 ]
 
+# 스트리밍 읽기용 compact dtype (COLUMNS 기준)
+#   - 코드형 범주(성별/여부/가족력 등)는 int8, 나이는 int16
+#   - ID 는 항상 nullable Int64 (큰 ID 도 정확히, 빈 값은 <NA>) — 소수/문자/범위 밖 ID 는 ValueError
+#   - 측정값은 float32, EDATE 는 날짜(datetime64)
+#   - 결측/소수/범위 밖 값이 섞인 코드형/나이 컬럼은 해당 chunk 에서만 float32 로 대체
+CODE_COLUMNS = ["CHILD", "SEX", "MNSAG", "EDU", "SMAG", "T_DRINK", "T_SMOKE",
+                "HTN", "DM", "LIP", "FMMHT", "FMFHT", "FMMDM", "FMFDM", "EXER"]
+COLUMN_DTYPES = {
+    "T_ID": "Int64",
+    "EDATE": "datetime64[s]",
+    "T_AGE": "int16",
+    **{c: "int8" for c in CODE_COLUMNS},
+    **{c: "float32" for c in COLUMNS if c not in CODE_COLUMNS + ["T_ID", "EDATE", "T_AGE"]},
+}
+
+# -------------------------------
+# 파일 잠금 (프로세스/세션 간 동시 쓰기 직렬화)
+# -------------------------------
+@contextmanager
+def _file_lock(path: str = None):
+    """
+    배타적 파일 잠금 (POSIX: fcntl.flock / Windows: msvcrt.locking)
+    - 데이터 파일 대신 별도 .lock 파일을 잠가서 읽기 쪽에는 영향이 없도록 함
+    - path 기본값은 호출 시점의 CSV_PATH + ".lock" (경로를 바꿔 쓰는 벤치마크/테스트도 같은 파일을 잠금)
+    """
+    if path is None:
+        path = CSV_PATH + ".lock"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a+b") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        else:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
 # -------------------------------
 # CSV 파일 보장
 # -------------------------------
+def _ensure_csv_unlocked():
+    os.makedirs(DATA_DIR, exist_ok=True)
+    if not os.path.exists(CSV_PATH) or os.path.getsize(CSV_PATH) == 0:
+        with open(CSV_PATH, "w", encoding="utf-8-sig", newline="") as f:
+            csv.writer(f, lineterminator="\n").writerow(COLUMNS)
+
+
 def ensure_csv():
     """CSV 파일이 없으면 헤더만 있는 파일 생성"""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    if not os.path.exists(CSV_PATH):
-        df = pd.DataFrame(columns=COLUMNS)
-        df.to_csv(CSV_PATH, index=False, encoding="utf-8-sig")
+    if os.path.exists(CSV_PATH) and os.path.getsize(CSV_PATH) > 0:
+        return
+    with _file_lock():
+        _ensure_csv_unlocked()
 
 
 # -------------------------------
 # CSV/XLSX 로드
 # -------------------------------
-def load_df() -> pd.DataFrame:
+@timed("io.load_df")
+def load_df(path: str = None, columns=None) -> pd.DataFrame:
     """
-    CSV를 DataFrame으로 로드
-    - 없으면 XLSX 불러와 CSV 생성
+    이력 파일을 DataFrame으로 로드 (compact dtype)
+    - path 를 주지 않으면 follow_sample.csv (없으면 헤더만 있는 파일 생성)
+    - .parquet / .feather / .arrow 는 메모리 맵으로 필요한 컬럼만 읽음
+    - CSV 는 chunk 단위로 읽어 변환 후 합침
+    - columns: 읽을 컬럼 목록 (기본: COLUMNS 전체)
     """
-    ensure_csv()
-    if os.path.exists(CSV_PATH):
-        return pd.read_csv(CSV_PATH, encoding="utf-8-sig")
+    if path is None:
+        ensure_csv()
+        path = CSV_PATH
+    if columnar_format(path):
+        return read_columnar(path, columns)
+    chunks = list(iter_csv_chunks(path, columns=columns))
+    if not chunks:
+        return pd.DataFrame(columns=list(columns or COLUMNS))
+    return pd.concat(chunks, ignore_index=True)
+
+
+# -------------------------------
+# 대용량 CSV 스트리밍 읽기
+# -------------------------------
+CHUNK_ROWS = 100_000
+
+
+_ID_FLOAT_MAX = 2 ** 53  # "1.0" 처럼 소수 표기된 ID 를 정수로 정확히 되돌릴 수 있는 범위
+
+
+def _compact_ids(raw: pd.Series) -> pd.Series:
+    """
+    T_ID → nullable Int64 (빈 값은 <NA>)
+    - 정수 표기는 그대로 정확히 변환 (float 경유 없음 → 큰 ID 끼리 섞이지 않음)
+    - 소수/문자/범위 밖 ID 는 다른 사용자로 합쳐지지 않도록 ValueError
+    """
+    if pd.api.types.is_numeric_dtype(raw.dtype):
+        blank = raw.isna()
+        ids = raw
     else:
-        return pd.DataFrame(columns=COLUMNS)
+        text = raw.astype("string").str.strip()
+        blank = text.isna() | (text == "")
+        ids = pd.to_numeric(text.mask(blank), errors="coerce", dtype_backend="numpy_nullable")
+
+    bad = np.array(ids.isna() & ~blank, dtype=bool)  # 숫자로 읽히지 않는 값
+    if ids.dtype.kind == "u":
+        bad |= (ids > np.iinfo("int64").max).fillna(False).to_numpy(dtype=bool)
+    elif ids.dtype.kind == "f":
+        arr = ids.to_numpy(dtype="float64", na_value=np.nan)
+        bad |= ~np.isnan(arr) & ~((arr == np.round(arr)) & (np.abs(arr) <= _ID_FLOAT_MAX))
+    if bad.any():
+        examples = ", ".join(f"{i}: {v!r}" for i, v in zip(raw.index[bad][:5], raw[bad][:5]))
+        raise ValueError(f"T_ID 는 정수여야 합니다. 잘못된 값 {int(bad.sum())}개 (행 index: 값) {examples}")
+    return ids.astype(COLUMN_DTYPES["T_ID"])
+
+
+def _compact_dates(raw: pd.Series) -> pd.Series:
+    """EDATE → datetime64 (YYYY-MM-DD 로 한 번에 해석, 실패한 값만 다른 날짜 표기로 재시도)"""
+    parsed = pd.to_datetime(raw, format="%Y-%m-%d", errors="coerce")
+    retry = np.flatnonzero(pd.isna(parsed).to_numpy() & pd.notna(raw).to_numpy())
+    if retry.size:
+        parsed = parsed.copy()
+        parsed.iloc[retry] = pd.to_datetime(raw.iloc[retry], format="mixed", errors="coerce")
+    return parsed.astype(COLUMN_DTYPES["EDATE"])
+
+
+def _compact(chunk: pd.DataFrame, columns=None) -> pd.DataFrame:
+    """chunk 1개를 columns(기본 COLUMNS) 순서 + COLUMN_DTYPES 로 변환 (없는 컬럼은 -1)"""
+    columns = list(columns or COLUMNS)
+    chunk = chunk.reindex(columns=columns, fill_value=-1)
+    out = {}
+    for col in columns:
+        dtype = COLUMN_DTYPES[col]
+        if col == "T_ID":
+            out[col] = _compact_ids(chunk[col])
+            continue
+        if col == "EDATE":
+            out[col] = _compact_dates(chunk[col])
+            continue
+        values = pd.to_numeric(chunk[col], errors="coerce")
+        if dtype.startswith("int"):
+            info = np.iinfo(dtype)
+            arr = values.to_numpy(dtype="float64", na_value=np.nan)
+            if np.isfinite(arr).all() and (arr == np.round(arr)).all() \
+                    and (arr >= info.min).all() and (arr <= info.max).all():
+                out[col] = arr.astype(dtype)
+                continue
+            dtype = "float32"
+        out[col] = values.astype(dtype)
+    return pd.DataFrame(out, index=chunk.index)
+
+
+def iter_csv_chunks(path: str = CSV_PATH, chunk_rows: int = CHUNK_ROWS, columns=None):
+    """
+    CSV 를 chunk_rows 행씩 읽어 compact dtype DataFrame 으로 순차 반환
+    - 메모리 사용량 ≈ chunk 1개 (파일 크기와 무관)
+    - columns 를 주면 그 컬럼만 파싱
+    """
+    usecols = None if columns is None else (lambda c, wanted=set(columns): c in wanted)
+    # T_ID 는 문자열로 읽어 정확히 정수 변환 (float 경유 시 2^53 넘는 ID 손실)
+    for chunk in pd.read_csv(path, encoding="utf-8-sig", chunksize=chunk_rows, usecols=usecols,
+                             dtype={"T_ID": str}):
+        yield _compact(chunk, columns)
+
+
+def iter_chunks(path: str = CSV_PATH, chunk_rows: int = CHUNK_ROWS, columns=None):
+    """확장자에 따라 CSV / Parquet / Feather 를 chunk 단위로 순차 반환 (compact dtype)"""
+    if columnar_format(path):
+        return iter_columnar_chunks(path, chunk_rows, columns)
+    return iter_csv_chunks(path, chunk_rows, columns)
+
+
+def iter_user_groups(path: str = CSV_PATH, chunk_rows: int = CHUNK_ROWS):
+    """
+    T_ID 순으로 정렬된(같은 사용자 행이 연속된) 이력 파일(CSV/Parquet/Feather)을 사용자 단위로 순회
+    - (T_ID, 해당 사용자 행 DataFrame) 을 파일 순서대로 반환
+    - chunk 경계에 걸친 사용자는 다음 chunk 와 이어 붙여 한 그룹으로 반환
+    - 이미 끝난 사용자가 다시 나오면 ValueError (정렬되지 않은 파일은 batch_score 의 파티션 방식 사용)
+    """
+    carry = None
+    seen = set()
+    for chunk in iter_chunks(path, chunk_rows):
+        chunk = chunk[pd.notna(chunk["T_ID"])]
+        if carry is not None:
+            chunk = pd.concat([carry, chunk])
+        if chunk.empty:
+            continue
+        t_id = chunk["T_ID"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, t_id[1:] != t_id[:-1]])
+        bounds = np.r_[starts, len(chunk)]
+        # 마지막 사용자는 다음 chunk 에 이어질 수 있으므로 보류
+        for a, b in zip(bounds[:-2], bounds[1:-1]):
+            key = t_id[a].item()
+            if key in seen:
+                raise ValueError(f"T_ID={key} 의 행이 연속되어 있지 않습니다. (T_ID 순 정렬 필요)")
+            seen.add(key)
+            yield key, chunk.iloc[a:b]
+        carry = chunk.iloc[bounds[-2]:]
+    if carry is not None and not carry.empty:
+        key = carry["T_ID"].iloc[0].item()
+        if key in seen:
+            raise ValueError(f"T_ID={key} 의 행이 연속되어 있지 않습니다. (T_ID 순 정렬 필요)")
+        yield key, carry
+
+
+# -------------------------------
+# 컬럼형 저장 포맷 (Parquet / Feather)
+# -------------------------------
+# - CSV 는 append-only 원본 로그로 유지하고, 대량 조회/일괄 처리용 사본을 컬럼형으로 둠
+# - 스키마는 COLUMN_DTYPES 그대로 (코드형 int8, 측정값 float32, EDATE date32)
+# - Feather(Arrow IPC, 무압축)는 메모리 맵으로 복사 없이 필요한 컬럼만 읽음
+# - pyarrow 는 선택 의존성: 컬럼형 파일을 다룰 때만 import
+COLUMNAR_FORMATS = {".parquet": "parquet", ".feather": "feather", ".arrow": "feather"}
+
+
+def columnar_format(path: str):
+    """경로 확장자 → "parquet" | "feather" | None(CSV 등)"""
+    return COLUMNAR_FORMATS.get(os.path.splitext(str(path))[1].lower())
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Parquet/Feather 파일을 쓰려면 pyarrow 가 필요합니다. (pip install pyarrow)") from e
+    return pyarrow
+
+
+def arrow_schema(float_columns=()):
+    """COLUMNS 스키마의 Arrow 타입 (float_columns: 정수 대신 float32 로 둘 컬럼)"""
+    pa = _pyarrow()
+    types = {"int8": pa.int8(), "int16": pa.int16(), "int32": pa.int32(), "Int64": pa.int64(),
+             "float32": pa.float32(), "datetime64[s]": pa.date32()}
+    return pa.schema([
+        (col, pa.float32() if col in float_columns else types[COLUMN_DTYPES[col]])
+        for col in COLUMNS
+    ])
+
+
+def _arrow_to_pandas(table) -> pd.DataFrame:
+    pa = _pyarrow()
+    # int64(T_ID) 는 결측이 있어도 float64 로 풀지 않고 CSV 경로와 같은 Int64 로
+    df = table.to_pandas(date_as_object=False, types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+    if "T_ID" in df.columns:
+        df["T_ID"] = _compact_ids(df["T_ID"])  # 예전 int32 파일도 Int64 로 통일
+    if "EDATE" in df.columns:
+        df["EDATE"] = df["EDATE"].astype(COLUMN_DTYPES["EDATE"])  # CSV 경로와 같은 dtype
+    return df
+
+
+def read_columnar(path: str, columns=None) -> pd.DataFrame:
+    """Parquet/Feather 파일을 메모리 맵으로 열어 columns(기본 전체)만 DataFrame 으로"""
+    pa = _pyarrow()
+    columns = None if columns is None else list(columns)
+    if columnar_format(path) == "parquet":
+        table = pa.parquet.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = pa.feather.read_table(path, columns=columns, memory_map=True)
+    return _arrow_to_pandas(table)
+
+
+def iter_columnar_chunks(path: str, chunk_rows: int = CHUNK_ROWS, columns=None):
+    """Parquet/Feather 파일을 chunk_rows 행 이하의 배치로 순차 반환"""
+    pa = _pyarrow()
+    columns = None if columns is None else list(columns)
+    if columnar_format(path) == "parquet":
+        for batch in pa.parquet.ParquetFile(path, memory_map=True).iter_batches(chunk_rows, columns=columns):
+            yield _arrow_to_pandas(pa.Table.from_batches([batch]))
+        return
+
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, chunk_rows):
+                yield _arrow_to_pandas(pa.Table.from_batches([batch.slice(start, chunk_rows)]))
+
+
+def migrate_history(out_path: str, src: str = CSV_PATH, compression: str = None,
+                    chunk_rows: int = CHUNK_ROWS) -> dict:
+    """
+    CSV 이력 → Parquet/Feather 1회 변환 (chunk 단위라 메모리 사용량 ≈ chunk 1개)
+    - 1차: 정수 컬럼 중 결측/소수가 섞여 float32 로 둬야 하는 컬럼 파악
+    - 2차: 고정 스키마로 chunk 마다 기록
+    - compression: parquet 기본 "zstd", feather 기본 "uncompressed"(메모리 맵 복사 없는 읽기)
+    반환: {"rows", "csv_bytes", "out_bytes", "float_columns"}
+    """
+    pa = _pyarrow()
+    fmt = columnar_format(out_path)
+    if fmt is None:
+        raise ValueError(f"출력 확장자는 {', '.join(COLUMNAR_FORMATS)} 중 하나여야 합니다: {out_path}")
+
+    float_columns = set()
+    for chunk in iter_csv_chunks(src, chunk_rows):
+        float_columns.update(c for c in COLUMNS if COLUMN_DTYPES[c].startswith("int")
+                             and chunk[c].dtype == np.float32)
+    schema = arrow_schema(float_columns)
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp = out_path + ".tmp"
+    rows = 0
+    if fmt == "parquet":
+        writer = pa.parquet.ParquetWriter(tmp, schema, compression=compression or "zstd")
+    else:
+        options = pa.ipc.IpcWriteOptions(
+            compression=None if compression in (None, "uncompressed") else compression)
+        writer = pa.ipc.new_file(tmp, schema, options=options)
+    try:
+        for chunk in iter_csv_chunks(src, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    finally:
+        writer.close()
+    os.replace(tmp, out_path)
+
+    return {"rows": rows, "csv_bytes": os.path.getsize(src), "out_bytes": os.path.getsize(out_path),
+            "float_columns": sorted(float_columns)}
 
 
 # -------------------------------
 # 행 추가 (append)
 # -------------------------------
-def append_row(row: dict):
+def clean_row(row: dict) -> dict:
     """
-    한 행(dict)을 follow_sample.csv 에 누적 저장
-    - 공란(None/"")은 -1로 통일
+    저장 직전 한 행(dict) 정규화
+    - COLUMNS 순서로 재구성, 없는 컬럼/공란(None/"")은 -1로 통일
     - EDATE는 YYYY-MM-DD 문자열로 저장 (이미 CSV도 같은 포맷임)
     """
-    ensure_csv()
-
     clean = {}
     for col in COLUMNS:
         val = row.get(col, -1)
@@ -82,8 +404,299 @@ def append_row(row: dict):
                 val = pd.to_datetime(val).strftime("%Y-%m-%d")
 
         clean[col] = val
+    return clean
+
+
+@timed("io.append_rows")
+def append_rows(rows) -> int:
+    """
+    여러 행(dict 리스트)을 follow_sample.csv 끝에 한 번에 누적 저장
+    - 파일 전체를 다시 읽고 쓰지 않고 append 모드로 추가 (저장 비용 O(추가 행 수))
+    - 파일 잠금으로 동시 세션의 쓰기를 직렬화 → 마지막 writer가 덮어써 행이 사라지는 문제 방지
+    - fsync까지 마친 뒤 사용자별 인덱스(SQLite)에도 같은 행을 반영
+    반환: 저장한 행 수
+    """
+    return _append_cleaned([clean_row(r) for r in rows])
+
+
+@timed("io.append_frame")
+def append_frame(df: pd.DataFrame) -> int:
+    """
+    검증·정규화된 DataFrame(utils.schema.validate_frame 결과 등, COLUMNS 스키마)을 한 번에 누적 저장
+    - 행 단위 clean_row 없이 그대로 기록 (없는 컬럼은 -1)
+    - append_rows 와 같은 잠금 1회 + CSV 추가 1회 + 인덱스 트랜잭션 1회
+    반환: 저장한 행 수
+    """
+    if df.empty:
+        return 0
+    return _append_cleaned(df.reindex(columns=COLUMNS, fill_value=-1).to_dict(orient="records"))
+
+
+def _append_cleaned(cleaned: list) -> int:
+    if not cleaned:
+        return 0
+
+    with _file_lock():
+        _ensure_csv_unlocked()
+        conn = _connect_index()
+        try:
+            # 외부에서 CSV가 바뀌었으면 먼저 인덱스를 따라잡은 뒤 추가
+            _sync_index(conn)
+
+            with open(CSV_PATH, "r+b") as fb:
+                # 마지막 줄에 개행이 없으면(수동 편집 등) 먼저 개행을 보충
+                fb.seek(-1, os.SEEK_END)
+                needs_newline = fb.read(1) not in (b"\n", b"\r")
+            with open(CSV_PATH, "a", encoding="utf-8", newline="") as f:
+                if needs_newline:
+                    f.write("\n")
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerows([clean[col] for col in COLUMNS] for clean in cleaned)
+                f.flush()
+                os.fsync(f.fileno())
+
+            with conn:
+                first_seq = _insert_index_rows(conn, cleaned)
+                _update_states(conn, cleaned, first_seq)
+                _set_indexed_size(conn, os.path.getsize(CSV_PATH))
+        finally:
+            conn.close()
+    return len(cleaned)
+
+
+def append_row(row: dict):
+    """
+    한 행(dict)을 follow_sample.csv 에 누적 저장
+    - 공란(None/"")은 -1로 통일
+    - EDATE는 YYYY-MM-DD 문자열로 저장 (이미 CSV도 같은 포맷임)
+    """
+    append_rows([row])
+
+
+# -------------------------------
+# 사용자별 이력 인덱스 (SQLite)
+# -------------------------------
+# - CSV는 append-only 원본 로그, SQLite는 (T_ID, EDATE) 인덱스를 가진 조회용 사본
+# - meta.csv_size 에 "인덱스에 반영된 CSV 바이트 수"를 기록
+#   · CSV가 더 길면(외부 append, 쓰기 도중 중단) 늘어난 꼬리만 읽어 반영
+#   · CSV가 더 짧거나 기록이 없으면(교체/편집) CSV 전체로 재구성
+# - 조회 비용은 전체 인구가 아니라 해당 사용자 이력 길이에 비례
+
+def _connect_index() -> sqlite3.Connection:
+    conn = sqlite3.connect(INDEX_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    cols = ", ".join(
+        "T_ID INTEGER" if c == "T_ID" else "EDATE TEXT" if c == "EDATE" else c
+        for c in COLUMNS
+    )
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS history (seq INTEGER PRIMARY KEY, {cols});
+        CREATE INDEX IF NOT EXISTS idx_history_user ON history (T_ID, EDATE);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+        CREATE TABLE IF NOT EXISTS user_state (T_ID INTEGER PRIMARY KEY, state TEXT);
+    """)
+    return conn
+
+
+def _sql_value(val):
+    """numpy 스칼라 → 파이썬 기본형, NaN → NULL"""
+    if hasattr(val, "item"):
+        val = val.item()
+    if isinstance(val, float) and val != val:
+        return None
+    return val
+
+
+def _insert_index_rows(conn: sqlite3.Connection, rows) -> int:
+    """이력 테이블에 추가, 반환: 첫 행의 seq (이후 행은 1씩 증가; 호출 측이 잠금 보유)"""
+    first_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM history").fetchone()[0]
+    placeholders = ", ".join("?" for _ in COLUMNS)
+    conn.executemany(
+        f"INSERT INTO history (seq, {', '.join(COLUMNS)}) VALUES (?, {placeholders})",
+        ([first_seq + i] + [_sql_value(r.get(col, -1)) for col in COLUMNS] for i, r in enumerate(rows)),
+    )
+    return first_seq
+
+
+def _indexed_size(conn: sqlite3.Connection):
+    cur = conn.execute("SELECT value FROM meta WHERE key = 'csv_size'")
+    found = cur.fetchone()
+    return None if found is None else int(found[0])
+
+
+def _set_indexed_size(conn: sqlite3.Connection, size: int):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_size', ?)", (size,))
+
+
+def _read_csv_rows(data: bytes, header: bool):
+    df = pd.read_csv(
+        io.BytesIO(data), encoding="utf-8-sig",
+        header=0 if header else None, names=None if header else COLUMNS,
+    )
+    df = df.reindex(columns=COLUMNS, fill_value=-1)
+    return df.to_dict(orient="records")
+
+
+def _sync_index(conn: sqlite3.Connection):
+    """인덱스를 현재 CSV 내용과 맞춤 (호출 측에서 _file_lock 보유)"""
+    size = os.path.getsize(CSV_PATH)
+    indexed = _indexed_size(conn)
+    if indexed == size:
+        return
+
+    with open(CSV_PATH, "rb") as fb:
+        if indexed is not None and indexed < size:
+            fb.seek(indexed)
+            tail = fb.read()
+            rows = _read_csv_rows(tail, header=False) if tail.strip() else []
+            rebuild = False
+        else:
+            rows = _read_csv_rows(fb.read(), header=True)
+            rebuild = True
+
+    with conn:
+        if rebuild:
+            # 누적 상태는 다음 조회 때 사용자별로 다시 만듦 (load_user_state)
+            conn.execute("DELETE FROM history")
+            conn.execute("DELETE FROM user_state")
+            _insert_index_rows(conn, rows)
+        else:
+            _update_states(conn, rows, _insert_index_rows(conn, rows))
+        _set_indexed_size(conn, size)
+
+
+def _open_index() -> sqlite3.Connection:
+    """조회용 연결: CSV 크기가 인덱스 기록과 다를 때만 잠금을 잡고 동기화"""
+    ensure_csv()
+    conn = _connect_index()
+    if _indexed_size(conn) != os.path.getsize(CSV_PATH):
+        with _file_lock():
+            _sync_index(conn)
+    return conn
+
+
+def _query_df(sql: str, params) -> pd.DataFrame:
+    conn = _open_index()
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return pd.DataFrame.from_records(rows, columns=COLUMNS)
+
+
+@timed("io.load_user")
+def load_user(t_id) -> pd.DataFrame:
+    """
+    한 사용자(T_ID)의 전체 이력을 EDATE 순(같은 날짜는 저장 순)으로 로드
+    - (T_ID, EDATE) 인덱스 조회 → CSV 전체를 읽지 않음
+    """
+    return _query_df(
+        f"SELECT {', '.join(COLUMNS)} FROM history WHERE T_ID = ? ORDER BY EDATE, seq",
+        (int(t_id),),
+    )
+
+
+@timed("io.last_row")
+def last_row(t_id) -> pd.DataFrame:
+    """
+    한 사용자(T_ID)가 마지막으로 저장한 1행 (없으면 빈 DataFrame)
+    """
+    return _query_df(
+        f"SELECT {', '.join(COLUMNS)} FROM history WHERE T_ID = ? ORDER BY seq DESC LIMIT 1",
+        (int(t_id),),
+    )
+
+
+# -------------------------------
+# 사용자별 누적 상태 (10년 후 예측용)
+# -------------------------------
+# - user_state.state = preprocess 의 누적 상태(JSON): 평균/변화/비율/최빈값을 증분 갱신
+# - append_rows 가 같은 트랜잭션에서 새 행만큼 갱신 → 조회 비용이 방문 횟수와 무관
+# - 상태가 없거나 버전이 다르면 해당 사용자 이력으로 한 번 재구성
+
+def _read_state(conn: sqlite3.Connection, t_id: int):
+    found = conn.execute("SELECT state FROM user_state WHERE T_ID = ?", (t_id,)).fetchone()
+    if found is None:
+        return None
+    state = json.loads(found[0])
+    return state if state.get("v") == FOLLOWUP_STATE_VERSION else None
+
+
+def _write_state(conn: sqlite3.Connection, t_id: int, state: dict):
+    conn.execute(
+        "INSERT OR REPLACE INTO user_state (T_ID, state) VALUES (?, ?)",
+        (t_id, json.dumps(state, separators=(",", ":"))),
+    )
+
+
+def _rebuild_state(conn: sqlite3.Connection, t_id: int):
+    """해당 사용자의 전체 이력으로 상태 재구성 (이력이 없으면 None)"""
+    rows = conn.execute(
+        f"SELECT seq, {', '.join(COLUMNS)} FROM history WHERE T_ID = ? ORDER BY seq", (t_id,)
+    ).fetchall()
+    if not rows:
+        return None
+    df = pd.DataFrame.from_records([r[1:] for r in rows], columns=COLUMNS)
+    state = update_followup_state(new_followup_state(t_id), df, [r[0] for r in rows])
+    _write_state(conn, t_id, state)
+    return state
+
+
+def _update_states(conn: sqlite3.Connection, rows, first_seq: int):
+    """방금 이력에 추가한 행들(seq = first_seq 부터)을 사용자별 누적 상태에 반영"""
+    by_user: dict = {}
+    for i, r in enumerate(rows):
+        t_id = _sql_value(r.get("T_ID", -1))
+        if t_id is None:
+            continue
+        by_user.setdefault(int(t_id), []).append((first_seq + i, r))
+
+    for t_id, items in by_user.items():
+        state = _read_state(conn, t_id)
+        if state is None:
+            _rebuild_state(conn, t_id)  # 방금 추가한 행까지 포함해 재구성
+            continue
+        df = pd.DataFrame([r for _, r in items]).reindex(columns=COLUMNS, fill_value=-1)
+        update_followup_state(state, df, [seq for seq, _ in items])
+        _write_state(conn, t_id, state)
+
+
+@timed("io.load_user_state")
+def load_user_state(t_id):
+    """
+    한 사용자(T_ID)의 10년 후 예측용 누적 상태 (이력이 없으면 None)
+    - 보통은 저장된 상태 1행 조회뿐, 상태가 없을 때만 잠금을 잡고 이력으로 재구성
+    - preprocess.preprocess_followup_state(state) 로 모델 입력 1행 생성
+    """
+    t_id = int(t_id)
+    conn = _open_index()
+    try:
+        state = _read_state(conn, t_id)
+        if state is not None:
+            return state
+        with _file_lock():
+            _sync_index(conn)
+            with conn:
+                return _read_state(conn, t_id) or _rebuild_state(conn, t_id)
+    finally:
+        conn.close()
+
 
-    df = pd.read_csv(CSV_PATH, encoding="utf-8-sig")
-    df = pd.concat([df, pd.DataFrame([clean])], ignore_index=True)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="follow_sample.csv 이력 관리")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_migrate = sub.add_parser("migrate", help="CSV → Parquet/Feather 1회 변환")
+    p_migrate.add_argument("--src", default=CSV_PATH)
+    p_migrate.add_argument("--out", default=os.path.join(DATA_DIR, "follow_sample.feather"),
+                           help="출력 파일 (.parquet / .feather / .arrow)")
+    p_migrate.add_argument("--compression", default=None, help="zstd / lz4 / snappy / uncompressed")
+    p_migrate.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
 
-    df.to_csv(CSV_PATH, index=False, encoding="utf-8-sig")
+    if args.cmd == "migrate":
+        info = migrate_history(args.out, src=args.src, compression=args.compression,
+                               chunk_rows=args.chunk_rows)
+        print(f"{info['rows']:,}행  {info['csv_bytes'] / 1024:,.1f} KB → {info['out_bytes'] / 1024:,.1f} KB  "
+              f"({args.out})")
+        if info["float_columns"]:
+            print(f"float32 로 저장한 정수 컬럼: {', '.join(info['float_columns'])}")
@@ -0,0 +1,212 @@
+"""
+utils/metrics.py
+──────────────────────────────────────────────
+역할:
+- 요청 경로 단계별(io / preprocess / model / gpt) 소요 시간 + 이벤트 횟수 수집
+- 단계마다 최근 WINDOW 건의 롤링 분포(p50/p90/p99) + 누적 히스토그램(Prometheus 버킷)
+- 출력: snapshot() dict / to_json() / to_prometheus() 텍스트 / Streamlit 디버그 패널
+
+사용:
+    from utils.metrics import timed, count
+
+    @timed("io.load_user")          # 함수 전체
+    def load_user(...): ...
+
+    with timed("model.predict"):    # 코드 블록
+        ...
+    count("model.cache_hit")
+
+설정 (환경변수):
+- METRICS_ENABLED=0 : 수집 끔 (timed/count 가 아무 것도 하지 않음)
+- METRICS_WINDOW    : 단계별 롤링 표본 수 (기본 1024)
+- DEBUG_METRICS=1   : 화면 하단에 디버그 패널 표시
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+WINDOW = int(os.getenv("METRICS_WINDOW", "1024"))
+
+# Prometheus 누적 히스토그램 버킷 상한 (초)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_LOCK = threading.Lock()
+_STAGES: dict = {}    # 단계 → _Stage
+_COUNTERS: dict = {}  # 이벤트 → 횟수
+
+
+class _Stage:
+    __slots__ = ("recent", "count", "total", "max", "buckets", "errors")
+
+    def __init__(self):
+        self.recent = deque(maxlen=WINDOW)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # 마지막 = +Inf
+        self.errors = 0
+
+    def add(self, seconds: float, error: bool):
+        self.recent.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.errors += error
+
+
+def observe(stage: str, seconds: float, error: bool = False):
+    """단계 소요 시간 1건 기록"""
+    if not ENABLED:
+        return
+    with _LOCK:
+        st = _STAGES.get(stage)
+        if st is None:
+            st = _STAGES[stage] = _Stage()
+        st.add(seconds, error)
+
+
+def count(name: str, n: int = 1):
+    """이벤트 횟수 증가 (캐시 적중/미스 등)"""
+    if not ENABLED:
+        return
+    with _LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + n
+
+
+class timed:
+    """
+    소요 시간 측정 (with 문 / 데코레이터 겸용)
+    - 예외가 나도 시간은 기록하고 errors 횟수를 올린 뒤 예외는 그대로 전달
+    """
+
+    __slots__ = ("stage", "_t0")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.stage, time.perf_counter() - self._t0, error=exc_type is not None)
+        return False
+
+    def __call__(self, func):
+        stage = self.stage
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            t0 = time.perf_counter()
+            error = True
+            try:
+                result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                observe(stage, time.perf_counter() - t0, error=error)
+
+        return wrapper
+
+
+# -------------------------------
+# 조회 / 출력
+# -------------------------------
+def snapshot() -> dict:
+    """
+    {"stages": {단계: {count, errors, mean_ms, p50_ms, p90_ms, p99_ms, max_ms, window}}, "counters": {...}}
+    - 분위수는 최근 WINDOW 건 기준, count/mean/max 는 프로세스 시작 이후 누적
+    """
+    with _LOCK:
+        stages = {name: (np.array(st.recent), st.count, st.total, st.max, st.errors)
+                  for name, st in _STAGES.items()}
+        counters = dict(_COUNTERS)
+
+    out = {}
+    for name, (recent, n, total, mx, errors) in sorted(stages.items()):
+        p50, p90, p99 = np.percentile(recent, [50, 90, 99]) * 1000 if len(recent) else (0.0, 0.0, 0.0)
+        out[name] = {
+            "count": n, "errors": errors,
+            "mean_ms": total / n * 1000 if n else 0.0,
+            "p50_ms": float(p50), "p90_ms": float(p90), "p99_ms": float(p99),
+            "max_ms": mx * 1000, "window": len(recent),
+        }
+    return {"stages": out, "counters": dict(sorted(counters.items()))}
+
+
+def to_json(indent: int = None) -> str:
+    return json.dumps(snapshot(), ensure_ascii=False, indent=indent)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_prometheus(prefix: str = "health_app") -> str:
+    """Prometheus text exposition 형식 (stage 별 히스토그램 + 이벤트 카운터)"""
+    with _LOCK:
+        stages = {name: (list(st.buckets), st.count, st.total, st.errors) for name, st in _STAGES.items()}
+        counters = dict(_COUNTERS)
+
+    lines = [f"# HELP {prefix}_stage_seconds 요청 경로 단계별 소요 시간",
+             f"# TYPE {prefix}_stage_seconds histogram"]
+    for name, (buckets, n, total, _) in sorted(stages.items()):
+        stage = _label(name)
+        cum = 0
+        for le, c in zip(BUCKETS + ("+Inf",), buckets):
+            cum += c
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cum}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {total:.9f}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {n}')
+
+    lines += [f"# HELP {prefix}_stage_errors_total 예외로 끝난 단계 실행 횟수",
+              f"# TYPE {prefix}_stage_errors_total counter"]
+    lines += [f'{prefix}_stage_errors_total{{stage="{_label(name)}"}} {errors}'
+              for name, (_, _, _, errors) in sorted(stages.items())]
+
+    lines += [f"# HELP {prefix}_events_total 이벤트 횟수", f"# TYPE {prefix}_events_total counter"]
+    lines += [f'{prefix}_events_total{{name="{_label(name)}"}} {n}' for name, n in sorted(counters.items())]
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _LOCK:
+        _STAGES.clear()
+        _COUNTERS.clear()
+
+
+# -------------------------------
+# Streamlit 디버그 패널
+# -------------------------------
+def debug_panel_enabled() -> bool:
+    return os.getenv("DEBUG_METRICS", "").lower() in ("1", "true", "yes")
+
+
+def render_debug_panel(st):
+    """단계별 지연 표 + 카운터 (st: streamlit 모듈, DEBUG_METRICS=1 일 때만 표시)"""
+    if not debug_panel_enabled():
+        return
+    import pandas as pd
+
+    snap = snapshot()
+    with st.expander("⏱ 성능 지표 (디버그)"):
+        if snap["stages"]:
+            table = pd.DataFrame.from_dict(snap["stages"], orient="index")
+            st.dataframe(table.round(3), use_container_width=True)
+        if snap["counters"]:
+            st.json(snap["counters"])
+        if st.button("지표 초기화"):
+            reset()
@@ -1,34 +1,604 @@
 """
 모델 관련 유틸 함수 모음
-- 모델 로딩 (joblib)
-- 공통 예측 함수
+- 모델 레지스트리: (kind, disease) 별 지연 로딩 + 프로세스당 1회 + 파일 변경 시 재로딩
+  + 로딩 시 피처 중요도 순위표 1회 계산 (top_features)
+- 공통 예측 함수 (predict_scores: 질병별 predict_proba 1회 + 임계값 라벨, 질병 간 병렬 실행)
+- 행별 예측 기여도 (explain_scores: 부스터 내장 TreeSHAP / 선형 coef×x, 질병별 배치 1회)
+- 10년 후 예측 화면용 묶음 (predict_follow: results_prob + 개인별 기여도 상위 피처)
+- 단기 예측 질병 묶음 (predict_base: 입력 피처가 같은 모델(htn/lip)끼리 전처리 1회 공유)
+- 예측 결과 캐시: (모델 버전, 피처 행 해시) 키, LRU + TTL + 적중/미스 카운터
+- 코호트 전체 일괄 점수화 (score_population / score_base_population)
+- 서버 시작 시 모델 미리 로딩 + 워밍업 (preload_models / start_preload)
+  CLI: python -m utils.model_utils preload
 """
 
-import joblib
-import streamlit as st
+import hashlib
+import importlib
+import io
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.io_utils import COLUMNS, MODEL_DIR
+from utils.metrics import count, timed
+from utils.preprocess import (
+    base_feature_names, preprocess_base, preprocess_base_shared, preprocess_followup,
+    preprocess_followup_many,
+)
+
+# 모델 백엔드: "joblib"(기본) | "compiled"(models/compiled/*.npz, NumPy 평가기)
+# - compiled 파일은 원본 joblib 의 sha256 을 기록하고 있어, 원본과 다르면 joblib 으로 자동 대체
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "joblib")
+COMPILED_DIR = os.path.join(MODEL_DIR, "compiled")
+
+# 질병 코드 → 화면 표시용 이름
+DISEASES = {"htn": "고혈압", "dm": "당뇨병", "lip": "고지혈증"}
+KINDS = ("base", "follow")
+
+
+# -------------------------------
+# 모델 레지스트리
+# -------------------------------
+# (kind, disease) → {"model", "path", "stat", "sha256", "importance"}
+# - 조회 때마다 stat(mtime/size)만 비교 → 바뀌었으면 해시까지 비교해 내용이 달라졌을 때만 재로딩
+# - 서로 다른 모델은 병렬로, 같은 모델은 한 번만 로딩되도록 키별 잠금 사용
+_REGISTRY: dict = {}
+_REGISTRY_LOCK = threading.Lock()
+_KEY_LOCKS: dict = {}
+
+
+def model_path(kind: str, disease: str) -> str:
+    """models/{kind}_model_{disease}.joblib 절대 경로 (실행 디렉터리와 무관)"""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown model kind: {kind}")
+    if disease not in DISEASES:
+        raise ValueError(f"Unknown disease type: {disease}")
+    return os.path.join(MODEL_DIR, f"{kind}_model_{disease}.joblib")
+
+
+def _load_compiled(kind: str, disease: str, source_sha256: str):
+    """원본과 같은 버전의 compiled 모델이 있으면 로딩, 없으면 None"""
+    from utils.compiled_model import load_compiled
+
+    path = os.path.join(COMPILED_DIR, f"{kind}_model_{disease}.npz")
+    if not os.path.exists(path):
+        return None
+    model = load_compiled(path)
+    return model if model.c.get("source_sha256") == source_sha256 else None
+
+
+def _input_names(model, kind: str, disease: str) -> list:
+    """
+    모델 입력 피처 이름 (feature_names_in_ 기준, 없으면(base dm 등) 전처리 스키마 이름)
+    - base 모델은 전처리 스키마와 이름이 다르면 ValueError
+    """
+    names = getattr(model, "feature_names_in_", None)
+    names = [str(c) for c in names] if names is not None else None
+    if kind == "base":
+        expected = base_feature_names(disease)
+        if names is not None and names != expected:
+            raise ValueError(f"{kind}/{disease} 모델 피처가 전처리 스키마와 다릅니다.")
+        names = expected
+    return names
+
+
+def _importance_table(model, kind: str, disease: str) -> list:
+    """
+    입력 피처별 중요도 순위표 [(피처, 중요도), ...] (내림차순)
+    - 피처 이름은 _input_names 기준, 개수가 다르면 ValueError
+    """
+    from utils.compiled_model import input_importances
+
+    imp = getattr(model, "input_importances_", None)
+    if imp is None:
+        if hasattr(model, "c"):
+            return []  # 중요도 없이 export 된 예전 compiled 파일
+        imp = input_importances(model)
+
+    names = _input_names(model, kind, disease)
+    if names is None or len(names) != len(imp):
+        raise ValueError(f"{kind}/{disease} 모델의 피처 이름과 중요도 개수가 다릅니다.")
+
+    order = np.argsort(-np.asarray(imp), kind="stable")
+    return [(names[i], float(imp[i])) for i in order]
+
+
+def _key_lock(key) -> threading.Lock:
+    with _REGISTRY_LOCK:
+        return _KEY_LOCKS.setdefault(key, threading.Lock())
+
+
+def _stat_sig(path: str):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _joblib_load(source):
+    # joblib (+ 역직렬화 시 sklearn/xgboost/lightgbm) 은 모델을 처음 읽을 때 import → 페이지 첫 화면 지연 감소
+    import joblib
+    return joblib.load(source)
+
+
+def _registry_entry(kind: str, disease: str) -> dict:
+    key = (kind, disease)
+    path = model_path(kind, disease)
+    sig = _stat_sig(path)  # 파일이 없으면 FileNotFoundError
+
+    entry = _REGISTRY.get(key)
+    if entry is not None and entry["stat"] == sig:
+        return entry
+
+    with _key_lock(key):
+        entry = _REGISTRY.get(key)
+        sig = _stat_sig(path)
+        if entry is not None and entry["stat"] == sig:
+            return entry
+
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry is not None and entry["sha256"] == digest:
+            # 내용은 그대로 (touch/복사 등) → 역직렬화 생략
+            entry = dict(entry, stat=sig)
+        else:
+            with timed(f"model.load.{kind}.{disease}"):
+                model = _load_compiled(kind, disease, digest) if MODEL_BACKEND == "compiled" else None
+                if model is None:
+                    model = _joblib_load(io.BytesIO(data))
+            if entry is not None:
+                _drop_cached(kind, disease)  # 모델 내용이 바뀜 → 이전 버전 예측 폐기
+            entry = {
+                "model": model,
+                "path": path,
+                "stat": sig,
+                "sha256": digest,
+                "importance": _importance_table(model, kind, disease),
+            }
+        _REGISTRY[key] = entry
+        return entry
+
+
+def get_model(kind: str, disease: str):
+    """
+    (kind, disease) 모델 반환
+    kind    = "follow" (10년 후 예측) | "base" (단기 예측)
+    disease = "htn" | "dm" | "lip"
+    """
+    return _registry_entry(kind, disease)["model"]
+
+
+def model_version(kind: str, disease: str) -> str:
+    """현재 로딩된 모델 파일의 sha256 (캐시 키/로그용)"""
+    return _registry_entry(kind, disease)["sha256"]
+
+
+def loaded_version(kind: str, disease: str):
+    """이미 로딩된 모델의 sha256 (아직 로딩 전/중이면 None — 로딩을 기다리지 않음)"""
+    entry = _REGISTRY.get((kind, disease))
+    return entry["sha256"] if entry is not None else None
+
+
+def top_features(disease: str, k: int = 3, kind: str = "follow") -> list:
+    """중요도 상위 k개 [(피처, 중요도)] (로딩 시 계산해 둔 순위표에서 잘라 반환)"""
+    return _registry_entry(kind, disease)["importance"][:k]
+
+
+def clear_models():
+    """레지스트리 비우기 (다음 조회 때 다시 로딩) + 예측 캐시 비우기"""
+    with _REGISTRY_LOCK:
+        _REGISTRY.clear()
+    clear_prediction_cache()
 
-MODEL_DIR = "models"
 
-@st.cache_resource
 def load_models(kind="follow"):
     """
-    모델 로딩 함수
+    모델 로딩 함수 (레지스트리 경유, 화면 표시용 질병명 → 모델)
     kind = "follow" (10년 후 예측)
          = "base" (단기 예측)
     """
-    if kind == "follow":
-        model_htn = joblib.load(os.path.join(MODEL_DIR, "follow_model_htn.joblib"))
-        model_dm = joblib.load(os.path.join(MODEL_DIR, "follow_model_dm.joblib"))
-        model_lip = joblib.load(os.path.join(MODEL_DIR, "follow_model_lip.joblib"))
+    return {name: get_model(kind, code) for code, name in DISEASES.items()}
+
+
+# -------------------------------
+# 공통 예측
+# -------------------------------
+# 질병별 양성 판정 임계값 (확률 > 임계값 → 1). 기본 0.5 = 기존 model.predict 와 동일
+THRESHOLDS = {"htn": 0.5, "dm": 0.5, "lip": 0.5}
+
+# 질병 모델 동시 실행 수 (1 이면 순차 실행)
+# - xgboost/lightgbm/sklearn 예측은 GIL 을 놓고 돌기 때문에 스레드만으로 병렬 효과가 남
+# - 지연 시간 ≈ 세 모델의 합 → 가장 느린 모델 하나
+PREDICT_WORKERS = int(os.getenv("PREDICT_WORKERS", "3"))
+
+# 워커 수별 스레드 풀 (요청마다 스레드를 새로 만들지 않도록 프로세스 내 재사용)
+_EXECUTORS: dict = {}
+
+
+def _executor(workers: int) -> ThreadPoolExecutor:
+    with _REGISTRY_LOCK:
+        pool = _EXECUTORS.get(workers)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="predict")
+            _EXECUTORS[workers] = pool
+        return pool
+
+
+# -------------------------------
+# 예측 결과 캐시
+# -------------------------------
+# (kind, disease, 모델 sha256, 피처 행 해시) → 양성 확률 배열 (읽기 전용)
+# - 같은 사용자가 새 데이터 없이 다시 보거나 같은 폼을 재제출하면 추론 생략
+# - 모델 파일이 바뀌면 sha256 이 달라져 자동으로 다른 키 + 레지스트리 재로딩 시 이전 항목 삭제
+# - 행 수가 PREDICT_CACHE_MAX_ROWS 이하인 요청만 캐시 (일괄 점수화는 대상 아님)
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "1024"))   # 0 이면 캐시 끔
+PREDICT_CACHE_TTL = float(os.getenv("PREDICT_CACHE_TTL", "600"))    # 초
+PREDICT_CACHE_MAX_ROWS = 32
+
+_PREDICT_CACHE: OrderedDict = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+_CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+
+def _frame_hash(X) -> str:
+    """피처 행렬 내용 해시 (컬럼 이름/순서 + 값)"""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(X, pd.DataFrame):
+        h.update("\x1f".join(map(str, X.columns)).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
     else:
-        model_htn = joblib.load(os.path.join(MODEL_DIR, "base_model_htn.joblib"))
-        model_dm = joblib.load(os.path.join(MODEL_DIR, "base_model_dm.joblib"))
-        model_lip = joblib.load(os.path.join(MODEL_DIR, "base_model_lip.joblib"))
+        arr = np.ascontiguousarray(X)
+        h.update(str((arr.dtype, arr.shape)).encode("utf-8"))
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def _cache_get(key):
+    with _CACHE_LOCK:
+        found = _PREDICT_CACHE.get(key)
+        if found is not None:
+            expires, prob = found
+            if expires > time.monotonic():
+                _PREDICT_CACHE.move_to_end(key)
+                _CACHE_STATS["hits"] += 1
+                count("model.cache_hit")
+                return prob
+            del _PREDICT_CACHE[key]
+            _CACHE_STATS["expired"] += 1
+        _CACHE_STATS["misses"] += 1
+    count("model.cache_miss")
+    return None
+
+
+def _cache_put(key, prob: np.ndarray):
+    prob.setflags(write=False)
+    with _CACHE_LOCK:
+        _PREDICT_CACHE[key] = (time.monotonic() + PREDICT_CACHE_TTL, prob)
+        _PREDICT_CACHE.move_to_end(key)
+        while len(_PREDICT_CACHE) > PREDICT_CACHE_SIZE:
+            _PREDICT_CACHE.popitem(last=False)
+            _CACHE_STATS["evictions"] += 1
+
+
+def _drop_cached(kind: str, disease: str):
+    with _CACHE_LOCK:
+        for key in [k for k in _PREDICT_CACHE if k[:2] == (kind, disease)]:
+            del _PREDICT_CACHE[key]
+
+
+def clear_prediction_cache():
+    """예측 캐시 비우기 (카운터는 유지)"""
+    with _CACHE_LOCK:
+        _PREDICT_CACHE.clear()
+
+
+def prediction_cache_stats() -> dict:
+    """예측 캐시 적중/미스/축출/만료 횟수 + 현재 크기 + 적중률"""
+    with _CACHE_LOCK:
+        stats = dict(_CACHE_STATS, size=len(_PREDICT_CACHE), max_size=PREDICT_CACHE_SIZE)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / total if total else 0.0
+    return stats
+
 
+def _score_one(kind: str, code: str, X, threshold: float, top_k: int = 0,
+               cache_key=None, prob=None) -> dict:
+    """질병 1개 예측 (스레드 작업 단위, prob 가 주어지면 캐시 적중 → 추론 생략)"""
+    if prob is None:
+        model = get_model(kind, code)  # 첫 호출이면 로딩 시간은 model.load.* 로 따로 기록
+        with timed(f"model.predict.{kind}.{code}"):
+            prob = model.predict_proba(X)[:, 1]
+        if cache_key is not None:
+            _cache_put(cache_key, prob)
+    res = {
+        "name": DISEASES[code],
+        "prob": prob,
+        "pred": (prob > threshold).astype(int),
+        "threshold": threshold,
+    }
+    if top_k:
+        res["top_features"] = top_features(code, top_k, kind=kind)
+    return res
+
+
+def predict_scores(kind: str, X, diseases=None, thresholds=None,
+                   workers: int = None, top_k: int = 0) -> dict:
+    """
+    질병별 모델을 predict_proba 1회씩만 호출하고, 라벨은 임계값으로 도출
+    - X: 모든 질병에 같은 입력이면 DataFrame, 질병별로 다르면 {질병코드: DataFrame}
+    - diseases: 예측할 질병코드 목록 (기본: 전체)
+    - thresholds: {질병코드: 임계값} 으로 THRESHOLDS 일부/전체 덮어쓰기
+    - workers: 질병 모델 동시 실행 수 (기본 PREDICT_WORKERS, 1 이면 순차)
+    - top_k: > 0 이면 각 결과에 "top_features" (중요도 상위 k개) 추가
+    반환: {질병코드: {"name": 표시명, "prob": 양성 확률 배열, "pred": 0/1 배열, "threshold": 임계값}}
+          (diseases 순서 유지)
+    """
+    diseases = list(DISEASES) if diseases is None else list(diseases)
+    thresholds = {**THRESHOLDS, **(thresholds or {})}
+    workers = PREDICT_WORKERS if workers is None else workers
+
+    jobs, hashes = [], {}
+    for code in diseases:
+        X_code = X[code] if isinstance(X, dict) else X
+        key = prob = None
+        if PREDICT_CACHE_SIZE > 0 and len(X_code) <= PREDICT_CACHE_MAX_ROWS:
+            if id(X_code) not in hashes:
+                hashes[id(X_code)] = _frame_hash(X_code)
+            key = (kind, code, model_version(kind, code), hashes[id(X_code)])
+            prob = _cache_get(key)
+        jobs.append((kind, code, X_code, thresholds[code], top_k, key, prob))
+
+    # 캐시 적중분은 바로, 나머지만 스레드 풀로
+    misses = [job for job in jobs if job[-1] is None]
+    if workers <= 1 or len(misses) <= 1:
+        return {job[1]: _score_one(*job) for job in jobs}
+
+    pool = _executor(workers)
+    futures = {job[1]: pool.submit(_score_one, *job) for job in misses}
     return {
-        "고혈압": model_htn,
-        "당뇨병": model_dm,
-        "고지혈증": model_lip
+        job[1]: futures[job[1]].result() if job[1] in futures else _score_one(*job)
+        for job in jobs
     }
 
+
+# 개인별 기여도 순위에서 빼는 입력 (식별자 원핫 — 사용자에게 설명할 요인이 아님)
+ATTRIBUTION_EXCLUDE = {"T00_ID"}
+
+
+def _explainer(kind: str, disease: str):
+    """모델별 기여도 계산기 (레지스트리 항목에 1회 생성, compiled 트리 모델이면 원본 joblib 으로 생성)"""
+    from utils.compiled_model import Explainer
+
+    entry = _registry_entry(kind, disease)
+    explainer = entry.get("explainer")
+    if explainer is None:
+        try:
+            explainer = Explainer(entry["model"])
+        except ValueError:
+            if not hasattr(entry["model"], "c"):
+                raise
+            explainer = Explainer(_joblib_load(entry["path"]))
+        entry["explainer"] = explainer
+    return explainer
+
+
+def _explain_one(kind: str, code: str, X, top_k: int) -> dict:
+    """질병 1개 기여도 (스레드 작업 단위)"""
+    explainer = _explainer(kind, code)
+    with timed(f"model.explain.{kind}.{code}"):
+        contrib, bias = explainer.contributions(X)
+    names = _input_names(_registry_entry(kind, code)["model"], kind, code)
+    if names is None or len(names) != contrib.shape[1]:
+        raise ValueError(f"{kind}/{code} 모델의 피처 이름과 기여도 개수가 다릅니다.")
+
+    ranked = np.abs(contrib)
+    ranked[:, [i for i, n in enumerate(names) if n in ATTRIBUTION_EXCLUDE]] = -1.0
+    order = np.argsort(-ranked, axis=1, kind="stable")[:, :top_k]
+    top = [[(names[j], float(contrib[i, j])) for j in row] for i, row in enumerate(order)]
+    return {"names": names, "contrib": contrib, "bias": bias, "top": top}
+
+
+def explain_scores(kind: str, X, diseases=None, top_k: int = 3, workers: int = None) -> dict:
+    """
+    행별 · 피처별 예측 기여도 (로그오즈 단위, 질병별 배치 1회 호출)
+    - X / diseases / workers: predict_scores 와 같음
+    - XGBoost/LightGBM 은 부스터 내장 TreeSHAP, 선형 모델은 coef × 스케일링된 값
+    반환: {질병코드: {"names": 입력 피처 이름, "contrib": n×피처 배열, "bias": 길이 n 기준값,
+                      "top": 행마다 [(피처, 기여도), ...] (|기여도| 상위 top_k, 양수 = 위험 증가)}}
+    """
+    diseases = list(DISEASES) if diseases is None else list(diseases)
+    workers = PREDICT_WORKERS if workers is None else workers
+    jobs = [(kind, code, X[code] if isinstance(X, dict) else X, top_k) for code in diseases]
+    if workers <= 1 or len(jobs) <= 1:
+        return {job[1]: _explain_one(*job) for job in jobs}
+
+    pool = _executor(workers)
+    futures = {job[1]: pool.submit(_explain_one, *job) for job in jobs}
+    return {code: f.result() for code, f in futures.items()}
+
+
+def predict_follow(input_df: pd.DataFrame, workers: int = None, top_k: int = 3, personalized: bool = True):
+    """
+    10년 후 예측 화면용: 질병 3종을 동시에 예측해 화면/GPT 설명에 쓰는 형태로 반환
+    반환: (scores, results_prob, feature_importances)
+      - scores: predict_scores 결과 (질병코드 키)
+      - results_prob: {표시명: 첫 행 확률}
+      - feature_importances: {표시명: [(피처, 값), ...]}
+          personalized=True  → 첫 행의 개인별 기여도 상위 top_k (로그오즈, 양수 = 위험 증가)
+          personalized=False → 모델 전역 중요도 상위 top_k
+    """
+    scores = predict_scores("follow", input_df, workers=workers, top_k=0 if personalized else top_k)
+    results_prob = {res["name"]: float(res["prob"][0]) for res in scores.values()}
+    if personalized:
+        explained = explain_scores("follow", input_df.iloc[:1], diseases=list(scores), top_k=top_k,
+                                   workers=workers)
+        feature_importances = {scores[code]["name"]: exp["top"][0] for code, exp in explained.items()}
+    else:
+        feature_importances = {res["name"]: res["top_features"] for res in scores.values()}
+    return scores, results_prob, feature_importances
+
+
+def base_input_groups(diseases=None) -> list:
+    """
+    base 모델 입력 피처(feature_names_in_, 없으면 전처리 스키마)가 같은 질병끼리 묶음
+    - 기본 모델 기준 [["htn", "lip"], ["dm"]] → 전처리 2회로 질병 3종 예측
+    """
+    diseases = list(DISEASES) if diseases is None else list(diseases)
+    groups = {}
+    for code in diseases:
+        names = _input_names(get_model("base", code), "base", code)
+        groups.setdefault(tuple(names), []).append(code)
+    return list(groups.values())
+
+
+def predict_base(raw_df: pd.DataFrame, diseases=None, workers: int = None, top_k: int = 0) -> dict:
+    """
+    단기 예측 여러 질병 한 번에: 원본 입력 n행 → predict_scores 결과 (질병코드 키)
+    - 입력 피처가 같은 질병은 피처 행렬을 1번만 만들어 공유 (예측 캐시 해시도 1번)
+    """
+    diseases = list(DISEASES) if diseases is None else list(diseases)
+    X = preprocess_base_shared(raw_df, diseases, groups=base_input_groups(diseases))
+    return predict_scores("base", X, diseases=diseases, workers=workers, top_k=top_k)
+
+
+def score_population(df: pd.DataFrame, workers: int = None) -> pd.DataFrame:
+    """
+    여러 사용자의 누적 데이터(follow_sample.csv 스키마)를 한 번에 10년 후 예측
+    - preprocess_followup_many 로 T_ID 별 피처 행렬 1개 생성
+    - 질병별 follow 모델의 predict_proba 를 행렬 전체에 대해 1회만 호출
+    반환: T_ID, prob_htn, prob_dm, prob_lip 컬럼의 DataFrame (T_ID 오름차순)
+    """
+    X = preprocess_followup_many(df)
+    out = pd.DataFrame({"T_ID": df["T_ID"].dropna().sort_values().unique()})
+    if X.empty:
+        return out
+
+    for code, res in predict_scores("follow", X, workers=workers).items():
+        out[f"prob_{code}"] = res["prob"]
+    return out
+
+
+def score_base_population(df: pd.DataFrame, workers: int = None) -> pd.DataFrame:
+    """
+    여러 사용자의 데이터(follow_sample.csv 스키마)로 단기(base) 예측 일괄 수행
+    - 화면과 같이 사용자별 마지막 저장 행(입력 순서 기준) 1개를 사용
+    - 피처 행렬을 입력 스키마별로 한 번에 만들고(htn/lip 공유) 질병별 predict_proba 1회
+    반환: T_ID, prob_htn, prob_dm, prob_lip 컬럼의 DataFrame (T_ID 오름차순)
+    """
+    last = df[pd.notna(df["T_ID"])].drop_duplicates("T_ID", keep="last")
+    last = last.sort_values("T_ID", kind="stable").reset_index(drop=True)
+    out = pd.DataFrame({"T_ID": last["T_ID"].to_numpy()})
+    if last.empty:
+        return out
+
+    for code, res in predict_base(last, workers=workers).items():
+        out[f"prob_{code}"] = res["prob"]
+    return out
+
+
+# -------------------------------
+# 미리 로딩 (warm start)
+# -------------------------------
+# 첫 요청이 ML 라이브러리 import + 역직렬화를 기다리지 않도록 서버 시작 시 한 번 수행
+ML_MODULES = ("sklearn", "xgboost", "lightgbm")
+
+_PRELOAD_THREAD = None
+PRELOAD_REPORT: dict = {}
+
+
+def _warmup_input(kind: str, disease: str) -> pd.DataFrame:
+    """더미 1행(모든 항목 -1)을 실제 전처리에 통과시킨 모델 입력"""
+    raw = {col: -1 for col in COLUMNS}
+    raw.update({"T_ID": 0, "EDATE": "2000-01-01"})
+    raw_df = pd.DataFrame([raw])
+    if kind == "base":
+        return preprocess_base(raw_df, disease)
+    return preprocess_followup(raw_df)
+
+
+def preload_models(warm: bool = True) -> dict:
+    """
+    ML 라이브러리 import + base/follow 모델 6개 로딩 (+ 더미 예측 1회)
+    반환 / PRELOAD_REPORT: {"import:xgboost": 초, "follow/htn": {"load": 초, "warm": 초}, ...}
+    - 로딩 실패(파일 없음 등)는 {"error": 메시지} 로 기록하고 나머지를 계속 진행
+    """
+    report = {}
+    for name in ML_MODULES:
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            report[f"import:{name}"] = time.perf_counter() - t0
+        except ImportError as e:
+            report[f"import:{name}"] = {"error": str(e)}
+
+    for kind in KINDS:
+        for disease in DISEASES:
+            timing = {}
+            try:
+                t0 = time.perf_counter()
+                model = get_model(kind, disease)
+                timing["load"] = time.perf_counter() - t0
+                if warm:
+                    t0 = time.perf_counter()
+                    model.predict_proba(_warmup_input(kind, disease))
+                    timing["warm"] = time.perf_counter() - t0
+            except Exception as e:
+                timing["error"] = str(e)
+            report[f"{kind}/{disease}"] = timing
+
+    PRELOAD_REPORT.clear()
+    PRELOAD_REPORT.update(report)
+    return report
+
+
+def start_preload(warm: bool = True) -> threading.Thread:
+    """
+    preload_models 를 백그라운드 스레드로 1회 실행 (이미 시작했으면 그 스레드 반환)
+    - 로딩 중 들어온 요청은 레지스트리 키 잠금에서 같은 로딩 완료를 기다림
+    """
+    global _PRELOAD_THREAD
+    with _REGISTRY_LOCK:
+        if _PRELOAD_THREAD is None:
+            _PRELOAD_THREAD = threading.Thread(
+                target=preload_models, kwargs={"warm": warm}, name="model-preload", daemon=True
+            )
+            _PRELOAD_THREAD.start()
+        return _PRELOAD_THREAD
+
+
+def preload_running() -> bool:
+    """start_preload 로 시작한 미리 로딩이 아직 진행 중인지"""
+    thread = _PRELOAD_THREAD
+    return thread is not None and thread.is_alive()
+
+
+def _format_report(report: dict) -> str:
+    lines = []
+    for key, val in report.items():
+        if isinstance(val, dict):
+            if "error" in val:
+                lines.append(f"{key:<16} ERROR {val['error']}")
+            else:
+                lines.append(f"{key:<16} " + "  ".join(f"{k} {v * 1000:8.1f} ms" for k, v in val.items()))
+        else:
+            lines.append(f"{key:<16} {val * 1000:8.1f} ms")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="모델 관련 유틸")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_preload = sub.add_parser("preload", help="ML 라이브러리 import + 모델 6개 로딩 시간 측정")
+    p_preload.add_argument("--no-warm", action="store_true", help="더미 예측(워밍업) 생략")
+    args = parser.parse_args()
+
+    if args.command == "preload":
+        t0 = time.perf_counter()
+        print(_format_report(preload_models(warm=not args.no_warm)))
+        print(f"{'total':<16} {(time.perf_counter() - t0) * 1000:8.1f} ms")
@@ -11,7 +11,16 @@ utils/preprocess.py
   - preprocess_base_dm(row_df: pd.DataFrame) -> pd.DataFrame(1행) - 당뇨병용
   - preprocess_base_htn_lip(row_df: pd.DataFrame) -> pd.DataFrame(1행) - 고혈압/고지혈증용
   - preprocess_base(row_df: pd.DataFrame, disease_type: str) -> pd.DataFrame(1행) - 통합 함수
+  - preprocess_base_many(df: pd.DataFrame, disease_type: str) -> pd.DataFrame(n행) - 일괄 예측용
+  - preprocess_base_shared(df: pd.DataFrame, diseases) -> {질병: pd.DataFrame(n행)}
+    - 스키마가 같은 질병(htn/lip)은 1번만 만들어 같은 DataFrame 을 공유
+  - build_base_matrix(df: pd.DataFrame, disease_type: str) -> np.ndarray(n×k)
+  - build_base_row(row: dict, disease_type: str) -> np.ndarray(1×k) - 단건 요청용
+  - base_input_columns(disease_type) / FOLLOWUP_INPUT_COLUMNS - 전처리가 읽는 원본 컬럼
   - preprocess_followup(df_user: pd.DataFrame) -> pd.DataFrame(1행)
+  - preprocess_followup_many(df: pd.DataFrame) -> pd.DataFrame(T_ID별 1행)
+  - new_followup_state / update_followup_state / preprocess_followup_state
+    - 사용자별 누적 상태를 시점 추가 때마다 O(1) 갱신, 상태 → 1행 변환
   - column_meaning: Dict[str, str]
 
 주의:
@@ -23,86 +32,323 @@ from __future__ import annotations
 
 import pandas as pd
 import numpy as np
-from collections import Counter
 
+from utils.metrics import timed
 
 # -------------------------------
 # 단기(현재 입력 1행) 전처리 - 질병별 분리
 # -------------------------------
+# 학습 당시 컬럼 순서 그대로의 피처 스키마: (피처명, 방식, 인자)
+#   raw     = 원본 컬럼 값 그대로 (컬럼이 없으면 -1)
+#   derived = 파생값 (BMI / TOTAL_DRINK / SMOKE)
+#   onehot  = (원본 컬럼, 값) 일치 여부 1/0
+#   const   = 입력 폼에 없는 항목의 고정값
+# 모듈 로드 시 한 번 인덱스 배열로 컴파일해 두고, 요청마다 미리 할당한 행렬에 바로 채웁니다.
+
+def _widen_float32(a: np.ndarray) -> np.ndarray:
+    """
+    float32 → float64 변환 시 원래 십진 값 복원 (유효숫자 6자리로 반올림: 73.1f → 73.1)
+    - 그냥 넓히면 73.09999847... 가 되어 평균/변화량이 학습 때 값과 미세하게 달라지고
+      트리 분기 임계값(관측값 자체)에서 판정이 뒤집힐 수 있음
+    """
+    a = a.astype("float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mag = np.floor(np.log10(np.abs(a)))
+    ok = np.isfinite(mag)
+    scale = 10.0 ** np.where(ok, 5 - mag, 0)
+    return np.where(ok, np.round(a * scale) / scale, a)
+
+
+def _numeric_block(df: pd.DataFrame, cols, fill=np.nan) -> np.ndarray:
+    """
+    여러 컬럼을 한 번에 n×k float64 행렬로 변환 (컬럼마다 to_numeric 을 부르지 않음)
+    - 숫자로 못 바꾸는 값은 NaN, 없는 컬럼은 fill (스칼라 또는 컬럼별 배열)
+    - float32 컬럼(io_utils 스트리밍 읽기)은 십진 값을 복원해 float64 로
+    """
+    present = [c for c in cols if c in df.columns]
+    sub = df[present]
+    if all(pd.api.types.is_numeric_dtype(t) for t in sub.dtypes):
+        part = sub.to_numpy(dtype="float64", na_value=np.nan)
+        f32 = [j for j, t in enumerate(sub.dtypes) if t == np.float32]
+        if f32:
+            part[:, f32] = _widen_float32(part[:, f32])
+    else:
+        part = sub.apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+    if len(present) == len(cols):
+        return part
+    mat = np.empty((len(df), len(cols)))
+    mat[:] = fill
+    if present:
+        mat[:, [cols.index(c) for c in present]] = part
+    return mat
+
+
+# 안전한 수치 변환 대상 (없는 컬럼은 NaN)
+BASE_NUMERIC_COLS = [
+    "HEIGHT", "WEIGHT", "WAIST", "HIP", "SBP", "DBP", "PULSE",
+    "T_DRINKAM", "T_SMOKEAM", "EXER", "HBA1C", "GLU", "HOMAIR",
+    "TCHL", "HDL", "TG", "AST", "ALT", "CREATININE"
+]
+
+# 당뇨병 모델용 피처 (44개) - 원시 피처
+BASE_DM_SCHEMA = [
+    ("T_SEX", "raw", "SEX"),
+    ("T_AGE", "raw", "T_AGE"),
+    ("T_INCOME", "const", -1),
+    ("T_MARRY", "const", -1),
+    ("T_FMFHT1", "raw", "FMFHT"),
+    ("T_FMFHT2", "raw", "FMMHT"),
+    ("T_FMFDM1", "raw", "FMFDM"),
+    ("T_FMFDM2", "raw", "FMMDM"),
+    ("T_DRINK", "raw", "T_DRINK"),
+    ("T_DRDU", "const", -1),
+    *[(f"T_{d}{k}", "const", -1)
+      for d in ["TAK", "RICE", "WINE", "SOJU", "BEER", "HLIQ"] for k in ["FQ", "AM"]],
+    ("T_TOTALC", "derived", "TOTAL_DRINK"),
+    ("T_SMOKE", "raw", "T_SMOKE"),
+    ("T_SMDUYR", "const", -1),
+    ("T_SMDUMO", "const", -1),
+    ("T_SMAM", "derived", "SMOKE"),
+    ("T_PACKYR", "const", -1),
+    ("T_PSM", "const", -1),
+    ("T_EXER", "raw", "EXER"),
+    ("T_MNSAG", "raw", "MNSAG"),
+    ("T_PMYN", "const", -1),
+    ("T_PMAG", "const", -1),
+    ("T_PREG", "const", -1),
+    ("T_FPREGAG", "const", -1),
+    ("T_PULSE", "raw", "PULSE"),
+    ("T_WAIST", "raw", "WAIST"),
+    ("T_HIP", "raw", "HIP"),
+    ("T_HEIGHT", "raw", "HEIGHT"),
+    ("T_WEIGHT", "raw", "WEIGHT"),
+    ("T_BMI", "derived", "BMI"),
+    ("T_CREATINE", "raw", "CREATININE"),
+    ("T_AST", "raw", "AST"),
+    ("T_ALT", "raw", "ALT"),
+]
+
+# 고혈압/고지혈증 모델용 피처 (120개) - 카테고리컬 인코딩된 피처
+BASE_HTN_LIP_SCHEMA = [
+    # 기본 연속형 피처들
+    ("T_AGE", "raw", "T_AGE"),
+    *[(f"T_{c}", "const", -1.0) for c in ["TAKAM", "RICEAM", "WINEAM", "SOJUAM", "BEERAM", "HLIQAM",
+                                          "TOTALC", "SMDUYR", "SMDUMO", "SMAM", "PACKYR"]],
+    ("T_MNSAG", "raw", "MNSAG"),
+    ("T_PMAG", "const", -1.0),
+    ("T_FPREGAG", "const", -1.0),
+    ("T_PULSE", "raw", "PULSE"),
+    ("T_WAIST", "raw", "WAIST"),
+    ("T_HIP", "raw", "HIP"),
+    ("T_HEIGHT", "raw", "HEIGHT"),
+    ("T_WEIGHT", "raw", "WEIGHT"),
+    ("T_BMI", "derived", "BMI"),
+    ("T_CREATINE", "raw", "CREATININE"),  # 오타: CREATINE
+    ("T_AST", "raw", "AST"),
+    ("T_ALT", "raw", "ALT"),
+    # 성별
+    ("T_SEX_1", "onehot", ("SEX", 1)),
+    ("T_SEX_2", "onehot", ("SEX", 2)),
+    # 수입/결혼상태 (입력 없음: 모두 0)
+    *[(f"T_INCOME_{i}.0", "const", 0) for i in range(1, 9)],
+    *[(f"T_MARRY_{i}.0", "const", 0) for i in range(1, 7)],
+    # 가족력 (학습 당시 매핑 그대로: FMFHT1/2 ← FMMHT, FMFDM1/2 ← FMFDM)
+    *[(f"T_{name}_{v}", "onehot", (src, v))
+      for name, src in [("FMFHT1", "FMMHT"), ("FMFHT2", "FMMHT"), ("FMFDM1", "FMFDM"), ("FMFDM2", "FMFDM")]
+      for v in (1, 2)],
+    # 음주 여부
+    *[(f"T_DRINK_{v}.0", "onehot", ("T_DRINK", v)) for v in (-1, 1, 2, 3)],
+    # 음주 기간 / 주종별 음주 빈도 (입력 없음: 모두 0)
+    *[(f"T_DRDU_{i}.0", "const", 0) for i in (-1, 1, 2, 3, 4)],
+    *[(f"T_{d}FQ_{f}.0", "const", 0)
+      for d in ["TAK", "RICE", "WINE", "SOJU", "BEER", "HLIQ"] for f in (-1, 0, 1, 2, 3, 4, 5, 6)],
+    # 흡연 여부
+    *[(f"T_SMOKE_{v}.0", "onehot", ("T_SMOKE", v)) for v in (-1, 1, 2, 3)],
+    # 간접 흡연 (입력 없음: 모두 0)
+    ("T_PSM_1.0", "const", 0),
+    ("T_PSM_2.0", "const", 0),
+    # 운동 여부
+    *[(f"T_EXER_{v}.0", "onehot", ("EXER", v)) for v in (-1, 1, 2)],
+    # 여성 전용 (입력 없음: 모두 0)
+    *[(f"T_{c}_{v}.0", "const", 0) for c in ("PMYN", "PREG") for v in (-1, 1, 2)],
+]
+
+_DERIVED = ["BMI", "TOTAL_DRINK", "SMOKE"]
+# 파생값 계산에 필요한 원본 컬럼 → 그 컬럼을 쓰는 파생값
+_DERIVED_INPUTS = {
+    "HEIGHT": ["BMI"], "WEIGHT": ["BMI"],
+    "T_DRINK": ["TOTAL_DRINK"], "T_DRINKAM": ["TOTAL_DRINK"],
+    "T_SMOKE": ["SMOKE"], "T_SMOKEAM": ["SMOKE"],
+}
+
+
+def _compile_schema(schema) -> dict:
+    """피처 스키마 → 원본 컬럼 목록 + 채우기용 인덱스 배열"""
+    names = [name for name, _, _ in schema]
+    sources = []  # 원본 행렬의 컬럼 순서 (원본 컬럼 + 파생값)
+
+    def src_idx(col):
+        if col not in sources:
+            sources.append(col)
+        return sources.index(col)
+
+    template = np.zeros(len(schema))
+    copy_dst, copy_src, oh_dst, oh_src, oh_val = [], [], [], [], []
+    for j, (_, how, arg) in enumerate(schema):
+        if how == "const":
+            template[j] = arg
+        elif how in ("raw", "derived"):
+            copy_dst.append(j)
+            copy_src.append(src_idx(arg))
+        elif how == "onehot":
+            oh_dst.append(j)
+            oh_src.append(src_idx(arg[0]))
+            oh_val.append(arg[1])
+        else:
+            raise ValueError(f"Unknown feature kind: {how}")
+
+    inputs = [c for c in sources if c not in _DERIVED]
+    for c in _DERIVED_INPUTS:
+        if any(d in sources for d in _DERIVED_INPUTS[c]) and c not in inputs:
+            inputs.append(c)
+
+    return {
+        "names": names,
+        "sources": sources,
+        "inputs": inputs,
+        "input_fill": np.array([np.nan if c in BASE_NUMERIC_COLS else -1.0 for c in inputs]),
+        "template": template,
+        "copy": (np.array(copy_dst, dtype=int), np.array(copy_src, dtype=int)),
+        "onehot": (np.array(oh_dst, dtype=int), np.array(oh_src, dtype=int), np.array(oh_val, dtype=float)),
+    }
+
+
+BASE_SCHEMAS = {
+    "dm": _compile_schema(BASE_DM_SCHEMA),
+    "htn": _compile_schema(BASE_HTN_LIP_SCHEMA),
+    "lip": _compile_schema(BASE_HTN_LIP_SCHEMA),
+}
+
+
+def _base_schema(disease_type: str) -> dict:
+    try:
+        return BASE_SCHEMAS[disease_type]
+    except KeyError:
+        raise ValueError(f"Unknown disease type: {disease_type}") from None
+
+
+def base_feature_names(disease_type: str) -> list[str]:
+    """질병별 단기 모델 입력 컬럼 (학습 당시 순서)"""
+    return list(_base_schema(disease_type)["names"])
+
+
+def base_input_columns(disease_type: str) -> list[str]:
+    """질병별 단기 전처리가 읽는 원본 컬럼 (컬럼 단위 로딩/projection 용)"""
+    return list(_base_schema(disease_type)["inputs"])
+
+
+def _source_matrix(block: np.ndarray, schema: dict) -> np.ndarray:
+    """입력 컬럼 행렬(block; schema["inputs"] 순서) → 원본/파생값 행렬 (schema["sources"] 순서)"""
+    col = {c: block[:, j] for j, c in enumerate(schema["inputs"])}
+
+    out = np.empty((block.shape[0], len(schema["sources"])))
+    for j, c in enumerate(schema["sources"]):
+        if c == "BMI":
+            height, weight = col["HEIGHT"], col["WEIGHT"]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                bmi = weight / (height / 100) ** 2
+            out[:, j] = np.where((height > 0) & ~np.isnan(weight), bmi, -1)
+        elif c == "TOTAL_DRINK":
+            out[:, j] = np.where(col["T_DRINK"] == 3, col["T_DRINKAM"], 0)
+        elif c == "SMOKE":
+            out[:, j] = np.where(col["T_SMOKE"] == 3, col["T_SMOKEAM"], 0)
+        else:
+            out[:, j] = col[c]
+    return out
+
+
+def _fill_base(src: np.ndarray, schema: dict) -> np.ndarray:
+    """상수 템플릿을 복사한 뒤 원본/파생/원핫 컬럼만 인덱스로 채움"""
+    X = np.empty((src.shape[0], len(schema["names"])))
+    X[:] = schema["template"]
+    dst, idx = schema["copy"]
+    X[:, dst] = src[:, idx]
+    dst, idx, val = schema["onehot"]
+    X[:, dst] = src[:, idx] == val
+    return X
+
+
+def build_base_matrix(df: pd.DataFrame, disease_type: str = "dm") -> np.ndarray:
+    """
+    입력 n행 → 질병별 단기 모델 입력 n×k 행렬 (컬럼 순서 = base_feature_names)
+    """
+    schema = _base_schema(disease_type)
+    # 수치 변환 대상이 없으면 NaN, 그 외 항목은 -1 (기존 r.get(col, -1) 과 동일)
+    block = _numeric_block(df, schema["inputs"], fill=schema["input_fill"])
+    return _fill_base(_source_matrix(block, schema), schema)
+
+
+def _to_number(val) -> float:
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def build_base_row(row: dict, disease_type: str = "dm") -> np.ndarray:
+    """
+    입력 1행(dict) → 단기 모델 입력 1×k 행렬
+    - DataFrame을 거치지 않는 단건 요청용 경로 (build_base_matrix 와 같은 결과)
+    """
+    schema = _base_schema(disease_type)
+    block = np.array([[
+        _to_number(row[c]) if c in row else fill
+        for c, fill in zip(schema["inputs"], schema["input_fill"])
+    ]])
+    return _fill_base(_source_matrix(block, schema), schema)
+
+
+@timed("preprocess.base_many")
+def preprocess_base_many(df: pd.DataFrame, disease_type: str = "dm") -> pd.DataFrame:
+    """
+    여러 행을 한 번에 단기 모델 입력으로 변환 (행마다 1행씩, 일괄 예측용)
+    """
+    return pd.DataFrame(build_base_matrix(df, disease_type), columns=base_feature_names(disease_type),
+                        index=df.index)
+
+
+def base_schema_groups(diseases=("htn", "dm", "lip")) -> list[list[str]]:
+    """피처 이름 목록이 같은 질병끼리 묶음 (입력 순서 유지) — 기본: [["htn", "lip"], ["dm"]]"""
+    groups = {}
+    for code in diseases:
+        groups.setdefault(tuple(_base_schema(code)["names"]), []).append(code)
+    return list(groups.values())
+
+
+@timed("preprocess.base_shared")
+def preprocess_base_shared(df: pd.DataFrame, diseases=("htn", "dm", "lip"), groups=None) -> dict:
+    """
+    여러 질병의 단기 모델 입력을 스키마별로 1번씩만 생성 → {질병: DataFrame(n행)}
+    - groups: 같은 입력을 쓰는 질병 묶음 (기본: base_schema_groups, model_utils 는 모델의 feature_names_in_ 기준)
+    - 같은 묶음의 질병은 같은 DataFrame 객체를 공유 (읽기 전용으로 사용)
+    """
+    groups = base_schema_groups(diseases) if groups is None else groups
+    out = {}
+    for group in groups:
+        X = preprocess_base_many(df, group[0])
+        for code in group:
+            out[code] = X
+    return {code: out[code] for code in diseases}
+
+
 def preprocess_base_dm(row_df: pd.DataFrame) -> pd.DataFrame:
     """
     당뇨병 모델용 전처리 (44개 원시 피처)
     """
     if row_df.empty:
         return pd.DataFrame([{}])
-
-    r = row_df.iloc[0].copy()
-
-    # 안전한 수치 변환
-    for col in [
-        "HEIGHT", "WEIGHT", "WAIST", "HIP", "SBP", "DBP", "PULSE",
-        "T_DRINKAM", "T_SMOKEAM", "EXER", "HBA1C", "GLU", "HOMAIR",
-        "TCHL", "HDL", "TG", "AST", "ALT", "CREATININE"
-    ]:
-        r[col] = pd.to_numeric(r.get(col, np.nan), errors="coerce")
-
-    # 파생 계산
-    BMI = -1
-    if pd.notna(r.get("HEIGHT")) and pd.notna(r.get("WEIGHT")) and r.get("HEIGHT", 0) > 0:
-        BMI = r["WEIGHT"] / ((r["HEIGHT"] / 100) ** 2)
-
-    TOTAL_DRINK = r.get("T_DRINKAM", 0) if r.get("T_DRINK") == 3 else 0
-    SMOKE = r.get("T_SMOKEAM", 0) if r.get("T_SMOKE") == 3 else 0
-
-    # 당뇨병 모델용 피처 (44개) - 원시 피처
-    dm_feat = {
-        "T_SEX": r.get("SEX", -1),
-        "T_AGE": r.get("T_AGE", -1),
-        "T_INCOME": -1,  # 기본값
-        "T_MARRY": -1,   # 기본값
-        "T_FMFHT1": r.get("FMFHT", -1),
-        "T_FMFHT2": r.get("FMMHT", -1),
-        "T_FMFDM1": r.get("FMFDM", -1),
-        "T_FMFDM2": r.get("FMMDM", -1),
-        "T_DRINK": r.get("T_DRINK", -1),
-        "T_DRDU": -1,    # 기본값
-        "T_TAKFQ": -1,   # 기본값
-        "T_TAKAM": -1,   # 기본값
-        "T_RICEFQ": -1,  # 기본값
-        "T_RICEAM": -1,  # 기본값
-        "T_WINEFQ": -1,  # 기본값
-        "T_WINEAM": -1,  # 기본값
-        "T_SOJUFQ": -1,  # 기본값
-        "T_SOJUAM": -1,  # 기본값
-        "T_BEERFQ": -1,  # 기본값
-        "T_BEERAM": -1,  # 기본값
-        "T_HLIQFQ": -1,  # 기본값
-        "T_HLIQAM": -1,  # 기본값
-        "T_TOTALC": TOTAL_DRINK,
-        "T_SMOKE": r.get("T_SMOKE", -1),
-        "T_SMDUYR": -1,  # 기본값
-        "T_SMDUMO": -1,  # 기본값
-        "T_SMAM": SMOKE,
-        "T_PACKYR": -1,  # 기본값
-        "T_PSM": -1,     # 기본값
-        "T_EXER": r.get("EXER", -1),
-        "T_MNSAG": r.get("MNSAG", -1),
-        "T_PMYN": -1,    # 기본값
-        "T_PMAG": -1,    # 기본값
-        "T_PREG": -1,    # 기본값
-        "T_FPREGAG": -1, # 기본값
-        "T_PULSE": r.get("PULSE", -1),
-        "T_WAIST": r.get("WAIST", -1),
-        "T_HIP": r.get("HIP", -1),
-        "T_HEIGHT": r.get("HEIGHT", -1),
-        "T_WEIGHT": r.get("WEIGHT", -1),
-        "T_BMI": BMI,
-        "T_CREATINE": r.get("CREATININE", -1),
-        "T_AST": r.get("AST", -1),
-        "T_ALT": r.get("ALT", -1),
-    }
-    
-    return pd.DataFrame([dm_feat])
+    return pd.DataFrame(build_base_row(row_df.iloc[0].to_dict(), "dm"), columns=base_feature_names("dm"))
 
 
 def preprocess_base_htn_lip(row_df: pd.DataFrame) -> pd.DataFrame:
@@ -111,129 +357,10 @@ def preprocess_base_htn_lip(row_df: pd.DataFrame) -> pd.DataFrame:
     """
     if row_df.empty:
         return pd.DataFrame([{}])
-
-    r = row_df.iloc[0].copy()
-
-    # 안전한 수치 변환
-    for col in [
-        "HEIGHT", "WEIGHT", "WAIST", "HIP", "SBP", "DBP", "PULSE",
-        "T_DRINKAM", "T_SMOKEAM", "EXER", "HBA1C", "GLU", "HOMAIR",
-        "TCHL", "HDL", "TG", "AST", "ALT", "CREATININE"
-    ]:
-        r[col] = pd.to_numeric(r.get(col, np.nan), errors="coerce")
-
-    # 파생 계산
-    BMI = -1
-    if pd.notna(r.get("HEIGHT")) and pd.notna(r.get("WEIGHT")) and r.get("HEIGHT", 0) > 0:
-        BMI = r["WEIGHT"] / ((r["HEIGHT"] / 100) ** 2)
-
-    TOTAL_DRINK = r.get("T_DRINKAM", 0) if r.get("T_DRINK") == 3 else 0
-    SMOKE = r.get("T_SMOKEAM", 0) if r.get("T_SMOKE") == 3 else 0
-
-    # 고혈압/고지혈증 모델용 피처 (120개) - 카테고리컬 인코딩된 피처
-    feat = {}
-    
-    # 기본 연속형 피처들
-    feat["T_AGE"] = r.get("T_AGE", -1)
-    feat["T_TAKAM"] = -1.0
-    feat["T_RICEAM"] = -1.0
-    feat["T_WINEAM"] = -1.0
-    feat["T_SOJUAM"] = -1.0
-    feat["T_BEERAM"] = -1.0
-    feat["T_HLIQAM"] = -1.0
-    feat["T_TOTALC"] = -1.0
-    feat["T_SMDUYR"] = -1.0
-    feat["T_SMDUMO"] = -1.0
-    feat["T_SMAM"] = -1.0
-    feat["T_PACKYR"] = -1.0
-    feat["T_MNSAG"] = r.get("MNSAG", -1)
-    feat["T_PMAG"] = -1.0
-    feat["T_FPREGAG"] = -1.0
-    feat["T_PULSE"] = r.get("PULSE", -1)
-    feat["T_WAIST"] = r.get("WAIST", -1)
-    feat["T_HIP"] = r.get("HIP", -1)
-    feat["T_HEIGHT"] = r.get("HEIGHT", -1)
-    feat["T_WEIGHT"] = r.get("WEIGHT", -1)
-    feat["T_BMI"] = BMI
-    feat["T_CREATINE"] = r.get("CREATININE", -1)  # 오타: CREATINE
-    feat["T_AST"] = r.get("AST", -1)
-    feat["T_ALT"] = r.get("ALT", -1)
-    
-    # 성별 카테고리컬 피처
-    sex_val = r.get("SEX", -1)
-    feat["T_SEX_1"] = 1 if sex_val == 1 else 0
-    feat["T_SEX_2"] = 1 if sex_val == 2 else 0
-    
-    # 수입 카테고리컬 피처 (기본값: 모두 0)
-    for i in range(1, 9):
-        feat[f"T_INCOME_{i}.0"] = 0
-    
-    # 결혼상태 카테고리컬 피처 (기본값: 모두 0)
-    for i in range(1, 7):
-        feat[f"T_MARRY_{i}.0"] = 0
-    
-    # 가족력 카테고리컬 피처
-    fmmht_val = r.get("FMMHT", -1)
-    feat["T_FMFHT1_1"] = 1 if fmmht_val == 1 else 0
-    feat["T_FMFHT1_2"] = 1 if fmmht_val == 2 else 0
-    
-    fmmht_val = r.get("FMMHT", -1)
-    feat["T_FMFHT2_1"] = 1 if fmmht_val == 1 else 0
-    feat["T_FMFHT2_2"] = 1 if fmmht_val == 2 else 0
-    
-    fmfdm_val = r.get("FMFDM", -1)
-    feat["T_FMFDM1_1"] = 1 if fmfdm_val == 1 else 0
-    feat["T_FMFDM1_2"] = 1 if fmfdm_val == 2 else 0
-    
-    fmfdm_val = r.get("FMFDM", -1)
-    feat["T_FMFDM2_1"] = 1 if fmfdm_val == 1 else 0
-    feat["T_FMFDM2_2"] = 1 if fmfdm_val == 2 else 0
-    
-    # 음주 여부 카테고리컬 피처
-    drink_val = r.get("T_DRINK", -1)
-    feat["T_DRINK_-1.0"] = 1 if drink_val == -1 else 0
-    feat["T_DRINK_1.0"] = 1 if drink_val == 1 else 0
-    feat["T_DRINK_2.0"] = 1 if drink_val == 2 else 0
-    feat["T_DRINK_3.0"] = 1 if drink_val == 3 else 0
-    
-    # 음주 기간 카테고리컬 피처 (기본값: 모두 0)
-    for i in [-1, 1, 2, 3, 4]:
-        feat[f"T_DRDU_{i}.0"] = 0
-    
-    # 모든 음주 빈도 카테고리컬 피처 (기본값: 모두 0)
-    drink_types = ["TAK", "RICE", "WINE", "SOJU", "BEER", "HLIQ"]
-    for drink_type in drink_types:
-        for freq in [-1, 0, 1, 2, 3, 4, 5, 6]:
-            feat[f"T_{drink_type}FQ_{freq}.0"] = 0
-    
-    # 흡연 여부 카테고리컬 피처
-    smoke_val = r.get("T_SMOKE", -1)
-    feat["T_SMOKE_-1.0"] = 1 if smoke_val == -1 else 0
-    feat["T_SMOKE_1.0"] = 1 if smoke_val == 1 else 0
-    feat["T_SMOKE_2.0"] = 1 if smoke_val == 2 else 0
-    feat["T_SMOKE_3.0"] = 1 if smoke_val == 3 else 0
-    
-    # 간접 흡연 카테고리컬 피처 (기본값: 모두 0)
-    feat["T_PSM_1.0"] = 0
-    feat["T_PSM_2.0"] = 0
-    
-    # 운동 여부 카테고리컬 피처
-    exer_val = r.get("EXER", -1)
-    feat["T_EXER_-1.0"] = 1 if exer_val == -1 else 0
-    feat["T_EXER_1.0"] = 1 if exer_val == 1 else 0
-    feat["T_EXER_2.0"] = 1 if exer_val == 2 else 0
-    
-    # 여성 전용 카테고리컬 피처 (기본값: 모두 0)
-    feat["T_PMYN_-1.0"] = 0
-    feat["T_PMYN_1.0"] = 0
-    feat["T_PMYN_2.0"] = 0
-    feat["T_PREG_-1.0"] = 0
-    feat["T_PREG_1.0"] = 0
-    feat["T_PREG_2.0"] = 0
-
-    return pd.DataFrame([feat])
+    return pd.DataFrame(build_base_row(row_df.iloc[0].to_dict(), "htn"), columns=base_feature_names("htn"))
 
 
+@timed("preprocess.base")
 def preprocess_base(row_df: pd.DataFrame, disease_type: str = "dm") -> pd.DataFrame:
     """
     질병별 전처리 함수 호출
@@ -250,83 +377,339 @@ def preprocess_base(row_df: pd.DataFrame, disease_type: str = "dm") -> pd.DataFr
 # -------------------------------
 # 10년 후 예측용 전처리
 # -------------------------------
+# 시점별 원시값을 그대로 가져오는 요약 피처: (피처명, 원본 컬럼, 방식)
+#   mode  = 최빈값 (동률이면 먼저 등장한 값)
+#   last  = 마지막 유효값
+#   first = 첫 유효값
+FOLLOWUP_STATIC = [
+    ("T00_SEX", "SEX", "mode"),
+    ("T01_CHILD", "CHILD", "last"),
+    ("T01_MNSAG", "MNSAG", "mode"),
+    ("T01_EDU", "EDU", "mode"),
+    ("T01_SMAG", "SMAG", "mode"),
+    ("T01_HTN", "HTN", "last"),
+    ("T01_DM", "DM", "last"),
+    ("T01_LIP", "LIP", "last"),
+    ("T05_FMFHT", "FMFHT", "last"),
+    ("T05_FMMHT", "FMMHT", "last"),
+    ("T05_FMFDM", "FMFDM", "last"),
+    ("T05_FMMDM", "FMMDM", "last"),
+]
+FOLLOWUP_AGE = ("T01_AGE", "T_AGE", "first")
+
+# 평균(_mean)/변화(_change)를 계산하는 연속형 지표
+FOLLOWUP_CONTINUOUS = ["BMI", "WEIGHT", "WHR", "SBP", "DBP", "PULSE", "TOTAL_DRINK", "SMOKE",
+                       "EXER", "HBA1C", "GLU", "HOMAIR", "TCHL", "HDL", "TG", "AST", "ALT", "CREATININE"]
+
+# 유효 시점 비율(합/개수)을 계산하는 지표: (피처명, 원본 컬럼)
+FOLLOWUP_RATIO = [("DRINK_ratio", "T_DRINK"), ("SMOKE_ratio", "T_SMOKE")]
+
+
+def _float_matrix(df: pd.DataFrame, cols) -> np.ndarray:
+    """
+    여러 컬럼을 한 번에 n×k float64 행렬로 변환
+    - 없는 컬럼은 NaN, 숫자로 못 바꾸는 값은 NaN, -1은 결측으로 간주
+    """
+    mat = _numeric_block(df, cols)
+    return np.where(mat == -1, np.nan, mat)
+
+
+def _first_last_pos(mask: np.ndarray, starts: np.ndarray):
+    """그룹별 첫/마지막 유효 위치 (mask: n×k) → (G×k, G×k); 유효값이 없으면 n / -1"""
+    n = mask.shape[0]
+    idx = np.arange(n)[:, None]
+    first = np.minimum.reduceat(np.where(mask, idx, n), starts, axis=0)
+    last = np.maximum.reduceat(np.where(mask, idx, -1), starts, axis=0)
+    return first, last
+
+
+def _mode_pos(values: np.ndarray, group: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    그룹별 최빈값의 첫 등장 위치 (Counter.most_common(1) 과 동일한 동률 처리)
+    - 유효값이 없으면 -1
+    """
+    out = np.full(n_groups, -1)
+    pos = np.flatnonzero(~np.isnan(values))
+    if pos.size == 0:
+        return out
+
+    g, v = group[pos], values[pos]
+    order = np.lexsort((pos, v, g))
+    g, v, pos = g[order], v[order], pos[order]
+
+    # (그룹, 값) 구간 → 구간 길이 = 등장 횟수, 구간 첫 원소 = 첫 등장 위치
+    run_start = np.flatnonzero(np.r_[True, (g[1:] != g[:-1]) | (v[1:] != v[:-1])])
+    counts = np.diff(np.r_[run_start, len(g)])
+    run_g, run_pos = g[run_start], pos[run_start]
+
+    # 그룹마다 (횟수 내림차순, 첫 등장 오름차순) 으로 첫 번째 구간 선택
+    best = np.lexsort((run_pos, -counts, run_g))
+    run_g, run_pos = run_g[best], run_pos[best]
+    keep = np.r_[True, run_g[1:] != run_g[:-1]]
+    out[run_g[keep]] = run_pos[keep]
+    return out
+
+
+def _take(raw: np.ndarray, pos: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """위치 배열로 원본 값을 꺼내되, 유효값이 없는 그룹은 -1 (원본 dtype 유지)"""
+    if not valid.any():
+        return np.full(len(pos), -1)
+    picked = raw[np.clip(pos, 0, max(len(raw) - 1, 0))]
+    return np.where(valid, picked, -1)
+
+
+# 학습 당시 컬럼 순서
+FOLLOWUP_FEATURES = ["T00_ID"] + [name for name, _, _ in FOLLOWUP_STATIC] \
+    + [f"{c}_{s}" for c in FOLLOWUP_CONTINUOUS for s in ("mean", "change")] \
+    + [name for name, _ in FOLLOWUP_RATIO] + [FOLLOWUP_AGE[0]]
+
+
+# 연속형 지표 파생에 쓰는 원본 컬럼
+FOLLOWUP_NUMERIC_COLS = ["HEIGHT", "WEIGHT", "WAIST", "HIP", "SBP", "DBP", "PULSE",
+                         "T_DRINK", "T_DRINKAM", "T_SMOKE", "T_SMOKEAM", "EXER", "HBA1C", "GLU", "HOMAIR",
+                         "TCHL", "HDL", "TG", "AST", "ALT", "CREATININE"]
+
+# 10년 후 전처리가 읽는 원본 컬럼 전체 (컬럼 단위 로딩/projection 용)
+FOLLOWUP_INPUT_COLUMNS = ["T_ID", "EDATE"] + [col for _, col, _ in FOLLOWUP_STATIC + [FOLLOWUP_AGE]] \
+    + [c for c in FOLLOWUP_NUMERIC_COLS if c not in {col for _, col, _ in FOLLOWUP_STATIC}]
+
+
+def _followup_inputs(df: pd.DataFrame):
+    """
+    시점별 집계 입력 두 행렬 (-1/비수치 → NaN)
+    - static: n × (FOLLOWUP_STATIC + AGE) 원본 값
+    - mat:    n × (FOLLOWUP_CONTINUOUS + FOLLOWUP_RATIO) 파생 후 값
+    """
+    static_cols = [col for _, col, _ in FOLLOWUP_STATIC + [FOLLOWUP_AGE]]
+    numeric_cols = FOLLOWUP_NUMERIC_COLS
+    mat_all = _float_matrix(df, static_cols + numeric_cols)
+    static_mat, numeric_mat = mat_all[:, :len(static_cols)], mat_all[:, len(static_cols):]
+
+    # 연속형 지표 파생 (행 단위 apply 대신 배열 연산)
+    cols = {c: numeric_mat[:, j] for j, c in enumerate(numeric_cols)}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        height, weight = cols["HEIGHT"], cols["WEIGHT"]
+        cols["BMI"] = np.where(height > 0, weight / (height / 100) ** 2, np.nan)
+        cols["WHR"] = np.where(cols["HIP"] > 0, cols["WAIST"] / cols["HIP"], np.nan)
+    drinkam = cols["T_DRINKAM"]
+    cols["TOTAL_DRINK"] = np.where((cols["T_DRINK"] == 1) & ~np.isnan(drinkam), drinkam, 0.0)
+    cols["SMOKE"] = np.nan_to_num(cols["T_SMOKEAM"], nan=0.0)
+
+    ratio_cols = [col for _, col in FOLLOWUP_RATIO]
+    mat = np.column_stack([cols[c] for c in FOLLOWUP_CONTINUOUS + ratio_cols])
+    return static_mat, mat
+
+
+def _followup_features(df: pd.DataFrame, starts: np.ndarray) -> dict:
+    """
+    EDATE 순으로 정렬된 시계열(df)을 그룹 경계(starts)별로 한 번에 집계
+    - 모든 평균/변화/비율을 n×k 배열 위 reduceat 한 번씩으로 계산
+    - 반환: {피처명: 그룹 수 길이의 배열}
+    """
+    n = len(df)
+    n_groups = len(starts)
+    lengths = np.diff(np.r_[starts, n])
+    group = np.repeat(np.arange(n_groups), lengths)
+
+    features = {"T00_ID": np.array([str(v) for v in df["T_ID"].to_numpy()[starts]], dtype=object)}
+    static = FOLLOWUP_STATIC + [FOLLOWUP_AGE]
+    static_mat, mat = _followup_inputs(df)
+
+    # (1) 원시값 요약 (최빈/마지막/첫 값) - 원본 dtype 유지를 위해 위치로 꺼냄
+    first, last = _first_last_pos(~np.isnan(static_mat), starts)
+    for j, (name, col, how) in enumerate(static):
+        values = static_mat[:, j]
+        if col in df.columns:
+            raw = df[col].to_numpy()
+            if raw.dtype.kind in "iu" and np.isnan(values).any():
+                raw = raw.astype("float64")  # -1 → NaN 치환 시의 dtype 과 동일하게
+        else:
+            raw = values
+        if how == "mode":
+            pos = _mode_pos(values, group, n_groups)
+            features[name] = _take(raw, pos, pos >= 0)
+        else:
+            pos = (first if how == "first" else last)[:, j]
+            features[name] = _take(raw, pos, (pos >= 0) & (pos < n))
+
+    # (2) 평균/변화 + 비율: 한 행렬에서 한 번에 집계
+    mask = ~np.isnan(mat)
+    counts = np.add.reduceat(mask, starts, axis=0)
+    sums = np.add.reduceat(np.where(mask, mat, 0.0), starts, axis=0)
+    first, last = _first_last_pos(mask, starts)
+    has = counts > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(has, sums / counts, np.nan)
+    first_val = mat[np.clip(first, 0, n - 1), np.arange(mat.shape[1])]
+    last_val = mat[np.clip(last, 0, n - 1), np.arange(mat.shape[1])]
+    changes = np.where(counts > 1, last_val - first_val, np.where(has, 0.0, np.nan))
+
+    for j, col in enumerate(FOLLOWUP_CONTINUOUS):
+        features[f"{col}_mean"] = means[:, j]
+        features[f"{col}_change"] = changes[:, j]
+    for j, (name, _) in enumerate(FOLLOWUP_RATIO, start=len(FOLLOWUP_CONTINUOUS)):
+        features[name] = means[:, j]
+
+    return {k: features[k] for k in FOLLOWUP_FEATURES}
+
+
+@timed("preprocess.followup")
 def preprocess_followup(df_user: pd.DataFrame) -> pd.DataFrame:
     """
     사용자의 시계열 데이터(df_user; T_ID=1의 여러 행)를 받아
     10년 후 예측용 1행 DataFrame으로 변환합니다.
     - 평균, 변화량, 비율 등을 계산합니다.
+    - 행 단위 apply 없이 NumPy 배열 위에서 모든 집계를 한 번에 수행합니다.
     """
     if df_user.empty:
         return pd.DataFrame([{}])
 
-    df_user = df_user.sort_values('EDATE').copy()
-    df_user = df_user.replace(-1, np.nan)
-    
-    features = {}
-    features["T00_ID"] = str(df_user["T_ID"].iloc[0])
-
-    vals = df_user["SEX"].dropna().tolist()
-    features["T00_SEX"] = Counter(vals).most_common(1)[0][0] if vals else -1
-
-    vals = df_user["CHILD"].dropna().tolist()
-    features["T01_CHILD"] = vals[-1] if vals else -1
-
-    for col in ["MNSAG", "EDU", "SMAG"]:
-        vals = df_user[col].dropna().tolist()
-        features[f"T01_{col}"] = Counter(vals).most_common(1)[0][0] if vals else -1
-
-    for col in ["HTN", "DM", "LIP"]:
-        vals = df_user[col].dropna().tolist()
-        features[f"T01_{col}"] = vals[-1] if vals else -1
-
-    for col in ["FMFHT", "FMMHT", "FMFDM", "FMMDM"]:
-        vals = df_user[col].dropna().tolist()
-        features[f"T05_{col}"] = vals[-1] if vals else -1
-
-    df_user_calc = df_user.copy()
-    numeric_cols = ["HEIGHT","WEIGHT","WAIST","HIP","SBP","DBP","PULSE",
-                    "T_DRINK","T_DRINKAM","T_SMOKE","T_SMOKEAM","EXER","HBA1C","GLU","HOMAIR",
-                    "TCHL","HDL","TG","AST","ALT","CREATININE"]
-    for col in numeric_cols:
-        df_user_calc[col] = pd.to_numeric(df_user_calc[col], errors='coerce')
-
-    df_user_calc["BMI"] = df_user_calc.apply(
-        lambda r: r["WEIGHT"]/((r["HEIGHT"]/100)**2) if pd.notna(r["HEIGHT"]) and pd.notna(r["WEIGHT"]) and r["HEIGHT"]>0 else np.nan, axis=1
-    )
-    df_user_calc["WHR"] = df_user_calc.apply(
-        lambda r: r["WAIST"]/r["HIP"] if pd.notna(r["WAIST"]) and pd.notna(r["HIP"]) and r["HIP"]>0 else np.nan, axis=1
-    )
-    df_user_calc["TOTAL_DRINK"] = df_user_calc.apply(
-        lambda r: r["T_DRINKAM"] if pd.notna(r["T_DRINK"]) and r["T_DRINK"]==1 and pd.notna(r["T_DRINKAM"]) else 0, axis=1
-    )
-    df_user_calc["SMOKE"] = df_user_calc["T_SMOKEAM"].fillna(0)
-
-    def calculate_mean_change(col):
-        vals = df_user_calc[col].dropna().astype(float).tolist()
-        if len(vals) == 0: return np.nan, np.nan
-        mean_val = np.mean(vals)
-        change_val = vals[-1]-vals[0] if len(vals)>1 else 0
-        return mean_val, change_val
-
-    def calculate_ratio(binary_col):
-        vals = df_user[binary_col].dropna().tolist()
-        return sum(vals)/len(vals) if vals else np.nan
-
-    continuous_cols = ["BMI","WEIGHT","WHR","SBP","DBP","PULSE","TOTAL_DRINK","SMOKE",
-                       "EXER","HBA1C","GLU","HOMAIR","TCHL","HDL","TG","AST","ALT","CREATININE"]
-
-    for col in continuous_cols:
-        mean_val, change_val = calculate_mean_change(col)
-        features[f"{col}_mean"] = mean_val
-        features[f"{col}_change"] = change_val
-
-    features["DRINK_ratio"] = calculate_ratio("T_DRINK")
-    features["SMOKE_ratio"] = calculate_ratio("T_SMOKE")
-
-    vals = df_user["T_AGE"].dropna().tolist()
-    features["T01_AGE"] = vals[0] if vals else -1
-
-    return pd.DataFrame([features])
+    df_user = df_user.sort_values("EDATE", kind="stable")
+    return pd.DataFrame(_followup_features(df_user, np.array([0])))
+
+
+@timed("preprocess.followup_many")
+def preprocess_followup_many(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    여러 사용자의 시계열 데이터(df; T_ID 여러 명)를 받아
+    T_ID 별 10년 후 예측용 피처 1행씩을 한 번의 그룹 집계로 생성합니다.
+    - (T_ID, EDATE) 로 정렬 후 사용자 경계마다 reduceat 집계 (사용자별 반복 없음)
+    - 각 행은 같은 사용자에 대한 preprocess_followup() 결과와 동일
+    - 반환 행 순서는 T_ID 오름차순
+    """
+    if df.empty:
+        return pd.DataFrame([{}]).iloc[0:0]
+
+    df = df[pd.notna(df["T_ID"])].sort_values(["T_ID", "EDATE"], kind="stable")
+    t_id = df["T_ID"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, t_id[1:] != t_id[:-1]])
+    return pd.DataFrame(_followup_features(df, starts))
+
+
+# -------------------------------
+# 10년 후 예측용 누적 상태 (증분 집계)
+# -------------------------------
+# 사용자별로 아래 값만 들고 있으면 새 시점이 들어올 때 O(1)로 갱신 가능
+#   연속형/비율: [유효 개수, 합, 첫 키, 첫 값, 마지막 키, 마지막 값]
+#   first/last : [첫 키, 첫 값, 마지막 키, 마지막 값]
+#   mode       : {값: [등장 횟수, 첫 등장 키]}
+# 키 = preprocess_followup 의 정렬 순서와 같은 (날짜 유효 여부, EDATE, 저장 순번)
+#   → 과거 날짜가 뒤늦게 추가돼도 첫/마지막 값이 올바르게 유지됨
+FOLLOWUP_STATE_VERSION = 1
+
+
+def followup_order_key(edate, seq: int) -> list:
+    """시점 정렬 키 (EDATE 를 날짜로 해석, 해석 불가 값은 맨 뒤)"""
+    ts = pd.to_datetime(edate, errors="coerce")
+    if pd.isna(ts):
+        return [1, "" if edate is None else str(edate), int(seq)]
+    return [0, ts.isoformat(), int(seq)]
+
+
+def new_followup_state(t_id) -> dict:
+    return {
+        "v": FOLLOWUP_STATE_VERSION,
+        "t_id": str(t_id),
+        "n": 0,
+        "static": {name: ({} if how == "mode" else None) for name, _, how in FOLLOWUP_STATIC + [FOLLOWUP_AGE]},
+        "cont": {col: None for col in FOLLOWUP_CONTINUOUS + [col for _, col in FOLLOWUP_RATIO]},
+    }
+
+
+def update_followup_state(state: dict, rows: pd.DataFrame, seqs) -> dict:
+    """
+    누적 상태에 새 시점들(rows: follow_sample.csv 스키마, seqs: 저장 순번)을 반영 (state 를 직접 갱신)
+    - 행마다 피처 수만큼의 상수 시간 갱신 → 전체 이력을 다시 읽지 않음
+    """
+    if rows.empty:
+        return state
+    static_mat, mat = _followup_inputs(rows)
+    keys = [followup_order_key(e, q) for e, q in zip(rows["EDATE"].tolist(), seqs)]
+    static = FOLLOWUP_STATIC + [FOLLOWUP_AGE]
+    cont_cols = list(state["cont"])
+
+    for i, key in enumerate(keys):
+        for j, (name, _, how) in enumerate(static):
+            val = static_mat[i, j]
+            if np.isnan(val):
+                continue
+            val = float(val)
+            if how == "mode":
+                counts = state["static"][name]
+                hit = counts.get(repr(val))
+                if hit is None:
+                    counts[repr(val)] = [1, key]
+                else:
+                    hit[0] += 1
+                    if key < hit[1]:
+                        hit[1] = key
+            else:
+                st = state["static"][name]
+                if st is None:
+                    state["static"][name] = [key, val, key, val]
+                else:
+                    if key < st[0]:
+                        st[0], st[1] = key, val
+                    if key > st[2]:
+                        st[2], st[3] = key, val
+
+        for j, col in enumerate(cont_cols):
+            val = mat[i, j]
+            if np.isnan(val):
+                continue
+            val = float(val)
+            st = state["cont"][col]
+            if st is None:
+                state["cont"][col] = [1, val, key, val, key, val]
+                continue
+            st[0] += 1
+            st[1] += val
+            if key < st[2]:
+                st[2], st[3] = key, val
+            if key > st[4]:
+                st[4], st[5] = key, val
+        state["n"] += 1
+    return state
+
+
+def _state_value(val: float):
+    return int(val) if float(val).is_integer() else val
+
+
+@timed("preprocess.followup_state")
+def preprocess_followup_state(state: dict) -> pd.DataFrame:
+    """
+    누적 상태 → 10년 후 예측용 1행 DataFrame (preprocess_followup 과 같은 컬럼/값)
+    - 비용이 이력 길이와 무관 (피처 수에만 비례)
+    """
+    features = {"T00_ID": state["t_id"]}
+    for name, _, how in FOLLOWUP_STATIC + [FOLLOWUP_AGE]:
+        st = state["static"][name]
+        if how == "mode":
+            if not st:
+                features[name] = -1
+                continue
+            best = min(st.items(), key=lambda kv: (-kv[1][0], kv[1][1]))
+            features[name] = _state_value(float(best[0]))
+        elif st is None:
+            features[name] = -1
+        else:
+            features[name] = _state_value(st[1] if how == "first" else st[3])
+
+    means = {}
+    for col, st in state["cont"].items():
+        if st is None:
+            means[col], change = np.nan, np.nan
+        else:
+            means[col] = st[1] / st[0]
+            change = st[5] - st[3] if st[0] > 1 else 0.0
+        if col in FOLLOWUP_CONTINUOUS:
+            features[f"{col}_mean"] = means[col]
+            features[f"{col}_change"] = change
+    for name, col in FOLLOWUP_RATIO:
+        features[name] = means[col]
+
+    return pd.DataFrame([{k: features[k] for k in FOLLOWUP_FEATURES}])
 
 
 # -------------------------------
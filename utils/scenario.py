@@ -0,0 +1,242 @@
+"""
+utils/scenario.py
+──────────────────────────────────────────────
+역할:
+- 10년 후 예측 "만약 ~라면" 시나리오 일괄 평가 (체중/혈압/음주/흡연 변화 등)
+- 시나리오 N개 → 원시 이력을 N벌 복제·변경 → preprocess_followup_many 1회 → 질병별 predict_proba 1회
+  → 시나리오 수백 개도 예측 1회와 비슷한 비용
+
+시나리오 형식:
+    {"name": "체중-5",
+     "history":  {"WEIGHT": ("add", -5)},     # 원시 이력(follow_sample.csv 컬럼) 변경
+     "features": {"SBP_mean": ("set", 120)},  # 집계 피처(FOLLOWUP_FEATURES) 변경
+     "rows": "all" | "last"}                  # history 변경을 전체 시점 / 마지막 시점에만 적용
+    변경 = ("add", x) | ("mul", x) | ("set", x) | 숫자(= set)
+    - add/mul 은 결측(-1/NaN) 값에는 적용하지 않음
+    - 변경된 이력은 schema.validate_frame 으로 검사 → 원래 이력에 없던 오류(ENUMS/RANGES 밖 값 등)가 생기면 ValueError
+
+사용:
+    grid = scenario_grid({"WEIGHT": [None, ("add", -5), ("add", -10)], "흡연": [None, QUIT_SMOKING]})
+    table = run_scenarios(load_user(1), grid)   # 시나리오별 확률/라벨/기준 대비 변화
+"""
+
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from utils.metrics import timed
+from utils.model_utils import DISEASES, predict_scores
+from utils.preprocess import FOLLOWUP_FEATURES, FOLLOWUP_INPUT_COLUMNS, preprocess_followup_many
+from utils.schema import validate_frame
+
+OPS = ("add", "mul", "set")
+BASELINE = "기준"
+
+# 여러 컬럼을 함께 바꾸는 생활습관 변화 묶음 (파생 지표 SMOKE/TOTAL_DRINK 가 함께 바뀌도록)
+# - 상태 코드는 schema.ENUMS 범위 안의 "과거흡연/과거음주(2)" (학습 데이터에 없는 코드를 넣지 않음)
+QUIT_SMOKING = {"T_SMOKE": ("set", 2), "T_SMOKEAM": ("set", 0)}
+QUIT_DRINKING = {"T_DRINK": ("set", 2), "T_DRINKAM": ("set", 0)}
+
+HISTORY_COLUMNS = [c for c in FOLLOWUP_INPUT_COLUMNS if c not in ("T_ID", "EDATE")]
+FEATURE_COLUMNS = [c for c in FOLLOWUP_FEATURES if c != "T00_ID"]
+
+
+# -------------------------------
+# 시나리오 정의
+# -------------------------------
+def _parse_change(spec):
+    if isinstance(spec, (int, float, np.number)):
+        return "set", float(spec)
+    try:
+        op, val = spec
+    except (TypeError, ValueError):
+        raise ValueError(f"변경 형식 오류: {spec!r} (('add'|'mul'|'set', 값) 또는 숫자)")
+    if op not in OPS:
+        raise ValueError(f"Unknown change op: {op}")
+    return op, float(val)
+
+
+def _describe(col: str, op: str, val: float) -> str:
+    val = int(val) if float(val).is_integer() else val
+    if op == "add":
+        return f"{col}{val:+}"
+    if op == "mul":
+        return f"{col}×{val}"
+    return f"{col}={val}"
+
+
+def _normalize(scenario: dict) -> dict:
+    history = {c: _parse_change(s) for c, s in (scenario.get("history") or {}).items()}
+    features = {c: _parse_change(s) for c, s in (scenario.get("features") or {}).items()}
+    unknown = [c for c in history if c not in HISTORY_COLUMNS] + [c for c in features if c not in FEATURE_COLUMNS]
+    if unknown:
+        raise ValueError(f"예측에 쓰이지 않는 컬럼: {unknown}")
+    rows = scenario.get("rows", "all")
+    if rows not in ("all", "last"):
+        raise ValueError(f"rows 는 'all' 또는 'last': {rows!r}")
+    name = scenario.get("name") or ", ".join(
+        [_describe(c, *ch) for c, ch in history.items()] + [_describe(c, *ch) for c, ch in features.items()]
+    ) or BASELINE
+    return {"name": name, "history": history, "features": features, "rows": rows}
+
+
+def scenario_grid(history_axes: dict = None, feature_axes: dict = None, rows: str = "all") -> list[dict]:
+    """
+    축별 변경 후보의 데카르트 곱 → 시나리오 목록
+    - 축 값: None(변경 없음) | 변경 | {컬럼: 변경} 묶음(축 이름은 표시용, 예: QUIT_SMOKING)
+    - 모든 축이 None 인 조합은 기준과 같으므로 제외 (run_scenarios 가 기준 행을 따로 붙임)
+    - 예) {"WEIGHT": [None, ("add", -5)], "SBP": [None, ("add", -10)]} → 3개
+    """
+    axes = [("history", k, v) for k, v in (history_axes or {}).items()] \
+        + [("features", k, v) for k, v in (feature_axes or {}).items()]
+    scenarios = []
+    for combo in itertools.product(*[values for _, _, values in axes]):
+        sc = {"history": {}, "features": {}, "rows": rows}
+        for (level, col, _), choice in zip(axes, combo):
+            if choice is None:
+                continue
+            if isinstance(choice, dict):
+                sc[level].update(choice)
+            else:
+                sc[level][col] = choice
+        if sc["history"] or sc["features"]:
+            scenarios.append(sc)
+    return scenarios
+
+
+def _unique_names(names: list) -> list:
+    """중복 시나리오 이름에 " (2)", " (3)" … 을 붙여 구분 (첫 번째는 그대로)"""
+    seen, out = set(), []
+    for name in names:
+        new, k = name, 2
+        while new in seen:
+            new, k = f"{name} ({k})", k + 1
+        seen.add(new)
+        out.append(new)
+    return out
+
+
+# -------------------------------
+# 일괄 변환
+# -------------------------------
+def _apply(values: np.ndarray, ops: list, mask: np.ndarray) -> np.ndarray:
+    """
+    values: (m, n) 또는 (m,) — 시나리오별 행 / ops: 시나리오별 (op, val) 또는 None
+    mask: 변경을 적용할 위치 (values 와 같은 모양)
+    """
+    m = len(ops)
+    add, mul = np.zeros(m), np.ones(m)
+    set_val, has_set = np.full(m, np.nan), np.zeros(m, dtype=bool)
+    for i, ch in enumerate(ops):
+        if ch is None:
+            mask[i] = False
+            continue
+        op, val = ch
+        if op == "add":
+            add[i] = val
+        elif op == "mul":
+            mul[i] = val
+        else:
+            set_val[i], has_set[i] = val, True
+
+    shape = (m,) + (1,) * (values.ndim - 1)
+    valid = ~np.isnan(values) & (values != -1)
+    changed = values * mul.reshape(shape) + add.reshape(shape)
+    out = np.where(mask & valid, changed, values)
+    return np.where(mask & has_set.reshape(shape), set_val.reshape(shape), out)
+
+
+def _restore_dtype(new: np.ndarray, src: np.ndarray) -> np.ndarray:
+    if src.dtype.kind == "f":
+        return new.astype(src.dtype)  # float32 원본이면 float32 유지 → 전처리 반올림 규칙 동일
+    if not np.isnan(new).any() and np.array_equal(new, np.round(new)):
+        return new.astype("int64")
+    return new
+
+
+def _check_rows(long: pd.DataFrame, hist: pd.DataFrame, t_id, names: list) -> None:
+    """
+    변경된 이력(시나리오 × 시점) 을 validate_frame 으로 검사
+    - 원래 이력에 이미 있던 오류(같은 시점·컬럼)는 시나리오 탓이 아니므로 제외
+    - 새 오류가 있으면 시나리오 이름과 함께 ValueError
+    """
+    def _raw(df):
+        return df.assign(T_ID=t_id, EDATE=df["EDATE"].dt.strftime("%Y-%m-%d"))
+
+    n = len(hist)
+    _, base_errors = validate_frame(_raw(hist), first_row=0)
+    known = set(zip(base_errors["행"], base_errors["컬럼"]))
+    _, errors = validate_frame(_raw(long), first_row=0)
+    new = [(i, col, val, msg) for i, col, val, msg in errors.itertuples(index=False) if (i % n, col) not in known]
+    if new:
+        details = list(dict.fromkeys(f"{names[i // n]}: {col}={val} ({msg})" for i, col, val, msg in new))
+        raise ValueError("시나리오 변경 값이 허용 범위를 벗어났습니다: " + "; ".join(details[:5]))
+
+
+def scenario_features(history: pd.DataFrame, scenarios: list[dict]) -> pd.DataFrame:
+    """
+    한 사용자의 원시 이력 + 시나리오 목록 → 시나리오별 모델 입력 1행씩 (입력 순서 유지)
+    - 이력을 시나리오 수만큼 복제한 뒤 변경 컬럼만 (시나리오 × 시점) 배열 연산으로 덮어씀
+    - 집계는 preprocess_followup_many 1회 (시나리오마다 임시 T_ID)
+    """
+    if history.empty:
+        raise ValueError("이력이 비어 있습니다.")
+    scenarios = [_normalize(s) for s in scenarios]
+    t_id = history["T_ID"].iloc[0]
+
+    cols = [c for c in FOLLOWUP_INPUT_COLUMNS if c in history.columns]
+    hist = history[cols].copy()
+    hist["EDATE"] = pd.to_datetime(hist["EDATE"], errors="coerce")
+    hist = hist.sort_values("EDATE", kind="stable").reset_index(drop=True)  # "last" = 가장 최근 시점
+    m, n = len(scenarios), len(hist)
+
+    long = hist.take(np.tile(np.arange(n), m)).reset_index(drop=True)
+    long["T_ID"] = np.repeat(np.arange(m), n)
+
+    row_mask = np.ones((m, n), dtype=bool)
+    row_mask[[s["rows"] == "last" for s in scenarios], :-1] = False
+    for col in dict.fromkeys(c for s in scenarios for c in s["history"]):
+        src = hist[col].to_numpy() if col in hist.columns else np.full(n, np.nan)
+        base = pd.to_numeric(pd.Series(src), errors="coerce").to_numpy("float64")
+        new = _apply(np.broadcast_to(base, (m, n)).copy(), [s["history"].get(col) for s in scenarios],
+                     row_mask.copy())
+        long[col] = _restore_dtype(new.ravel(), src)
+    if any(s["history"] for s in scenarios):
+        _check_rows(long, hist, t_id, [s["name"] for s in scenarios])
+
+    X = preprocess_followup_many(long)  # T_ID(=시나리오 번호) 오름차순 = 입력 순서
+    X["T00_ID"] = str(t_id)  # 모델은 T00_ID 를 원-핫으로 사용 → 원래 사용자 ID 로 복원
+    for col in dict.fromkeys(c for s in scenarios for c in s["features"]):
+        base = pd.to_numeric(X[col], errors="coerce").to_numpy("float64")
+        X[col] = _apply(base, [s["features"].get(col) for s in scenarios], np.ones(m, dtype=bool))
+    X.index = pd.Index(_unique_names([s["name"] for s in scenarios]), name="scenario")  # .loc[이름] 이 항상 1행
+    return X
+
+
+@timed("scenario.run")
+def run_scenarios(history: pd.DataFrame, scenarios: list[dict], diseases=None) -> pd.DataFrame:
+    """
+    시나리오 일괄 예측 → DataFrame (행 = 시나리오, 첫 행 = 변경 없는 기준)
+    컬럼: {code}_prob, {code}_pred, {code}_delta (기준 대비 확률 변화)
+    """
+    scenarios = [{"name": BASELINE}] + list(scenarios)
+    X = scenario_features(history, scenarios)
+    scores = predict_scores("follow", X.reset_index(drop=True), diseases=diseases)
+
+    out = pd.DataFrame(index=X.index)
+    for code, res in scores.items():
+        out[f"{code}_prob"] = res["prob"]
+        out[f"{code}_pred"] = res["pred"]
+        out[f"{code}_delta"] = res["prob"] - res["prob"][0]
+    return out
+
+
+def rename_diseases(table: pd.DataFrame) -> pd.DataFrame:
+    """화면 표시용: {code}_prob → '고혈압 확률' 등"""
+    labels = {"prob": "확률", "pred": "예측", "delta": "변화"}
+    return table.rename(columns={
+        f"{code}_{k}": f"{name} {v}" for code, name in DISEASES.items() for k, v in labels.items()
+    })
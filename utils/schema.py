@@ -0,0 +1,245 @@
+"""
+utils/schema.py
+──────────────────────────────────────────────
+역할:
+- follow_sample.csv 스키마(io_utils.COLUMNS) 검증 + 정규화를 DataFrame 단위로 수행
+  (행 반복 없이 컬럼별 배열 연산: 숫자 변환 / 범주 값 / 범위 / 필수 항목)
+- 오류는 행 번호 · 컬럼 · 값 · 사유 표로 보고
+- 화면 폼 1행과 업로드 파일(CSV/Excel) 여러 행에 같은 규칙 적용
+
+정규화 규칙:
+- 컬럼명은 앞뒤 공백 제거 + 대문자, 없는 선택 컬럼은 -1
+- 공란/NaN/"모름" → -1 (결측), "선택" → 미입력 (필수 항목이면 오류)
+- "남자 (1)" 처럼 괄호 안 숫자가 있는 선택지 문자열 → 그 숫자
+- EDATE → YYYY-MM-DD 문자열
+
+사용:
+    clean, errors = validate_frame(pd.read_csv(...), default_t_id=1)
+    # clean: 오류 없는 행만 (COLUMNS 순서, 저장 가능한 값), errors: 오류 표 (없으면 빈 DataFrame)
+"""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.io_utils import COLUMNS
+
+# 범주형 코드: 허용 값 (결측 -1 은 선택 항목에서만 허용)
+ENUMS = {
+    "CHILD": (1, 2), "SEX": (1, 2), "EDU": (1, 2, 3, 4, 5, 6),
+    "T_DRINK": (1, 2, 3), "T_SMOKE": (1, 2, 3),
+    "HTN": (1, 2), "DM": (1, 2), "LIP": (1, 2),
+    "FMMHT": (1, 2), "FMFHT": (1, 2), "FMMDM": (1, 2), "FMFDM": (1, 2),
+}
+
+# 연속형/정수형 값의 허용 범위 (양 끝 포함)
+RANGES = {
+    "T_ID": (1, 2**31 - 1), "T_AGE": (0, 120), "MNSAG": (0, 30), "SMAG": (0, 100),
+    "T_DRINKAM": (0, 100), "T_SMOKEAM": (0, 200),
+    "WEIGHT": (10, 300), "HEIGHT": (50, 250), "WAIST": (30, 250), "HIP": (30, 250),
+    "SBP": (50, 300), "DBP": (20, 200), "PULSE": (20, 250), "EXER": (0, 100),
+    "HBA1C": (2, 20), "GLU": (20, 1000), "HOMAIR": (0, 100),
+    "TCHL": (30, 1000), "HDL": (5, 300), "TG": (10, 5000),
+    "AST": (0, 5000), "ALT": (0, 5000), "CREATININE": (0.1, 30),
+}
+
+# 정수여야 하는 컬럼
+INTEGER_COLUMNS = ["T_ID", "T_AGE", "MNSAG", "SMAG"] + list(ENUMS)
+
+# 필수 항목 (입력 화면의 🔴 항목과 동일)
+REQUIRED = ["T_ID", "EDATE", "CHILD", "SEX", "EDU", "T_DRINK", "T_SMOKE", "T_AGE",
+            "HTN", "DM", "LIP", "WEIGHT", "HEIGHT"]
+
+MISSING_TEXT = {"", "모름", "-1", "nan", "none", "null", "na", "n/a"}
+UNSELECTED_TEXT = {"선택"}
+
+LABELS = {
+    "T_ID": "사용자 ID", "EDATE": "조사일", "CHILD": "출산 여부", "SEX": "성별", "EDU": "교육수준",
+    "T_DRINK": "음주 여부", "T_SMOKE": "흡연 여부", "T_AGE": "나이", "HTN": "고혈압 진단 여부",
+    "DM": "당뇨병 진단 여부", "LIP": "고지혈증 진단 여부", "WEIGHT": "체중", "HEIGHT": "신장",
+}
+
+ERROR_COLUMNS = ["행", "컬럼", "값", "오류"]
+REQUIRED_MESSAGE = "필수 항목입니다."
+
+
+# -------------------------------
+# 컬럼 단위 변환
+# -------------------------------
+def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.set_axis([str(c).strip().upper() for c in df.columns], axis=1)
+    dup = df.columns.duplicated()
+    return df.loc[:, ~dup] if dup.any() else df
+
+
+def _coerce_numeric(series: pd.Series):
+    """
+    한 컬럼 → (float64 값 배열, 미선택 마스크, 숫자 아님 마스크)
+    - 결측 표기는 NaN, 괄호 안 숫자("남자 (1)")는 그 숫자로
+    - 숫자 변환을 먼저 한 번에 하고, 실패한 값에만 문자열 규칙(결측 표기/선택지/천 단위 쉼표) 적용
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        return values, np.zeros(len(values), dtype=bool), np.zeros(len(values), dtype=bool)
+
+    try:
+        values = series.to_numpy(dtype=object).astype("float64")  # 대부분의 컬럼: 숫자 문자열/결측만 있음
+    except (TypeError, ValueError):
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    unselected = np.zeros(len(values), dtype=bool)
+    bad = np.zeros(len(values), dtype=bool)
+    rest = np.flatnonzero(np.isnan(values))
+    if rest.size == 0:
+        return values, unselected, bad
+
+    text = series.iloc[rest].astype("string").str.strip()
+    missing = (text.isna() | text.str.lower().isin(MISSING_TEXT)).to_numpy(dtype=bool)
+    unsel = text.isin(UNSELECTED_TEXT).fillna(False).to_numpy(dtype=bool)
+    coded = text.str.extract(r"\((-?\d+(?:\.\d+)?)\)\s*$", expand=False)
+    parsed = pd.to_numeric(coded.fillna(text).str.replace(",", "", regex=False), errors="coerce")
+    parsed = parsed.to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    parsed[missing | unsel] = np.nan
+
+    values[rest] = parsed
+    unselected[rest] = unsel
+    bad[rest] = np.isnan(parsed) & ~missing & ~unsel
+    return values, unselected, bad
+
+
+def _coerce_dates(series: pd.Series):
+    """
+    EDATE → (YYYY-MM-DD 문자열 배열(결측은 None), 결측 마스크, 해석 불가 마스크)
+    - YYYY-MM-DD 로 한 번에 해석하고, 실패한 값만 다른 날짜 표기로 재시도
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series
+        missing = series.isna().to_numpy()
+    else:
+        text = series.astype("string").str.strip()
+        missing = (text.isna() | text.str.lower().isin(MISSING_TEXT | UNSELECTED_TEXT)).to_numpy(dtype=bool)
+        parsed = pd.to_datetime(text.where(~missing), errors="coerce", format="%Y-%m-%d")
+        retry = np.flatnonzero(pd.isna(parsed).to_numpy() & ~missing)
+        if retry.size:
+            parsed = parsed.copy()
+            parsed.iloc[retry] = pd.to_datetime(text.iloc[retry], errors="coerce", format="mixed")
+    out = np.array(parsed.dt.strftime("%Y-%m-%d"), dtype=object)
+    bad = pd.isna(parsed).to_numpy() & ~missing
+    out[missing | bad] = None
+    return out, missing, bad
+
+
+def _report(errors: list, rows: np.ndarray, col: str, raw: pd.Series, message: str):
+    if rows.size:
+        errors += zip(rows.tolist(), [col] * rows.size, raw.iloc[rows].tolist(), [message] * rows.size)
+
+
+# -------------------------------
+# 검증 + 정규화
+# -------------------------------
+def validate_frame(df: pd.DataFrame, default_t_id=None, first_row: int = 1):
+    """
+    원시 DataFrame → (clean, errors)
+    - clean: 오류 없는 행만, COLUMNS 순서 / 결측 -1 / EDATE 문자열 / 정수 컬럼은 int (append_frame 으로 바로 저장 가능)
+    - errors: 행(입력 기준 first_row 부터) · 컬럼 · 값 · 오류 DataFrame
+    - default_t_id: T_ID 컬럼이 없거나 비어 있을 때 채울 ID
+    - 필수 컬럼 자체가 없으면 (파일 형식 오류) ValueError
+    """
+    df = _normalize_columns(df).reset_index(drop=True)
+    n = len(df)
+    if default_t_id is not None:
+        if "T_ID" not in df.columns:
+            df["T_ID"] = default_t_id
+        else:
+            text = df["T_ID"].astype("string").str.strip()
+            empty = (text.isna() | (text == "")).to_numpy(dtype=bool)
+            df["T_ID"] = df["T_ID"].astype(object).where(~empty, default_t_id)
+    absent_cols = [c for c in REQUIRED if c not in df.columns]
+    if absent_cols:
+        raise ValueError("필수 컬럼이 없습니다: " + ", ".join(f"{LABELS[c]}({c})" for c in absent_cols))
+
+    errors: list = []
+    clean = {}
+    for col in COLUMNS:
+        if col not in df.columns:
+            clean[col] = np.full(n, -1.0)
+            continue
+        raw = df[col]
+
+        if col == "EDATE":
+            values, missing, bad = _coerce_dates(df[col])
+            _report(errors, np.flatnonzero(bad), col, raw, "날짜 형식이 아닙니다.")
+            _report(errors, np.flatnonzero(missing), col, raw, REQUIRED_MESSAGE)
+            clean[col] = values
+            continue
+
+        values, unselected, bad = _coerce_numeric(df[col])
+        _report(errors, np.flatnonzero(bad), col, raw, "숫자가 아닙니다.")
+        absent = np.isnan(values) | (values == -1)
+        if col in REQUIRED:
+            _report(errors, np.flatnonzero(absent & ~bad), col, raw, REQUIRED_MESSAGE)
+
+        present = ~absent
+        if col in INTEGER_COLUMNS:
+            frac = present & (values != np.round(values))
+            _report(errors, np.flatnonzero(frac), col, raw, "정수여야 합니다.")
+        if col in ENUMS:
+            out = present & ~np.isin(values, ENUMS[col])
+            _report(errors, np.flatnonzero(out), col, raw, f"허용 값: {', '.join(map(str, ENUMS[col]))}")
+        elif col in RANGES:
+            lo, hi = RANGES[col]
+            out = present & ((values < lo) | (values > hi))
+            _report(errors, np.flatnonzero(out), col, raw, f"허용 범위: {lo} ~ {hi}")
+
+        clean[col] = np.where(absent, -1.0, values)
+
+    keep = np.ones(n, dtype=bool)
+    keep[[i for i, *_ in errors]] = False
+    clean = pd.DataFrame(clean, columns=COLUMNS)[keep].reset_index(drop=True)
+    clean = clean.astype({"EDATE": object, **{col: "int64" for col in INTEGER_COLUMNS}})  # 남은 행은 정수 검증 통과
+
+    report = pd.DataFrame(errors, columns=ERROR_COLUMNS).sort_values(["행", "컬럼"], kind="stable")
+    report["행"] = report["행"] + first_row
+    return clean, report.reset_index(drop=True)
+
+
+def validate_row(row: dict):
+    """폼 1행 검증 → (clean row dict | None, 오류 메시지 목록)"""
+    clean, errors = validate_frame(pd.DataFrame([row]))
+    if len(errors):
+        return None, [f"{LABELS.get(c, c)} ({c}): {m}" for c, m in zip(errors["컬럼"], errors["오류"])]
+    return clean.iloc[0].to_dict(), []
+
+
+# -------------------------------
+# 업로드 파일 읽기
+# -------------------------------
+# 확장자 → pandas.read_excel 이 쓰는 선택 의존성 (.xls 는 openpyxl 이 아니라 xlrd)
+EXCEL_ENGINES = {".xlsx": "openpyxl", ".xlsm": "openpyxl", ".xls": "xlrd"}
+
+
+def read_table(file, name: str = None) -> pd.DataFrame:
+    """
+    CSV / Excel(.xlsx, .xls) → 원시 DataFrame (값은 문자열, 빈 칸은 NaN / 변환은 validate_frame 에서)
+    - file: 경로 또는 파일 객체(Streamlit UploadedFile 등), name: 확장자 판별용 파일명
+    - CSV 인코딩: UTF-8(BOM 포함) 실패 시 CP949
+    """
+    name = name or getattr(file, "name", None) or str(file)
+    ext = os.path.splitext(name)[1].lower()
+    if ext in EXCEL_ENGINES:
+        pkg = EXCEL_ENGINES[ext]
+        try:
+            return pd.read_excel(file, dtype=object, engine=pkg)
+        except ImportError as e:
+            raise ImportError(f"{ext} 파일을 읽으려면 {pkg} 이 필요합니다. (pip install {pkg})") from e
+    if ext not in (".csv", ".txt", ""):
+        raise ValueError(f"지원하지 않는 파일 형식: {ext} (CSV 또는 Excel)")
+
+    try:
+        return pd.read_csv(file, dtype=str, encoding="utf-8-sig")
+    except UnicodeDecodeError:
+        if hasattr(file, "seek"):
+            file.seek(0)
+        return pd.read_csv(file, dtype=str, encoding="cp949")
@@ -0,0 +1,285 @@
+"""
+utils/scoring_server.py
+──────────────────────────────────────────────
+역할:
+- Streamlit 없이 모델을 부를 수 있는 경량 HTTP/JSON 예측 서버 (표준 라이브러리만 사용)
+- 모델은 프로세스당 1회 로딩 (model_utils 레지스트리 + 시작 시 백그라운드 preload, 요청 처리는 바로 시작)
+- 전처리는 utils.preprocess 를 그대로 사용 → 화면과 같은 입력이면 같은 확률
+
+엔드포인트:
+- GET  /health
+    → {"status": "ok" | "loading", "models": {"base/htn": "sha256 앞 12자리" | null, ...}}
+      (미리 로딩 중에는 기다리지 않고 로딩이 끝난 모델만 표시)
+- GET  /metrics        → 단계별 소요 시간 히스토그램 (Prometheus text)
+- GET  /metrics.json   → utils.metrics.snapshot() JSON
+- POST /predict/base/{htn|dm|lip}
+    요청: {"row": {...}} | {"rows": [{...}, ...]} | {...} | [{...}, ...]   (행 = io_utils.COLUMNS 스키마)
+    응답: {"disease", "name", "threshold", "model_version", "results": [{"T_ID", "prob", "pred"}, ...]}
+- POST /predict/follow
+    요청: {"rows": [...]}            T_ID 별로 묶어 사용자마다 1건 (T_ID 오름차순)
+          {"histories": [[...], ...]} 이력 목록마다 1건 (요청 순서)
+    응답: {"results": [{"T_ID", "htn": {"prob", "pred"}, "dm": {...}, "lip": {...}}, ...],
+           "model_versions": {...}}
+
+실행:
+  python -m utils.scoring_server --port 8000
+  (Streamlit 과 같은 프로세스: SCORING_PORT=8000 streamlit run app.py)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from utils import metrics
+from utils.io_utils import COLUMNS, clean_row
+from utils.model_utils import (
+    DISEASES, KINDS, loaded_version, model_version, predict_scores, preload_running, start_preload,
+)
+from utils.preprocess import preprocess_base_many, preprocess_followup_many
+
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+_BASE_PATH = re.compile(r"^/predict/base/(\w+)/?$")
+
+
+class RequestError(ValueError):
+    """클라이언트 입력 오류 (HTTP 상태 코드 포함)"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+# -------------------------------
+# 요청 → DataFrame
+# -------------------------------
+def _rows_frame(rows) -> pd.DataFrame:
+    if not isinstance(rows, list) or not rows:
+        raise RequestError("행 목록(rows)이 비어 있습니다.")
+    if not all(isinstance(r, dict) for r in rows):
+        raise RequestError("각 행은 JSON 객체여야 합니다.")
+    return pd.DataFrame([clean_row(r) for r in rows], columns=COLUMNS)
+
+
+def _base_rows(payload) -> pd.DataFrame:
+    if isinstance(payload, dict):
+        if "rows" in payload:
+            payload = payload["rows"]
+        elif "row" in payload:
+            payload = [payload["row"]]
+        else:
+            payload = [payload]
+    return _rows_frame(payload)
+
+
+def _follow_inputs(payload):
+    """→ (피처 행렬, 결과에 표시할 T_ID 목록)"""
+    if isinstance(payload, dict) and "histories" in payload:
+        histories = payload["histories"]
+        if not isinstance(histories, list) or not histories:
+            raise RequestError("histories 가 비어 있습니다.")
+        frames = [_rows_frame(h) for h in histories]
+        t_ids = [f["T_ID"].iloc[0] for f in frames]
+        # 같은 T_ID 라도 이력 목록별로 따로 집계되도록 임시 그룹 번호로 묶음
+        df = pd.concat([f.assign(T_ID=i) for i, f in enumerate(frames)], ignore_index=True)
+        df["EDATE"] = pd.to_datetime(df["EDATE"], errors="coerce")
+        X = preprocess_followup_many(df)
+        X["T00_ID"] = [str(t) for t in t_ids]
+        return X, t_ids
+
+    rows = payload.get("rows") if isinstance(payload, dict) else payload
+    df = _rows_frame(rows)
+    df["EDATE"] = pd.to_datetime(df["EDATE"], errors="coerce")
+    X = preprocess_followup_many(df)
+    return X, df["T_ID"].dropna().sort_values().unique().tolist()
+
+
+def _jsonable(val):
+    if isinstance(val, np.generic):
+        return val.item()
+    return val
+
+
+# -------------------------------
+# 예측
+# -------------------------------
+def predict_base(disease: str, payload) -> dict:
+    if disease not in DISEASES:
+        raise RequestError(f"Unknown disease type: {disease}", status=404)
+    df = _base_rows(payload)
+    res = predict_scores("base", preprocess_base_many(df, disease), diseases=[disease])[disease]
+    return {
+        "disease": disease,
+        "name": res["name"],
+        "threshold": res["threshold"],
+        "model_version": model_version("base", disease)[:12],
+        "results": [
+            {"T_ID": _jsonable(t), "prob": float(p), "pred": int(y)}
+            for t, p, y in zip(df["T_ID"], res["prob"], res["pred"])
+        ],
+    }
+
+
+def predict_follow_payload(payload) -> dict:
+    X, t_ids = _follow_inputs(payload)
+    scores = predict_scores("follow", X)
+    results = []
+    for i, t in enumerate(t_ids):
+        item = {"T_ID": _jsonable(t)}
+        for code, res in scores.items():
+            item[code] = {"prob": float(res["prob"][i]), "pred": int(res["pred"][i])}
+        results.append(item)
+    return {
+        "results": results,
+        "model_versions": {code: model_version("follow", code)[:12] for code in scores},
+    }
+
+
+def _not_found():
+    raise RequestError("Not found", status=404)
+
+
+def health() -> dict:
+    loading = preload_running()
+    models = {}
+    for kind in KINDS:
+        for code in DISEASES:
+            if loading:
+                version = loaded_version(kind, code)
+                models[f"{kind}/{code}"] = version[:12] if version else None
+                continue
+            try:
+                models[f"{kind}/{code}"] = model_version(kind, code)[:12]
+            except FileNotFoundError:
+                models[f"{kind}/{code}"] = None
+    return {"status": "loading" if loading else "ok", "models": models}
+
+
+# -------------------------------
+# HTTP
+# -------------------------------
+class ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: 연결 재사용으로 요청당 TCP 핸드셰이크 생략
+    server_version = "ScoringServer/1.0"
+    quiet = True
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_text(self, status: int, text: str, content_type: str):
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True  # 본문을 읽지 않았으므로 연결 재사용 불가
+            raise RequestError("요청 본문이 너무 큽니다.", status=413)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw or b"null")
+        except json.JSONDecodeError as e:
+            raise RequestError(f"JSON 형식 오류: {e}")
+
+    def _handle(self, func):
+        t0 = time.perf_counter()
+        try:
+            body = func()
+            status = 200
+        except RequestError as e:
+            status, body = e.status, {"error": str(e)}
+        except FileNotFoundError as e:
+            status, body = 503, {"error": f"모델 파일이 없습니다: {e}"}
+        except Exception as e:  # 예측/전처리 중 예기치 못한 오류
+            status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+        elapsed = time.perf_counter() - t0
+        metrics.observe(f"http.{self.command}", elapsed, error=status >= 500)
+        metrics.count(f"http.status_{status}")
+        if status == 200:
+            body["elapsed_ms"] = round(elapsed * 1000, 3)
+        self._send(status, body)
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path == "/health":
+            self._handle(health)
+        elif path == "/metrics":
+            self._send_text(200, metrics.to_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/metrics.json":
+            self._send(200, metrics.snapshot())
+        else:
+            self._handle(_not_found)
+
+    def do_POST(self):
+        def route():
+            payload = self._read_json()  # 경로와 무관하게 본문을 먼저 읽어 keep-alive 연결 유지
+            match = _BASE_PATH.match(self.path)
+            if match:
+                return predict_base(match.group(1), payload)
+            if self.path.rstrip("/") == "/predict/follow":
+                return predict_follow_payload(payload)
+            return _not_found()
+
+        self._handle(route)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8000, quiet: bool = True) -> ThreadingHTTPServer:
+    handler = type("Handler", (ScoringHandler,), {"quiet": quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_server_thread(host: str = "127.0.0.1", port: int = 8000, preload: bool = True):
+    """
+    예측 서버를 백그라운드 스레드로 시작 (Streamlit 과 같은 프로세스에서 모델 레지스트리 공유)
+    - preload: 모델 미리 로딩도 백그라운드(start_preload)로 → 호출 측(첫 화면)을 막지 않음
+    반환: (server, thread) — server.shutdown() 으로 종료
+    """
+    if preload:
+        start_preload()
+    server = make_server(host, port)
+    thread = threading.Thread(target=server.serve_forever, name="scoring-server", daemon=True)
+    thread.start()
+    return server, thread
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP/JSON 예측 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--no-preload", action="store_true", help="시작 시 모델 미리 로딩 생략")
+    parser.add_argument("--verbose", action="store_true", help="요청 로그 출력")
+    args = parser.parse_args()
+
+    if not args.no_preload:
+        start_preload()
+    server = make_server(args.host, args.port, quiet=not args.verbose)
+    print(f"scoring server: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()